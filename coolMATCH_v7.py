@@ -11,108 +11,136 @@
 # 3. Samsung Datei: S_Klima_Artikel_Import_*.xlsx
 # 4. Kein DVM mehr (nur RAC, FJM, BAC)
 # 5. Debug-Modus für Datei-Suche
+# 6. Katalog-Snapshot (coolmatch_catalog) statt Excel-Parsing bei jedem Start
+# 7. Such-Index (coolmatch_search) für RAC/BAC/FJM statt Zeilen-Stringify
+# 8. Zubehör-Suche über vorberechnete Suchtext-Spalte + Trigramm-Index
+# 9. FJM Typ-Buckets einmalig vorberechnet, Raumanzahl über FJM_MAX_ROOMS
+# 10. Monday.com Upload über Outbox + Hintergrund-Worker (coolmatch_sync)
+# 11. PDF-Cache: unverändertes Angebot wird nicht neu gerendert/hochgeladen
+# 12. Warenkorb als Cart-Modell (coolmatch_cart) mit laufender Zwischensumme
+# 13. Summen in ganzen Cent (coolmatch_money) für Warenkorb, PDF und DB
+# 14. Preislisten-Versionen mit Diff zur Vorversion (coolmatch_catalog_history)
+# 15. Katalog-Abfragen über Adapter (coolmatch_catalog_store), optional
+#     indizierte DB-Tabellen statt DataFrame pro Worker (CATALOG_BACKEND)
 # ==========================================
 
 import streamlit as st
-import pandas as pd
 import os
 from datetime import datetime, timedelta
 
 # Import eigener Module
 from coolmatch_config import *
 from coolmatch_database import CoolMatchDatabase
-from coolmatch_monday import MondayIntegration, save_quote_to_monday_ui, render_monday_status
+from coolmatch_monday import MondayIntegration, render_monday_status
 from coolmatch_analytics import CoolMatchAnalytics
-from coolmatch_pdf import generate_pdf
+from coolmatch_pdf_cache import generate_pdf_cached
+from coolmatch_catalog import find_catalog_files, load_catalog
+from coolmatch_catalog_store import MemoryCatalog, build_memory_indexes, open_db_catalog
+from coolmatch_sync import get_sync_worker
+from coolmatch_cart import Cart
+from coolmatch_money import quote_totals
+from coolmatch_catalog_history import record_catalog_version, version_diff
+from coolmatch_repricing import reprice
 
 # ==========================================
 # DATA LOADER
 # ==========================================
 @st.cache_data
 def load_product_data():
-    """Lädt Samsung und Zubehör Daten"""
-    data = {'samsung': None, 'zubehoer': None, 'files_found': []}
-    
-    try:
-        data['files_found'] = os.listdir(os.getcwd())
-    except:
-        pass
+    """Lädt Samsung und Zubehör Daten (über Katalog-Snapshot, Excel nur wenn veraltet)"""
+    data = {'samsung': None, 'zubehoer': None, 'samsung_meta': None, 'files_found': []}
+
+    catalog_files = find_catalog_files()
+    data['files_found'] = catalog_files['files_found']
 
-    # Samsung Datei
-    samsung_files = [f for f in data['files_found'] 
-                     if any(kw in f for kw in SAMSUNG_FILE_KEYWORDS) and 'xlsx' in f]
-    
     # DEBUG: Zeige gefundene Dateien
-    if not samsung_files:
-        import streamlit as st
+    if not catalog_files['samsung']:
         st.warning(f"🔍 Suche Samsung-Datei mit Keywords: {SAMSUNG_FILE_KEYWORDS}")
         st.info(f"📁 Gefundene XLSX-Dateien: {[f for f in data['files_found'] if 'xlsx' in f.lower()]}")
-    
-    if samsung_files:
+    else:
         try:
-            data['samsung'] = pd.read_excel(samsung_files[0], engine='openpyxl')
-            data['samsung']['Artikelgruppe'] = data['samsung']['Artikelgruppe'].astype(str)
+            data['samsung'], data['samsung_meta'] = load_catalog(catalog_files['samsung'], 'samsung')
         except Exception as e:
-            import streamlit as st
             st.error(f"❌ Fehler beim Laden: {e}")
 
     # Zubehör Datei
-    zubehoer_files = [f for f in data['files_found'] 
-                      if any(kw in f.lower() for kw in ZUBEHOER_FILE_KEYWORDS) 
-                      and ('xls' in f or 'csv' in f)]
-    
-    if zubehoer_files:
-        zf = zubehoer_files[0]
-        df_raw = None
-        
+    if catalog_files['zubehoer']:
         try:
-            if zf.endswith('.csv'):
-                df_raw = pd.read_csv(zf, sep=None, engine='python')
-            else:
-                df_raw = pd.read_excel(zf, engine='openpyxl')
-        except:
-            try:
-                df_raw = pd.read_csv(zf, sep=None, engine='python')
-            except:
-                pass
-
-        if df_raw is not None and len(df_raw.columns) >= 5:
-            df_z = df_raw.iloc[:, [0, 1, 4]].copy()
-            df_z.columns = ['Artikel', 'Beschreibung', 'Preis']
-            df_z['Artikel'] = df_z['Artikel'].fillna("-").astype(str).str.replace(r'\.0$', '', regex=True)
-            df_z['Beschreibung'] = df_z['Beschreibung'].fillna("")
-            
-            if df_z['Preis'].dtype == object:
-                df_z['Preis'] = df_z['Preis'].astype(str).str.replace(',', '.', regex=False)
-            
-            df_z['Preis'] = pd.to_numeric(df_z['Preis'], errors='coerce').fillna(0.0)
-            data['zubehoer'] = df_z
-    
+            data['zubehoer'], _ = load_catalog(catalog_files['zubehoer'], 'zubehoer')
+        except Exception:
+            pass
+
     return data
 
+@st.cache_resource
+def load_catalog_store(_db):
+    """
+    Katalog-Adapter für System- und Zubehör-Tab - einmal pro Prozess, von allen Sessions geteilt.
+    "memory": DataFrame + Such-Indizes, "database": indizierte Tabellen (Import bei neuem Hash)
+    """
+    if CATALOG_BACKEND == "database":
+        return open_db_catalog(_db, find_catalog_files())
+
+    data = load_product_data()
+    return MemoryCatalog(data['samsung'], data['zubehoer'],
+                         build_memory_indexes(data['samsung'], data['zubehoer'], ZUBEHOER_SEARCH_INDEX),
+                         data['samsung_meta'])
+
+@st.cache_resource
+def register_catalog_version(_db, sha256, source):
+    """Preisliste einmal pro Inhalt als Version speichern → (Version, Diff zur Vorversion)"""
+    version = _db.get_catalog_version('samsung', sha256)
+    if version is not None:
+        return version, version_diff(_db, version)
+    # Neue Preisliste: DataFrame nur für den Import laden (nicht im Cache halten)
+    df_samsung, _ = load_catalog(find_catalog_files()['samsung'], 'samsung')
+    return record_catalog_version(_db, df_samsung, 'samsung', sha256, source)
+
+def render_catalog_changes(meta):
+    """Expander mit den Änderungen der aktuellen Preisliste gegenüber der Vorversion"""
+    if not meta or not meta.get('sha256'):
+        return
+    try:
+        _, diff = register_catalog_version(st.session_state.db, meta['sha256'], meta.get('source', ''))
+    except Exception as e:
+        st.caption(f"⚠️ Preislisten-Version nicht gespeichert: {e}")
+        return
+    if diff is None or diff.empty:
+        return
+
+    with st.expander(f"📋 Neue Preisliste: {diff.summary()}"):
+        if diff.old_version:
+            st.caption(f"Vorversion: {diff.old_version['quelle']} ({diff.old_version['importiert_am']})")
+        if not diff.changed.empty:
+            st.markdown("**💶 Preis geändert**")
+            st.dataframe(diff.changed, use_container_width=True, hide_index=True)
+        if not diff.added.empty:
+            st.markdown("**➕ Neu**")
+            st.dataframe(diff.added, use_container_width=True, hide_index=True)
+        if not diff.removed.empty:
+            st.markdown("**➖ Entfernt**")
+            st.dataframe(diff.removed, use_container_width=True, hide_index=True)
+
+        # Neubewertung nur für Angebote mit geänderten Artikeln
+        if diff.changed_articles and st.button("🔁 Offene Angebote neu bewerten"):
+            report = reprice(st.session_state.db, None, diff=diff)
+            st.caption(report.summary().replace("\n", "  \n"))
+            if not report.changed.empty:
+                st.dataframe(report.changed, use_container_width=True, hide_index=True)
+
 # ==========================================
 # HELPER FUNCTIONS
 # ==========================================
 def add_to_cart(typ, art_nr, bez, menge, preis, rabatt, note=""):
-    """Fügt Position zum Warenkorb hinzu"""
-    next_pos = 10
-    if st.session_state.cart:
-        try:
-            max_pos = max([item.get('Pos', 0) for item in st.session_state.cart])
-            next_pos = max_pos + 10
-        except:
-            pass
-        
-    st.session_state.cart.append({
-        "Pos": next_pos,
-        "Typ": typ,
-        "Artikel": str(art_nr).replace('.0', ''),
-        "Beschreibung": bez,
-        "Menge": float(menge),
-        "Einzelpreis": float(preis),
-        "Rabatt": float(rabatt),
-        "Notiz": note
-    })
+    """Fügt Position zum Warenkorb hinzu (Pos = höchste + 10)"""
+    st.session_state.cart.add(typ, str(art_nr).replace('.0', ''), bez,
+                              menge, preis, rabatt, note)
+
+def sync_cart_editor():
+    """Übernimmt Änderungen aus dem Warenkorb-Editor des letzten Laufs"""
+    key = st.session_state.get('cart_editor_key')
+    if key:
+        st.session_state.cart.apply_editor_changes(st.session_state.get(key))
 
 def generate_angebots_nr():
     """Generiert automatische Angebots-Nummer"""
@@ -136,8 +164,10 @@ def main():
         st.session_state.page_configured = True
 
     # Session State initialisieren
-    if 'cart' not in st.session_state:
-        st.session_state.cart = []
+    if not isinstance(st.session_state.get('cart'), Cart):
+        st.session_state.cart = Cart()
+    # Editor-Deltas vor allen anderen Änderungen (Sidebar, Hinzufügen) übernehmen
+    sync_cart_editor()
     
     if 'db' not in st.session_state:
         st.session_state.db = CoolMatchDatabase(DB_PATH)
@@ -148,6 +178,10 @@ def main():
     if 'monday' not in st.session_state:
         st.session_state.monday = MondayIntegration()
 
+    # Hintergrund-Sync zu Monday (ein Worker pro Prozess)
+    if st.session_state.monday.is_configured():
+        get_sync_worker(st.session_state.db, st.session_state.monday)
+
     # --- SIDEBAR ---
     with st.sidebar:
         # Original-Logo statt blaues Logo
@@ -189,8 +223,7 @@ def main():
             
             if st.button("Auf alle anwenden"):
                 if st.session_state.cart:
-                    for item in st.session_state.cart:
-                        item['Rabatt'] = global_rabatt
+                    st.session_state.cart.apply_rabatt(global_rabatt)
                     st.toast("✅ Rabatt aktualisiert!")
                     st.rerun()
 
@@ -213,6 +246,7 @@ def main():
         # Monday Status immer anzeigen
         st.divider()
         render_monday_status()
+        render_sync_status()
 
     # --- MAIN CONTENT ---
     if app_mode == "📝 Neues Angebot":
@@ -249,17 +283,19 @@ def render_quote_creator(mwst, validity, rabatt,
     </div>
     """, unsafe_allow_html=True)
 
-    # Produktdaten laden
-    db = load_product_data()
+    # Produktdaten (Adapter: Speicher oder DB-Tabellen)
+    catalog = load_catalog_store(st.session_state.db)
     
     # Status-Check
-    if db['samsung'] is None or db['zubehoer'] is None:
+    if not catalog.has_samsung or not catalog.has_zubehoer:
         with st.expander("⚠️ Status", expanded=True):
-            if db['samsung'] is None:
+            if not catalog.has_samsung:
                 st.error("❌ Samsung Datei fehlt.")
-            if db['zubehoer'] is None:
+            if not catalog.has_zubehoer:
                 st.error("❌ Zubehör Datei fehlt.")
 
+    render_catalog_changes(catalog.samsung_meta)
+
     # Closing Text initialisieren
     if 'closing_text' not in st.session_state:
         st.session_state.closing_text = get_closing_text_template(p_name)
@@ -273,11 +309,11 @@ def render_quote_creator(mwst, validity, rabatt,
 
     # === TAB 1: SYSTEM ===
     with tab_sys:
-        render_system_tab(db['samsung'], rabatt)
+        render_system_tab(catalog, rabatt)
 
     # === TAB 2: ZUBEHÖR ===
     with tab_zub:
-        render_zubehoer_tab(db['zubehoer'], rabatt)
+        render_zubehoer_tab(catalog, rabatt)
 
     # === TAB 3: WARENKORB ===
     with tab_cart:
@@ -287,10 +323,10 @@ def render_quote_creator(mwst, validity, rabatt,
 # ==========================================
 # TAB: SYSTEM
 # ==========================================
-def render_system_tab(df_samsung, default_rabatt):
+def render_system_tab(catalog, default_rabatt):
     """Samsung Systeme auswählen"""
     
-    if df_samsung is None:
+    if not catalog.has_samsung:
         st.warning("⚠️ Samsung Datei nicht gefunden")
         return
     
@@ -305,15 +341,11 @@ def render_system_tab(df_samsung, default_rabatt):
     
     # === SINGLE SPLIT & GEWERBE ===
     if "RAC" in sys_cat or "BAC" in sys_cat:
-        key = "S_RAC" if "RAC" in sys_cat else "S_BAC"
-        df_filtered = df_samsung[df_samsung['Artikelgruppe'].str.contains(key, na=False, case=False)]
+        system = "RAC" if "RAC" in sys_cat else "BAC"
         
-        # Suche
-        search_txt = st.text_input(f"🔍 Suche {key}:", "")
-        if search_txt:
-            df_filtered = df_filtered[df_filtered.apply(
-                lambda r: search_txt.lower() in str(r).lower(), axis=1
-            )]
+        # Suche (über Artikelnummer, Bezeichnung, Artikelgruppe)
+        search_txt = st.text_input(f"🔍 Suche S_{system}:", "")
+        df_filtered = catalog.system_sets(system, search_txt)
         
         if not df_filtered.empty:
             sel = st.selectbox(
@@ -337,17 +369,17 @@ def render_system_tab(df_samsung, default_rabatt):
     elif "FJM" in sys_cat:
         st.info("💡 Zuerst Außengerät, dann Innengeräte hinzufügen")
         
-        df_fjm = df_samsung[df_samsung['Artikelgruppe'].str.contains("S_FJM", na=False)]
-        df_ag = df_fjm[df_fjm['Bezeichnung'].str.contains("Außengerät|AG", case=False)]
-        df_ig = df_fjm[~df_fjm.index.isin(df_ag.index)]
+        def _formatter(df):
+            return lambda x: f"{df.at[x,'Artikelnummer']} | {df.at[x,'Bezeichnung']} | {df.at[x,'Listenpreis']:.2f}€"
         
         # Außengerät
-        if not df_ag.empty:
+        df_ag = catalog.fjm_outdoor()
+        if len(df_ag):
             st.markdown("#### 1️⃣ Außengerät")
             s_ag = st.selectbox(
                 "Außengerät:",
                 df_ag.index,
-                format_func=lambda x: f"{df_ag.loc[x,'Artikelnummer']} | {df_ag.loc[x,'Bezeichnung']} | {df_ag.loc[x,'Listenpreis']:.2f}€"
+                format_func=_formatter(df_ag)
             )
             
             if st.button("➕ Außengerät hinzufügen", type="primary"):
@@ -360,65 +392,37 @@ def render_system_tab(df_samsung, default_rabatt):
         # Innengeräte
         st.markdown("#### 2️⃣ Innengeräte")
         
-        for i in range(1, 6):
+        # Typ-Filter pro Raum - ALLE Samsung Typen (erster Typ = DEFAULT)
+        type_labels = list(FJM_IG_TYPES)
+        typ_options = [type_labels[0], "Alle"] + type_labels[1:]
+        
+        for i in range(1, FJM_MAX_ROOMS + 1):
             with st.expander(f"Raum {i}"):
-                # Typ-Filter pro Raum - ALLE Samsung Typen
                 typ_filter = st.selectbox(
                     f"Typ für Raum {i}:",
-                    ["Wandgerät Standard",  # DEFAULT!
-                     "Alle", 
-                     "Wandgerät Exklusiv", 
-                     "Wandgerät Premium", 
-                     "Wandgerät Elite",
-                     "Kanal", 
-                     "1-Way Kassette",
-                     "4-Way Kassette",
-                     "360° Kassette",
-                     "Mini-Kassette",
-                     "Truhengerät",
-                     "Konsolengerät"],
+                    typ_options,
                     key=f"typ_filter_{i}"
                 )
                 
-                # Filtern nach Typ (flexibel mit Mapping)
-                df_ig_filtered = df_ig.copy()
-                if typ_filter != "Alle":
-                    # Such-Begriffe pro Typ
-                    search_map = {
-                        "Wandgerät Standard": "Standard",
-                        "Wandgerät Exklusiv": "Exkl",
-                        "Wandgerät Premium": "Prem",
-                        "Wandgerät Elite": "Elite",
-                        "Kanal": "Kanal",
-                        "1-Way Kassette": "1-Way",
-                        "4-Way Kassette": "4-Way",
-                        "360° Kassette": "360",
-                        "Mini-Kassette": "Mini",
-                        "Truhengerät": "Truhe",
-                        "Konsolengerät": "Konsole"
-                    }
-                    
-                    search_term = search_map.get(typ_filter, typ_filter)
-                    df_ig_filtered = df_ig[
-                        df_ig['Bezeichnung'].str.contains(search_term, case=False, na=False)
-                    ]
+                # Vorberechnete Typ-Buckets bzw. Index auf ig_typ statt Kopie + Regex pro Raum
+                df_ig = catalog.fjm_indoor(None if typ_filter == "Alle" else typ_filter)
                 
-                if df_ig_filtered.empty:
+                if not len(df_ig):
                     st.warning(f"⚠️ Keine Geräte vom Typ '{typ_filter}' gefunden")
                     # DEBUG: Zeige alle verfügbaren Typen
                     if st.checkbox(f"🔍 Alle anzeigen", key=f"debug_{i}"):
-                        st.dataframe(df_ig[['Artikelnummer', 'Bezeichnung']].head(20))
+                        st.dataframe(catalog.fjm_indoor().head(20)[['Artikelnummer', 'Bezeichnung']])
                 else:
-                    st.info(f"✓ {len(df_ig_filtered)} Geräte gefunden")
+                    st.info(f"✓ {len(df_ig)} Geräte gefunden")
                     s_ig = st.selectbox(
                         f"Gerät auswählen:",
-                        df_ig_filtered.index,
+                        df_ig.index,
                         key=f"ig_select_{i}",
-                        format_func=lambda x: f"{df_ig_filtered.loc[x,'Artikelnummer']} | {df_ig_filtered.loc[x,'Bezeichnung']} | {df_ig_filtered.loc[x,'Listenpreis']:.2f}€"
+                        format_func=_formatter(df_ig)
                     )
                     
                     if st.button(f"➕ Raum {i} hinzufügen", key=f"ig_btn_{i}"):
-                        r = df_ig_filtered.loc[s_ig]
+                        r = df_ig.loc[s_ig]
                         add_to_cart("IG", r['Artikelnummer'], r['Bezeichnung'],
                                    1, r['Listenpreis'], default_rabatt, f"Raum {i}")
                         st.toast(f"✅ Raum {i} hinzugefügt!")
@@ -427,21 +431,16 @@ def render_system_tab(df_samsung, default_rabatt):
 # ==========================================
 # TAB: ZUBEHÖR
 # ==========================================
-def render_zubehoer_tab(df_zubehoer, default_rabatt):
+def render_zubehoer_tab(catalog, default_rabatt):
     """Zubehör und Montage"""
     
-    if df_zubehoer is None:
+    if not catalog.has_zubehoer:
         st.warning("⚠️ Zubehör-Datei nicht gefunden")
         return
     
-    # Suche
+    # Suche (beste Treffer zuerst: Trigramm-Index bzw. Ranking über die SQL-Treffer)
     search_z = st.text_input("🔍 Suche Montage/Zubehör:", "")
-    
-    df_filtered = df_zubehoer.copy()
-    if search_z:
-        df_filtered = df_filtered[df_filtered.astype(str).apply(
-            lambda x: x.str.contains(search_z, case=False)
-        ).any(axis=1)]
+    df_filtered = catalog.zubehoer(search_z)
     
     if df_filtered.empty:
         st.info("Keine Artikel gefunden")
@@ -482,48 +481,33 @@ def render_cart_tab(mwst, validity, p_firma, p_name, p_strasse, p_ort,
     
     st.subheader("🛒 Kalkulation & Abschluss")
     
-    if not st.session_state.cart:
+    cart = st.session_state.cart
+    if not cart:
         st.info("🛒 Warenkorb ist leer. Fügen Sie Produkte hinzu.")
         return
-    
-    # DataFrame erstellen
-    df_cart = pd.DataFrame(st.session_state.cart)
-    if "Pos" not in df_cart.columns:
-        df_cart["Pos"] = range(10, len(df_cart)*10 + 10, 10)
-    if "Rabatt" not in df_cart.columns:
-        df_cart["Rabatt"] = 0.0
-    
-    df_cart = df_cart.sort_values(by="Pos")
 
-    # Data Editor
-    edited_df = st.data_editor(
-        df_cart,
+    # Data Editor: Key pro Cart-Version → Deltas werden genau einmal übernommen
+    # (sync_cart_editor im nächsten Lauf), ohne Rebuild/Write-back bei jedem Rerun
+    editor_key = f"cart_editor_{cart.version}"
+    st.session_state.cart_editor_key = editor_key
+    st.data_editor(
+        cart.to_frame(),
         num_rows="dynamic",
         use_container_width=True,
-        key="cart_editor",
+        key=editor_key,
+        disabled=["Gesamt"],
         column_config={
             "Pos": st.column_config.NumberColumn(min_value=1, step=1, format="%d"),
             "Menge": st.column_config.NumberColumn(min_value=0, step=1, format="%d"),
             "Einzelpreis": st.column_config.NumberColumn(min_value=0.0, format="%.2f €"),
-            "Rabatt": st.column_config.NumberColumn(min_value=0.0, max_value=100.0, format="%.1f %%")
+            "Rabatt": st.column_config.NumberColumn(min_value=0.0, max_value=100.0, format="%.1f %%"),
+            "Gesamt": st.column_config.NumberColumn(format="%.2f €")
         }
     )
 
     # Berechnungen
     try:
-        calc_df = edited_df.copy()
-        if "Gesamt" in calc_df.columns:
-            calc_df = calc_df.drop(columns=["Gesamt"])
-        
-        calc_df['Menge'] = pd.to_numeric(calc_df['Menge'], errors='coerce').fillna(0)
-        calc_df['Einzelpreis'] = pd.to_numeric(calc_df['Einzelpreis'], errors='coerce').fillna(0)
-        calc_df['Rabatt'] = pd.to_numeric(calc_df['Rabatt'], errors='coerce').fillna(0)
-        calc_df['Gesamt'] = calc_df['Menge'] * (calc_df['Einzelpreis'] * (1 - calc_df['Rabatt']/100))
-        
-        # Zurück in Session State
-        st.session_state.cart = calc_df.sort_values(by="Pos").to_dict('records')
-        
-        zwischensumme = calc_df['Gesamt'].sum()
+        calc_df = cart.to_frame()
 
         st.markdown("---")
         
@@ -561,34 +545,25 @@ def render_cart_tab(mwst, validity, p_firma, p_name, p_strasse, p_ort,
         with col_R:
             st.markdown("#### 💰 Vorschau")
             
+            # Eine Rechnung in ganzen Cent für Vorschau, PDF und DB
+            totals = quote_totals(cart.subtotal_cents, mwst, endrabatt_proz, endrabatt_abs,
+                                  manual_brutto if manual_active else None)
+            fin = totals.financial_data()
+            
             if manual_active:
-                st.markdown(f"**Pauschal (Brutto): {manual_brutto:,.2f} €**")
-                netto_final = manual_brutto / (1 + mwst/100)
-                ust_wert = manual_brutto - netto_final
-                st.write(f"Netto: {netto_final:,.2f} €")
-                st.write(f"MwSt: {ust_wert:,.2f} €")
-                fin_net = netto_final
-                fin_ust = ust_wert
-                fin_brut = manual_brutto
+                st.markdown(f"**Pauschal (Brutto): {fin['brutto']:,.2f} €**")
+                st.write(f"Netto: {fin['netto']:,.2f} €")
+                st.write(f"MwSt: {fin['ust']:,.2f} €")
             else:
-                rab_p = zwischensumme * (endrabatt_proz / 100)
-                netto_final = zwischensumme - rab_p - endrabatt_abs
-                ust_wert = netto_final * (mwst / 100)
-                brutto_final = netto_final + ust_wert
-                
-                st.write(f"Summe: {zwischensumme:,.2f} €")
+                st.write(f"Summe: {fin['zwischensumme']:,.2f} €")
                 if endrabatt_proz > 0:
-                    st.write(f"- {endrabatt_proz}%: {rab_p:,.2f} €")
+                    st.write(f"- {endrabatt_proz}%: {fin['rabatt_betrag']:,.2f} €")
                 if endrabatt_abs > 0:
-                    st.write(f"- Pauschal: {endrabatt_abs:,.2f} €")
+                    st.write(f"- Pauschal: {fin['rabatt_abs']:,.2f} €")
                 st.markdown("---")
-                st.write(f"Netto: {netto_final:,.2f} €")
-                st.write(f"MwSt {mwst}%: {ust_wert:,.2f} €")
-                st.markdown(f"### 💸 Gesamt: {brutto_final:,.2f} €")
-                
-                fin_net = netto_final
-                fin_ust = ust_wert
-                fin_brut = brutto_final
+                st.write(f"Netto: {fin['netto']:,.2f} €")
+                st.write(f"MwSt {mwst}%: {fin['ust']:,.2f} €")
+                st.markdown(f"### 💸 Gesamt: {fin['brutto']:,.2f} €")
 
         st.markdown("---")
         
@@ -599,23 +574,20 @@ def render_cart_tab(mwst, validity, p_firma, p_name, p_strasse, p_ort,
             if st.button("📄 PDF Angebot", type="primary", use_container_width=True):
                 create_pdf_and_save(
                     calc_df, p_firma, p_name, p_strasse, p_ort, p_email, p_tel, p_agb,
-                    c_name, c_ref, c_nr, mwst, validity,
-                    zwischensumme, endrabatt_proz, endrabatt_abs,
-                    fin_net, fin_ust, fin_brut,
+                    c_name, c_ref, c_nr, validity, fin,
                     manual_active, hide_prices
                 )
         
         with col2:
             if st.button("💾 In DB speichern", use_container_width=True):
                 save_to_database(
-                    c_name, c_ref, c_nr, p_name, p_firma, validity,
-                    fin_net, fin_brut, mwst, endrabatt_proz, endrabatt_abs,
-                    manual_active, hide_prices, st.session_state.cart
+                    c_name, c_ref, c_nr, p_name, p_firma, validity, fin,
+                    manual_active, hide_prices, cart.to_records()
                 )
         
         with col3:
             if st.button("🗑️ Korb leeren", use_container_width=True):
-                st.session_state.cart = []
+                cart.clear()
                 st.rerun()
             
     except Exception as e:
@@ -625,10 +597,9 @@ def render_cart_tab(mwst, validity, p_firma, p_name, p_strasse, p_ort,
 # PDF & SPEICHERN
 # ==========================================
 def create_pdf_and_save(calc_df, p_firma, p_name, p_strasse, p_ort, p_email, p_tel, p_agb,
-                       c_name, c_ref, c_nr, mwst, validity,
-                       zwischensumme, rab_proz, rab_abs,
-                       netto, ust, brutto, manual_active, hide_prices):
-    """Erstellt PDF und bietet Download an"""
+                       c_name, c_ref, c_nr, validity, financial_data,
+                       manual_active, hide_prices):
+    """Erstellt PDF und bietet Download an (financial_data aus QuoteTotals)"""
     
     try:
         # Partner & Kunde Daten
@@ -650,22 +621,13 @@ def create_pdf_and_save(calc_df, p_firma, p_name, p_strasse, p_ort, p_email, p_t
             'bearbeiter': p_name
         }
         
-        financial_data = {
-            'zwischensumme': zwischensumme,
-            'rabatt_proz': rab_proz,
-            'rabatt_abs': rab_abs,
-            'netto': netto,
-            'ust': ust,
-            'brutto': brutto
-        }
-        
         options = {
             'manual_active': manual_active,
             'hide_prices': hide_prices
         }
         
-        # PDF generieren
-        pdf_bytes = generate_pdf(
+        # PDF generieren (oder unverändert aus dem Cache)
+        pdf_bytes, pdf_hash, from_cache = generate_pdf_cached(
             calc_df, partner_data, customer_data,
             financial_data, options, st.session_state.closing_text
         )
@@ -679,36 +641,46 @@ def create_pdf_and_save(calc_df, p_firma, p_name, p_strasse, p_ort, p_email, p_t
             use_container_width=True
         )
         
-        st.success("✅ PDF erfolgreich erstellt!")
+        st.success("✅ PDF erfolgreich erstellt!" + (" (aus Cache)" if from_cache else ""))
         
         # Automatisch zu Monday.com senden (wenn konfiguriert)
         if st.session_state.monday.is_configured():
             monday_data = {
                 'angebots_nr': c_nr,
                 'datum': datetime.now(),
-                'angebotswert': brutto,
+                'angebotswert': financial_data['brutto'],
                 'partner': p_firma,
                 'plz': extract_plz(p_ort)
             }
             
-            # Sende zu Monday mit PDF
-            with st.spinner("📤 Sende zu Monday.com..."):
-                success, item_id = st.session_state.monday.save_quote_to_monday(
-                    monday_data,
-                    pdf_bytes,
-                    f"AN_{c_nr}.pdf"
-                )
-            
-            if success:
-                st.success(f"✅ Auch in Monday.com gespeichert! (Item ID: {item_id})")
+            # Identisches PDF schon gesendet/in Warteschlange → nicht doppelt hochladen
+            if st.session_state.db.find_monday_job(c_nr, pdf_hash):
+                st.info("ℹ️ Unverändertes Angebot - bereits an Monday.com übergeben")
             else:
-                st.warning("⚠️ Monday.com Upload fehlgeschlagen - PDF wurde trotzdem erstellt")
+                # In die Outbox → Upload läuft im Hintergrund, PDF ist sofort verfügbar
+                st.session_state.db.enqueue_monday_sync(c_nr, monday_data, pdf_bytes,
+                                                        f"AN_{c_nr}.pdf", pdf_hash)
+                get_sync_worker(st.session_state.db, st.session_state.monday).wake()
+                st.info("📤 Monday.com Upload läuft im Hintergrund")
         
     except Exception as e:
         st.error(f"❌ PDF-Fehler: {e}")
 
-def save_to_database(c_name, c_ref, c_nr, bearbeiter, firma, validity,
-                    netto, brutto, mwst, rab_proz, rab_abs,
+def render_sync_status():
+    """Offene / fehlgeschlagene Monday-Uploads aus der Outbox"""
+    stats = st.session_state.db.get_monday_outbox_stats()
+    pending = stats.get('pending', 0)
+    failed = stats.get('failed', 0)
+    if pending:
+        st.caption(f"📤 {pending} Upload(s) in Warteschlange")
+    if failed:
+        st.warning(f"⚠️ {failed} Upload(s) fehlgeschlagen")
+        if st.button("🔁 Erneut versuchen"):
+            st.session_state.db.retry_failed_monday_jobs()
+            get_sync_worker(st.session_state.db, st.session_state.monday).wake()
+            st.rerun()
+
+def save_to_database(c_name, c_ref, c_nr, bearbeiter, firma, validity, financial_data,
                     manual_active, hide_prices, cart):
     """Speichert Angebot in Datenbank"""
     
@@ -723,11 +695,11 @@ def save_to_database(c_name, c_ref, c_nr, bearbeiter, firma, validity,
             'gueltig_bis': valid_until,
             'bearbeiter': bearbeiter,
             'firma': firma,
-            'summe_netto': netto,
-            'summe_brutto': brutto,
-            'mwst_satz': mwst,
-            'rabatt_prozent': rab_proz,
-            'rabatt_absolut': rab_abs,
+            'summe_netto': financial_data['netto'],
+            'summe_brutto': financial_data['brutto'],
+            'mwst_satz': financial_data['mwst'],
+            'rabatt_prozent': financial_data['rabatt_proz'],
+            'rabatt_absolut': financial_data['rabatt_abs'],
             'manual_preis': manual_active,
             'preise_verborgen': hide_prices,
             'status': 'Erstellt',
@@ -13,6 +13,9 @@ from datetime import datetime, timedelta
 from coolmatch_database import CoolMatchDatabase
 from coolmatch_config import COLOR_BLUE_HEX, COLOR_DARK_GRAY, COLOR_BLUE
 
+# Treffer pro Seite in der Angebots-Historie
+HISTORY_PAGE_SIZE = 50
+
 class CoolMatchAnalytics:
     """Erstellt interaktive Dashboards und Visualisierungen"""
     
@@ -214,6 +217,7 @@ class CoolMatchAnalytics:
             search_term = st.text_input("🔍 Suche nach Kunde, Projekt, Angebots-Nr...", "")
         with col2:
             if st.button("🔄 Aktualisieren", use_container_width=True):
+                st.session_state.history_cursors = [None]
                 st.rerun()
         with col3:
             if st.button("📥 Export Excel", use_container_width=True):
@@ -226,9 +230,26 @@ class CoolMatchAnalytics:
         
         # Daten laden
         if search_term:
-            df_quotes = self.db.search_quotes(search_term)
+            seite = st.number_input("Seite", min_value=1, value=1, step=1, key="history_search_page")
+            df_quotes = self.db.search_quotes(
+                search_term, limit=HISTORY_PAGE_SIZE, offset=(seite - 1) * HISTORY_PAGE_SIZE
+            )
         else:
-            df_quotes = self.db.get_all_quotes(limit=100)
+            # Keyset-Pagination: Stapel der Cursor aller bisher geöffneten Seiten
+            cursors = st.session_state.setdefault('history_cursors', [None])
+            df_quotes, next_cursor = self.db.get_quotes_page(cursors[-1], limit=HISTORY_PAGE_SIZE)
+            
+            col_prev, col_info, col_next = st.columns([1, 3, 1])
+            with col_prev:
+                if st.button("◀ Zurück", disabled=len(cursors) == 1, use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            with col_info:
+                st.caption(f"Seite {len(cursors)} · {self.db.get_quote_count():,} Angebote gesamt")
+            with col_next:
+                if st.button("Weiter ▶", disabled=next_cursor is None, use_container_width=True):
+                    cursors.append(next_cursor)
+                    st.rerun()
         
         if df_quotes.empty:
             st.info("Keine Angebote gefunden")
@@ -246,7 +267,7 @@ class CoolMatchAnalytics:
         ]
         
         display_df['Erstellt'] = pd.to_datetime(display_df['Erstellt']).dt.strftime('%d.%m.%Y')
-        display_df['Summe (€)'] = display_df['Summe (€)'].apply(lambda x: f"{x:,.2f}")
+        display_df['Summe (€)'] = display_df['Summe (€)'].fillna(0).map('{:,.2f}'.format)
         
         st.dataframe(
             display_df,
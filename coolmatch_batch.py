@@ -0,0 +1,168 @@
+# ==========================================
+# DATEI: coolmatch_batch.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Stapel-Erzeugung von Angebots-PDFs
+#   - Angebote + Positionen blockweise aus der DB (IN-Abfragen)
+#   - Rendern parallel über alle Kerne (ProcessPoolExecutor)
+#   - Ausgabe als ZIP-Stream, Durchsatz in PDFs/s
+#   - CLI: python coolmatch_batch.py AN-2026-0001 ... | --all | --status Erstellt
+# ==========================================
+
+import argparse
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+import pandas as pd
+
+from coolmatch_config import DEFAULT_MWST, DEFAULT_PARTNER
+from coolmatch_database import CoolMatchDatabase
+from coolmatch_money import percent_of, to_cents, to_euro
+from coolmatch_pdf import generate_pdf, warm_pdf_cache
+
+
+@dataclass
+class BatchReport:
+    """Ergebnis eines Stapellaufs"""
+    rendered: int = 0
+    missing: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    bytes_written: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pdfs_per_second(self) -> float:
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.rendered} PDFs in {self.seconds:.1f}s ({self.pdfs_per_second:.1f} PDFs/s, "
+                f"{self.bytes_written / 1024 / 1024:.1f} MB) - "
+                f"{len(self.missing)} nicht gefunden, {len(self.failed)} Fehler")
+
+
+def _de_date(value) -> str:
+    """'2026-02-20 10:15:00' / '2026-02-20' → '20.02.2026'"""
+    if not value:
+        return ""
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").strftime("%d.%m.%Y")
+    except ValueError:
+        return str(value)
+
+
+def quote_to_pdf_args(quote: Dict) -> Tuple:
+    """DB-Angebot (get_quotes_bulk) → Argumente für generate_pdf"""
+    h = quote['header']
+    calc_df = pd.DataFrame([{
+        'Pos': p['position_nr'], 'Typ': p['typ'], 'Artikel': p['artikel_nr'] or '',
+        'Beschreibung': p['beschreibung'] or '', 'Menge': p['menge'] or 0,
+        'Einzelpreis': p['einzelpreis'] or 0, 'Rabatt': p['rabatt'] or 0, 'Gesamt': p['gesamt'] or 0,
+    } for p in quote['positions']], columns=['Pos', 'Typ', 'Artikel', 'Beschreibung', 'Menge',
+                                             'Einzelpreis', 'Rabatt', 'Gesamt'])
+
+    # Adresse/Kontakt des Partners ist nicht in der DB → Standard-Partner, Firma aus dem Angebot
+    partner_data = {**DEFAULT_PARTNER, 'firma': h['firma'] or DEFAULT_PARTNER['firma']}
+    customer_data = {
+        'name': h['kunde_name'] or '',
+        'projekt': h['kunde_projekt'] or '',
+        'nr': h['angebots_nr'],
+        'datum': _de_date(h['erstellt_am']),
+        'gueltig_bis': _de_date(h['gueltig_bis']),
+        'bearbeiter': h['bearbeiter'] or '',
+    }
+    # Summen wie gespeichert; Zwischensumme/Rabattbetrag in ganzen Cent nachgerechnet
+    netto = to_cents([h['summe_netto'] or 0])[0]
+    brutto = to_cents([h['summe_brutto'] or 0])[0]
+    zwischensumme = int(to_cents(calc_df['Gesamt']).sum())
+    rabatt_proz = h['rabatt_prozent'] or 0
+    financial_data = {
+        'zwischensumme': to_euro(zwischensumme),
+        'rabatt_proz': rabatt_proz,
+        'rabatt_betrag': to_euro(percent_of(zwischensumme, rabatt_proz)),
+        'rabatt_abs': h['rabatt_absolut'] or 0,
+        'netto': to_euro(netto),
+        'ust': to_euro(brutto - netto),
+        'brutto': to_euro(brutto),
+        'mwst': h['mwst_satz'] if h['mwst_satz'] is not None else DEFAULT_MWST,
+    }
+    options = {'manual_active': bool(h['manual_preis']), 'hide_prices': bool(h['preise_verborgen'])}
+    return calc_df, partner_data, customer_data, financial_data, options, h['closing_text'] or ''
+
+
+def _render(job: Tuple[str, Tuple]) -> Tuple[str, bytes, str]:
+    """Läuft im Worker-Prozess → (angebots_nr, pdf_bytes, fehler)"""
+    nr, args = job
+    try:
+        return nr, generate_pdf(*args), ""
+    except Exception as e:
+        return nr, b"", str(e)
+
+
+def render_batch(db: CoolMatchDatabase, angebots_nrs: List[str], out: Union[str, BinaryIO],
+                 workers: int = None, load_chunk: int = 200) -> BatchReport:
+    """
+    Rendert alle Angebote parallel und schreibt sie als AN_<nr>.pdf in ein ZIP (Pfad oder
+    Datei-Objekt). Die DB wird blockweise gelesen, PDFs werden sofort ins ZIP geschrieben.
+    """
+    report = BatchReport()
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    # PDFs sind bereits komprimiert → ZIP ohne Deflate
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf, \
+            ProcessPoolExecutor(max_workers=workers, initializer=warm_pdf_cache) as pool:
+        for i in range(0, len(angebots_nrs), load_chunk):
+            block = angebots_nrs[i:i + load_chunk]
+            quotes = db.get_quotes_bulk(block)
+            jobs = []
+            for nr in block:
+                if nr in quotes:
+                    jobs.append((nr, quote_to_pdf_args(quotes[nr])))
+                else:
+                    report.missing.append(nr)
+            chunksize = max(1, len(jobs) // (workers * 4))
+            for nr, pdf_bytes, error in pool.map(_render, jobs, chunksize=chunksize):
+                if error:
+                    report.failed[nr] = error
+                    continue
+                zf.writestr(f"AN_{nr}.pdf", pdf_bytes)
+                report.rendered += 1
+                report.bytes_written += len(pdf_bytes)
+
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+# ==========================================
+# CLI
+# ==========================================
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Angebots-PDFs im Stapel erzeugen (ZIP)")
+    parser.add_argument("angebots_nr", nargs="*", help="Angebotsnummern")
+    parser.add_argument("--all", action="store_true", help="alle Angebote")
+    parser.add_argument("--status", help="nur Angebote mit diesem Status")
+    parser.add_argument("--out", default="angebote.zip", help="Ziel-ZIP (Default: angebote.zip)")
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Default: alle Kerne)")
+    args = parser.parse_args(argv)
+
+    db = CoolMatchDatabase()
+    nrs = list(args.angebots_nr)
+    if args.all or args.status:
+        nrs += db.get_quote_numbers(args.status)
+    if not nrs:
+        parser.error("keine Angebote gewählt (Nummern, --all oder --status)")
+
+    report = render_batch(db, list(dict.fromkeys(nrs)), args.out, workers=args.workers)
+    print(f"✅ {args.out}: {report.summary()}")
+    for nr, error in report.failed.items():
+        print(f"❌ {nr}: {error}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+# ==========================================
+# DATEI: coolmatch_cart.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Warenkorb-Modell für die Angebotserstellung
+#   - Positionen als kompakte CartItem-Objekte (__slots__)
+#   - laufende Zwischensumme (Cent) + höchste Pos → Änderung einer Zeile in O(1)
+#   - Positionssummen über coolmatch_money (ganze Cent, kaufmännisch gerundet)
+#   - Versionszähler: DataFrame/Records nur nach Änderungen neu aufbauen
+#   - Übernahme der Data-Editor-Deltas (edited/added/deleted rows)
+# ==========================================
+
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from coolmatch_money import line_total, line_totals, to_euro
+
+# Spalten in Editor, PDF und DB (save_quote)
+CART_COLUMNS = ["Pos", "Typ", "Artikel", "Beschreibung", "Menge",
+                "Einzelpreis", "Rabatt", "Notiz", "Gesamt"]
+
+# Editor-Spalte → CartItem-Attribut
+_FIELDS = {"Pos": "pos", "Typ": "typ", "Artikel": "artikel", "Beschreibung": "beschreibung",
+           "Menge": "menge", "Einzelpreis": "einzelpreis", "Rabatt": "rabatt", "Notiz": "notiz"}
+_NUMERIC = {"menge", "einzelpreis", "rabatt"}
+
+POS_STEP = 10
+
+
+def _num(value) -> float:
+    """Wie pd.to_numeric(errors='coerce').fillna(0) für einen Einzelwert"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+
+def _text(value) -> str:
+    return "" if value is None or value != value else str(value)
+
+
+class CartItem:
+    """Eine Warenkorb-Position; die Summe (Cent) wird bei jeder Änderung mitgeführt"""
+
+    __slots__ = ("pos", "typ", "artikel", "beschreibung", "menge",
+                 "einzelpreis", "rabatt", "notiz", "cents")
+
+    def __init__(self, pos: int, typ: str, artikel: str, beschreibung: str,
+                 menge: float, einzelpreis: float, rabatt: float, notiz: str = ""):
+        self.pos = int(pos)
+        self.typ = typ
+        self.artikel = artikel
+        self.beschreibung = beschreibung
+        self.menge = _num(menge)
+        self.einzelpreis = _num(einzelpreis)
+        self.rabatt = _num(rabatt)
+        self.notiz = notiz
+        self.cents = self.line_total()
+
+    def line_total(self) -> int:
+        return line_total(self.menge, self.einzelpreis, self.rabatt)
+
+    @property
+    def gesamt(self) -> float:
+        return to_euro(self.cents)
+
+    def to_record(self) -> Dict:
+        return {"Pos": self.pos, "Typ": self.typ, "Artikel": self.artikel,
+                "Beschreibung": self.beschreibung, "Menge": self.menge,
+                "Einzelpreis": self.einzelpreis, "Rabatt": self.rabatt,
+                "Notiz": self.notiz, "Gesamt": self.gesamt}
+
+
+class Cart:
+    """
+    Warenkorb mit laufender Zwischensumme.
+    Jede Änderung erhöht `version`; to_frame()/to_records() sind bis zur nächsten
+    Änderung gecacht → Reruns ohne Bearbeitung kosten nichts.
+    """
+
+    def __init__(self):
+        self._items: List[CartItem] = []     # sortiert nach pos
+        self._subtotal = 0                   # Cent
+        self._max_pos = 0
+        self.version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._records: Optional[List[Dict]] = None
+
+    # ------------------------------------------
+    # Lesen
+    # ------------------------------------------
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[CartItem]:
+        return iter(self._items)
+
+    @property
+    def subtotal(self) -> float:
+        return to_euro(self._subtotal)
+
+    @property
+    def subtotal_cents(self) -> int:
+        return self._subtotal
+
+    @property
+    def max_pos(self) -> int:
+        return self._max_pos
+
+    @property
+    def next_pos(self) -> int:
+        return self._max_pos + POS_STEP
+
+    def to_records(self) -> List[Dict]:
+        """Positionen als Dicts (save_quote); gecacht bis zur nächsten Änderung"""
+        if self._records is None:
+            self._records = [item.to_record() for item in self._items]
+        return self._records
+
+    def to_frame(self) -> pd.DataFrame:
+        """Positionen als DataFrame (Editor, PDF); gecacht bis zur nächsten Änderung"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.to_records(), columns=CART_COLUMNS)
+        return self._frame
+
+    # ------------------------------------------
+    # Ändern
+    # ------------------------------------------
+    def _touch(self, resort: bool = False):
+        if resort:
+            self._items.sort(key=lambda item: item.pos)
+        self.version += 1
+        self._frame = None
+        self._records = None
+
+    def add(self, typ: str, artikel: str, beschreibung: str, menge: float,
+            einzelpreis: float, rabatt: float, notiz: str = "", pos: int = None) -> CartItem:
+        """Hängt eine Position an (Pos = höchste + 10, wenn nicht angegeben)"""
+        item = CartItem(self.next_pos if pos is None else pos, typ, artikel, beschreibung,
+                        menge, einzelpreis, rabatt, notiz)
+        resort = bool(self._items) and item.pos < self._items[-1].pos
+        self._items.append(item)
+        self._subtotal += item.cents
+        self._max_pos = max(self._max_pos, item.pos)
+        self._touch(resort)
+        return item
+
+    def update(self, index: int, changes: Dict):
+        """Ändert Felder der Position `index` (Editor-Spaltennamen) → Summe per Delta"""
+        self._update(self._items[index], changes)
+        self._touch(resort="Pos" in changes)
+
+    def _update(self, item: CartItem, changes: Dict):
+        old_total, old_pos = item.cents, item.pos
+        for col, value in changes.items():
+            attr = _FIELDS.get(col)
+            if attr is None:
+                continue                     # z.B. "Gesamt" ist berechnet
+            if attr in _NUMERIC:
+                value = _num(value)
+            elif attr == "pos":
+                value = int(_num(value))
+            else:
+                value = _text(value)
+            setattr(item, attr, value)
+        item.cents = item.line_total()
+        self._subtotal += item.cents - old_total
+        if item.pos > self._max_pos:
+            self._max_pos = item.pos
+        elif old_pos == self._max_pos and item.pos < old_pos:
+            self._max_pos = max(i.pos for i in self._items)
+
+    def remove(self, indexes) -> None:
+        """Entfernt Positionen (Indizes in Pos-Reihenfolge)"""
+        drop = set(indexes)
+        if not drop:
+            return
+        removed = [self._items[i] for i in drop]
+        self._items = [item for i, item in enumerate(self._items) if i not in drop]
+        self._subtotal -= sum(item.cents for item in removed)
+        if any(item.pos == self._max_pos for item in removed):
+            self._max_pos = max((item.pos for item in self._items), default=0)
+        self._touch()
+
+    def apply_rabatt(self, rabatt: float):
+        """Ein Rabatt für alle Positionen (Sidebar 'Auf alle anwenden')"""
+        rabatt = _num(rabatt)
+        cents = line_totals([item.menge for item in self._items],
+                            [item.einzelpreis for item in self._items],
+                            [rabatt] * len(self._items))
+        for item, value in zip(self._items, cents.tolist()):
+            item.rabatt = rabatt
+            item.cents = value
+        self._subtotal = int(cents.sum())
+        self._touch()
+
+    def clear(self):
+        self._items = []
+        self._subtotal = 0
+        self._max_pos = 0
+        self._touch()
+
+    def apply_editor_changes(self, changes: Optional[Dict]) -> bool:
+        """
+        Übernimmt den Zustand von st.data_editor (edited_rows / added_rows / deleted_rows).
+        Zeilenindizes beziehen sich auf to_frame() der Version, mit der der Editor
+        gerendert wurde. Jede nicht-leere Änderung erhöht die Version → der Editor
+        bekommt einen neuen Key und dieselben Deltas werden nicht erneut angewendet.
+        """
+        if not changes:
+            return False
+        edited = changes.get("edited_rows") or {}
+        added = changes.get("added_rows") or []
+        deleted = changes.get("deleted_rows") or []
+        if not (edited or added or deleted):
+            return False
+
+        # Indizes zuerst gegen die gerenderte Reihenfolge auflösen
+        snapshot = list(self._items)
+        for index, row in edited.items():
+            index = int(index)
+            if 0 <= index < len(snapshot):
+                self._update(snapshot[index], row)
+        if deleted:
+            drop = {id(snapshot[i]) for i in deleted if 0 <= i < len(snapshot)}
+            removed = [item for item in self._items if id(item) in drop]
+            self._items = [item for item in self._items if id(item) not in drop]
+            self._subtotal -= sum(item.cents for item in removed)
+            self._max_pos = max((item.pos for item in self._items), default=0)
+        for row in added:
+            item = CartItem(int(_num(row.get("Pos"))) or self.next_pos,
+                            _text(row.get("Typ")), _text(row.get("Artikel")),
+                            _text(row.get("Beschreibung")), row.get("Menge"),
+                            row.get("Einzelpreis"), row.get("Rabatt"), _text(row.get("Notiz")))
+            self._items.append(item)
+            self._subtotal += item.cents
+            self._max_pos = max(self._max_pos, item.pos)
+        self._touch(resort=True)
+        return True
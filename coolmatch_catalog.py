@@ -0,0 +1,269 @@
+# ==========================================
+# DATEI: coolmatch_catalog.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Katalog-Compiler für Samsung- und Zubehör-Preislisten
+#   - Excel wird einmal geparst und als Feather-Snapshot abgelegt
+#   - Snapshot ist an mtime + SHA-256 der Quelldatei gebunden
+#   - Laden per Memory-Mapping, Excel nur wenn Snapshot veraltet
+# ==========================================
+
+import os
+import json
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from coolmatch_config import (CATALOG_CACHE_DIR, SAMSUNG_FILE_KEYWORDS, ZUBEHOER_FILE_KEYWORDS,
+                              FJM_IG_TYPES)
+from coolmatch_search import FIELD_SEP
+
+# Bei Änderungen am Parsing erhöhen → alle Snapshots (und DB-Kataloge) werden neu kompiliert
+CATALOG_SCHEMA_VERSION = 3
+
+
+# ==========================================
+# DATEIEN FINDEN
+# ==========================================
+def find_catalog_files(directory: str = None) -> Dict:
+    """Sucht Samsung- und Zubehör-Datei im Arbeitsverzeichnis"""
+    directory = directory or os.getcwd()
+    result = {'samsung': None, 'zubehoer': None, 'files_found': []}
+
+    try:
+        result['files_found'] = os.listdir(directory)
+    except OSError:
+        return result
+
+    samsung_files = [f for f in result['files_found']
+                     if any(kw in f for kw in SAMSUNG_FILE_KEYWORDS) and 'xlsx' in f]
+    zubehoer_files = [f for f in result['files_found']
+                      if any(kw in f.lower() for kw in ZUBEHOER_FILE_KEYWORDS)
+                      and ('xls' in f or 'csv' in f)]
+
+    if samsung_files:
+        result['samsung'] = os.path.join(directory, samsung_files[0])
+    if zubehoer_files:
+        result['zubehoer'] = os.path.join(directory, zubehoer_files[0])
+    return result
+
+
+# ==========================================
+# EXCEL PARSER (langsamer Pfad)
+# ==========================================
+def read_samsung_excel(path: str) -> pd.DataFrame:
+    """Parst die Samsung Preisliste"""
+    df = pd.read_excel(path, engine='openpyxl')
+    df['Artikelgruppe'] = df['Artikelgruppe'].astype(str)
+    return df
+
+
+def read_zubehoer_file(path: str) -> Optional[pd.DataFrame]:
+    """Parst die Zubehör-Liste (Excel oder CSV) → Artikel, Beschreibung, Preis, Suchtext"""
+    df_raw = None
+    try:
+        if path.endswith('.csv'):
+            df_raw = pd.read_csv(path, sep=None, engine='python')
+        else:
+            df_raw = pd.read_excel(path, engine='openpyxl')
+    except Exception:
+        try:
+            df_raw = pd.read_csv(path, sep=None, engine='python')
+        except Exception:
+            pass
+
+    if df_raw is None or len(df_raw.columns) < 5:
+        return None
+
+    df_z = df_raw.iloc[:, [0, 1, 4]].copy()
+    df_z.columns = ['Artikel', 'Beschreibung', 'Preis']
+    df_z['Artikel'] = df_z['Artikel'].fillna("-").astype(str).str.replace(r'\.0$', '', regex=True)
+    df_z['Beschreibung'] = df_z['Beschreibung'].fillna("")
+
+    if df_z['Preis'].dtype == object:
+        df_z['Preis'] = df_z['Preis'].astype(str).str.replace(',', '.', regex=False)
+
+    df_z['Preis'] = pd.to_numeric(df_z['Preis'], errors='coerce').fillna(0.0)
+
+    # Vorberechneter Suchschlüssel (klein geschrieben) → keine Kopie/Regex pro Suche
+    df_z['Suchtext'] = (df_z['Artikel'] + FIELD_SEP + df_z['Beschreibung'].astype(str)).str.lower()
+    return df_z
+
+
+_READERS = {
+    'samsung': read_samsung_excel,
+    'zubehoer': read_zubehoer_file,
+}
+
+
+# ==========================================
+# SNAPSHOT
+# ==========================================
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _snapshot_paths(kind: str) -> Tuple[str, str]:
+    return (os.path.join(CATALOG_CACHE_DIR, f"{kind}.feather"),
+            os.path.join(CATALOG_CACHE_DIR, f"{kind}.json"))
+
+
+def _read_meta(meta_path: str) -> Optional[Dict]:
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: str, write_fn):
+    """Schreibt über Temp-Datei + os.replace → parallele Worker lesen nie halbe Dateien"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame → Arrow; gemischte object-Spalten (z.B. Zahl + Text) werden zu Text"""
+    df = df.reset_index(drop=True)
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _source_stat(path: str) -> Dict:
+    st_ = os.stat(path)
+    return {'source': os.path.basename(path), 'mtime_ns': st_.st_mtime_ns, 'size': st_.st_size}
+
+
+def compile_catalog(source_path: str, kind: str) -> Tuple[Optional[pd.DataFrame], Dict]:
+    """Parst die Quelldatei und schreibt den Snapshot (Feather, unkomprimiert für mmap)"""
+    df = _READERS[kind](source_path)
+    meta = _source_stat(source_path)
+    meta['sha256'] = file_sha256(source_path)
+    meta['schema'] = CATALOG_SCHEMA_VERSION
+    if df is None:
+        return None, meta
+
+    data_path, meta_path = _snapshot_paths(kind)
+    try:
+        os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+        table = _to_arrow_table(df)
+        _write_atomic(data_path, lambda p: feather.write_feather(table, p, compression='uncompressed'))
+        meta['rows'] = table.num_rows
+        meta['compiled_at'] = time.time()
+        _write_atomic(meta_path, lambda p: _dump_json(meta, p))
+    except Exception as e:
+        # Snapshot ist nur ein Cache - ohne ihn läuft die App trotzdem
+        print(f"⚠️ Katalog-Snapshot '{kind}' nicht geschrieben: {e}")
+    return df, meta
+
+
+def _dump_json(obj, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+
+
+def _snapshot_is_fresh(source_path: str, meta: Optional[Dict], meta_path: str) -> bool:
+    """mtime/Größe gleich → frisch (ohne Hash). Sonst entscheidet der Inhalts-Hash."""
+    if not meta or meta.get('schema') != CATALOG_SCHEMA_VERSION:
+        return False
+    stat = _source_stat(source_path)
+    if meta.get('source') != stat['source'] or meta.get('size') != stat['size']:
+        return False
+    if meta.get('mtime_ns') == stat['mtime_ns']:
+        return True
+    # Datei wurde nur "angefasst" (z.B. neu kopiert) → Hash prüfen
+    if meta.get('sha256') != file_sha256(source_path):
+        return False
+    meta.update(stat)
+    try:
+        _write_atomic(meta_path, lambda p: _dump_json(meta, p))
+    except Exception:
+        pass
+    return True
+
+
+def load_catalog(source_path: str, kind: str) -> Tuple[Optional[pd.DataFrame], Dict]:
+    """
+    Lädt einen Katalog. Schneller Pfad: memory-mapped Feather-Snapshot.
+    Excel wird nur geparst, wenn der Snapshot fehlt oder veraltet ist.
+    """
+    data_path, meta_path = _snapshot_paths(kind)
+    meta = _read_meta(meta_path)
+
+    if meta and os.path.exists(data_path) and _snapshot_is_fresh(source_path, meta, meta_path):
+        try:
+            table = feather.read_table(data_path, memory_map=True)
+            return table.to_pandas(), meta
+        except Exception as e:
+            print(f"⚠️ Katalog-Snapshot '{kind}' defekt, parse Excel neu: {e}")
+
+    return compile_catalog(source_path, kind)
+
+
+def artikel_key(values: pd.Series) -> pd.Series:
+    """Artikelnummer normalisieren wie in add_to_cart ('123.0' → '123')"""
+    return values.fillna("").astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+
+
+# ==========================================
+# FJM PARTITIONEN
+# ==========================================
+def build_fjm_partitions(df_samsung: pd.DataFrame, fjm_rows: np.ndarray) -> Dict:
+    """
+    Teilt die FJM-Zeilen einmalig in Außengeräte, Innengeräte und Typ-Buckets.
+    Alle Werte sind Zeilenpositionen (iloc) in df_samsung.
+    """
+    bez = df_samsung['Bezeichnung'].iloc[fjm_rows].fillna("").astype(str)
+    is_ag = bez.str.contains("Außengerät|AG", case=False).to_numpy()
+    ig_rows = fjm_rows[~is_ag]
+    ig_bez = bez[~is_ag]
+
+    types = {}
+    for label, term in FJM_IG_TYPES.items():
+        mask = ig_bez.str.contains(term, case=False, regex=False).to_numpy()
+        types[label] = ig_rows[mask]
+
+    return {'ag': fjm_rows[is_ag], 'ig': ig_rows, 'types': types}
+
+
+# ==========================================
+# CLI: python coolmatch_catalog.py [verzeichnis]
+# ==========================================
+def main(argv: List[str] = None):
+    import sys
+    argv = sys.argv[1:] if argv is None else argv
+    files = find_catalog_files(argv[0] if argv else None)
+    for kind in ('samsung', 'zubehoer'):
+        path = files[kind]
+        if not path:
+            print(f"❌ {kind}: keine Datei gefunden")
+            continue
+        t0 = time.perf_counter()
+        df, meta = compile_catalog(path, kind)
+        rows = 0 if df is None else len(df)
+        print(f"✅ {kind}: {os.path.basename(path)} → {rows} Zeilen "
+              f"({time.perf_counter() - t0:.2f}s, sha256 {meta['sha256'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
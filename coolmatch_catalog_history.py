@@ -0,0 +1,146 @@
+# ==========================================
+# DATEI: coolmatch_catalog_history.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Versionsgeschichte der Preislisten
+#   - jede neue Preisliste (SHA-256) wird als Version in der DB gespeichert
+#   - Diff zur Vorversion über die Artikelnummer: neu, entfernt, Preis geändert
+#   - vektorisiert (ein Outer-Merge), Preisvergleich in ganzen Cent
+#   - UI und Neubewertung arbeiten nur auf den geänderten Artikeln
+# ==========================================
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from coolmatch_catalog import artikel_key
+from coolmatch_database import CoolMatchDatabase
+from coolmatch_money import to_cents
+
+# Katalog → (Artikelnummer, Bezeichnung, Preis, Artikelgruppe)
+CATALOG_ARTICLE_COLUMNS = {
+    'samsung': ('Artikelnummer', 'Bezeichnung', 'Listenpreis', 'Artikelgruppe'),
+    'zubehoer': ('Artikel', 'Beschreibung', 'Preis', None),
+}
+
+_ARTICLE_FRAME = ['artikelnummer', 'bezeichnung', 'artikelgruppe', 'preis']
+
+
+@dataclass
+class CatalogDiff:
+    """Unterschiede zwischen zwei Preislisten"""
+    added: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=_ARTICLE_FRAME))
+    removed: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=_ARTICLE_FRAME))
+    changed: pd.DataFrame = field(default_factory=pd.DataFrame)
+    old_version: Optional[Dict] = None
+    new_version: Optional[Dict] = None
+
+    @property
+    def empty(self) -> bool:
+        return self.added.empty and self.removed.empty and self.changed.empty
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {'neu': len(self.added), 'entfernt': len(self.removed), 'geaendert': len(self.changed)}
+
+    @property
+    def changed_articles(self) -> List[str]:
+        return self.changed['artikelnummer'].tolist() if not self.changed.empty else []
+
+    def price_map(self) -> pd.Series:
+        """Neue Preise der geänderten Artikel (für die Neubewertung)"""
+        if self.changed.empty:
+            return pd.Series(dtype=float)
+        return pd.Series(self.changed['preis_neu'].to_numpy(),
+                         index=self.changed['artikelnummer'].to_numpy())
+
+    def summary(self) -> str:
+        return (f"{len(self.changed)} Preise geändert, {len(self.added)} neu, "
+                f"{len(self.removed)} entfernt")
+
+
+def catalog_articles(df: pd.DataFrame, kind: str = 'samsung') -> pd.DataFrame:
+    """Katalog-DataFrame → einheitliche Artikel-Tabelle (eine Zeile je Artikelnummer)"""
+    nr_col, bez_col, preis_col, gruppe_col = CATALOG_ARTICLE_COLUMNS[kind]
+    articles = pd.DataFrame({
+        'artikelnummer': artikel_key(df[nr_col]).to_numpy(),
+        'bezeichnung': df[bez_col].fillna("").astype(str).to_numpy(),
+        'artikelgruppe': df[gruppe_col].fillna("").astype(str).to_numpy() if gruppe_col else "",
+        'preis': pd.to_numeric(df[preis_col], errors='coerce').to_numpy(),
+    }, columns=_ARTICLE_FRAME)
+    articles = articles[articles['artikelnummer'] != ""]
+    return articles.drop_duplicates('artikelnummer').reset_index(drop=True)
+
+
+def diff_catalogs(old: pd.DataFrame, new: pd.DataFrame) -> CatalogDiff:
+    """Diff zweier Artikel-Tabellen (catalog_articles) über die Artikelnummer"""
+    merged = old.merge(new, on='artikelnummer', how='outer', suffixes=('_alt', '_neu'),
+                       indicator=True, sort=False)
+    side = merged['_merge'].to_numpy()
+
+    added = merged[side == 'right_only']
+    removed = merged[side == 'left_only']
+    both = merged[side == 'both']
+
+    preis_alt = both['preis_alt'].to_numpy(dtype=float)
+    preis_neu = both['preis_neu'].to_numpy(dtype=float)
+    # Vergleich in Cent; fehlender Preis ↔ Preis zählt auch als Änderung
+    nan_alt, nan_neu = np.isnan(preis_alt), np.isnan(preis_neu)
+    moved = (to_cents(preis_alt) != to_cents(preis_neu)) | (nan_alt != nan_neu)
+    both = both[moved]
+    preis_alt, preis_neu = preis_alt[moved], preis_neu[moved]
+
+    diff = preis_neu - preis_alt
+    changed = pd.DataFrame({
+        'artikelnummer': both['artikelnummer'].to_numpy(),
+        'bezeichnung': both['bezeichnung_neu'].to_numpy(),
+        'artikelgruppe': both['artikelgruppe_neu'].to_numpy(),
+        'preis_alt': preis_alt,
+        'preis_neu': preis_neu,
+        'differenz': np.round(diff, 2),
+        'differenz_proz': np.round(np.divide(diff * 100.0, preis_alt, out=np.full(len(diff), np.nan),
+                                             where=(preis_alt != 0) & ~np.isnan(preis_alt)), 2),
+    })
+
+    def _side(frame, suffix):
+        return pd.DataFrame({col: frame[col if col == 'artikelnummer' else f"{col}{suffix}"].to_numpy()
+                             for col in _ARTICLE_FRAME}, columns=_ARTICLE_FRAME)
+
+    return CatalogDiff(added=_side(added, '_neu'), removed=_side(removed, '_alt'),
+                       changed=changed.sort_values('artikelnummer', ignore_index=True))
+
+
+def record_catalog_version(db: CoolMatchDatabase, df: pd.DataFrame, kind: str, sha256: str,
+                           source: str = "") -> Tuple[Dict, Optional[CatalogDiff]]:
+    """
+    Speichert die Preisliste als Version, falls der Hash neu ist → (Version, Diff zur
+    Vorversion). Ohne Vorversion (erster Import) ist der Diff None.
+    """
+    version = db.get_catalog_version(kind, sha256)
+    if version is not None:
+        return version, version_diff(db, version)
+
+    articles = catalog_articles(df, kind)
+    previous = db.get_catalog_version(kind)
+    diff = None
+    if previous is not None:
+        diff = diff_catalogs(db.get_catalog_articles(previous['id']), articles)
+    version_id = db.add_catalog_version(kind, sha256, source, articles,
+                                        diff.counts if diff else None)
+    version = db.get_catalog_version(kind, sha256) or {'id': version_id}
+    if diff is not None:
+        diff.old_version, diff.new_version = previous, version
+    return version, diff
+
+
+def version_diff(db: CoolMatchDatabase, version: Dict) -> Optional[CatalogDiff]:
+    """Diff einer gespeicherten Version zu ihrer Vorversion (None beim ersten Import)"""
+    previous = db.get_previous_catalog_version(version['id'])
+    if previous is None:
+        return None
+    diff = diff_catalogs(db.get_catalog_articles(previous['id']),
+                         db.get_catalog_articles(version['id']))
+    diff.old_version, diff.new_version = previous, version
+    return diff
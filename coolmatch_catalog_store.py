@@ -0,0 +1,208 @@
+# ==========================================
+# DATEI: coolmatch_catalog_store.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Katalog-Abfragen für System- und Zubehör-Tab
+#   - MemoryCatalog: DataFrame + Such-Index pro Prozess (bisheriges Verhalten)
+#   - DbCatalog: indizierte SQLite-Tabellen neben `angebote`, alle Worker teilen
+#     einen Katalog auf Platte statt je einer Kopie im RAM
+#   - Import in die Tabellen nur, wenn sich der Datei-Hash geändert hat
+#   - Auswahl über CATALOG_BACKEND ("memory" / "database")
+# ==========================================
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from coolmatch_catalog import CATALOG_SCHEMA_VERSION, build_fjm_partitions, file_sha256, load_catalog
+from coolmatch_database import CoolMatchDatabase
+from coolmatch_search import FIELD_SEP, CatalogSearchIndex, rank_rows
+
+# Artikelgruppe enthält → System (gleiche Zuordnung wie group_rows im Such-Index)
+SYSTEM_GROUPS = {"RAC": "S_RAC", "BAC": "S_BAC", "FJM": "S_FJM"}
+
+_SAMSUNG_COLUMNS = ['Artikelnummer', 'Bezeichnung', 'Artikelgruppe', 'Listenpreis']
+_ZUBEHOER_COLUMNS = ['Artikel', 'Beschreibung', 'Preis']
+
+
+# ==========================================
+# IN-MEMORY (DataFrame + Such-Index)
+# ==========================================
+class MemoryCatalog:
+    """Katalog als DataFrame pro Prozess; Suche über CatalogSearchIndex"""
+
+    def __init__(self, df_samsung: Optional[pd.DataFrame], df_zubehoer: Optional[pd.DataFrame],
+                 indexes: Dict, samsung_meta: Optional[Dict] = None):
+        self.df_samsung = df_samsung
+        self.df_zubehoer = df_zubehoer
+        self.indexes = indexes
+        self.samsung_meta = samsung_meta      # Snapshot-Meta (sha256, source) der Preisliste
+
+    @property
+    def has_samsung(self) -> bool:
+        return self.df_samsung is not None and self.indexes.get('samsung') is not None
+
+    @property
+    def has_zubehoer(self) -> bool:
+        return self.df_zubehoer is not None
+
+    def system_sets(self, system: str, query: str = "") -> pd.DataFrame:
+        """Geräte eines Systems (RAC/BAC), optional gefiltert"""
+        index = self.indexes['samsung']
+        rows = index.group_rows(SYSTEM_GROUPS[system])
+        if query:
+            rows = index.search(query, within=rows)
+        return self.df_samsung.iloc[rows]
+
+    def fjm_outdoor(self) -> pd.DataFrame:
+        return self.df_samsung.iloc[self.indexes['fjm']['ag']]
+
+    def fjm_indoor(self, ig_typ: str = None) -> pd.DataFrame:
+        """FJM-Innengeräte; ig_typ = Label aus FJM_IG_TYPES, None = alle"""
+        fjm = self.indexes['fjm']
+        return self.df_samsung.iloc[fjm['ig'] if ig_typ is None else fjm['types'][ig_typ]]
+
+    def zubehoer(self, query: str = "") -> pd.DataFrame:
+        """
+        Zubehör; jeder Suchbegriff muss vorkommen, beste Treffer zuerst
+        (Trigramm-Index, sonst Suchtext-Spalte - gleiche Treffer wie DbCatalog)
+        """
+        df = self.df_zubehoer
+        terms = query.lower().split()
+        if not terms:
+            return df
+        index = self.indexes.get('zubehoer')
+        if index is not None:
+            rows = index.search(query, ranked=True)
+        else:
+            suchtext = df['Suchtext']
+            mask = np.logical_and.reduce([suchtext.str.contains(t, regex=False).to_numpy()
+                                          for t in terms])
+            rows = rank_rows(suchtext.tolist(), mask.nonzero()[0], terms)
+        return df.iloc[rows]
+
+
+# ==========================================
+# DATENBANK (indizierte Tabellen)
+# ==========================================
+class DbCatalog:
+    """Katalog in katalog_samsung/katalog_zubehoer; jede Abfrage läuft über einen Index"""
+
+    def __init__(self, db: CoolMatchDatabase):
+        self.db = db
+        self.status = {kind: db.get_catalog_import(kind) for kind in ('samsung', 'zubehoer')}
+        imported = self.status['samsung']
+        self.samsung_meta = {'sha256': imported['sha256'], 'source': imported['quelle']} if imported else None
+
+    @property
+    def has_samsung(self) -> bool:
+        return bool(self.status['samsung'])
+
+    @property
+    def has_zubehoer(self) -> bool:
+        return bool(self.status['zubehoer'])
+
+    def system_sets(self, system: str, query: str = "") -> pd.DataFrame:
+        return self.db.query_catalog_samsung(system, query=query)
+
+    def fjm_outdoor(self) -> pd.DataFrame:
+        return self.db.query_catalog_samsung("FJM", geraet="AG")
+
+    def fjm_indoor(self, ig_typ: str = None) -> pd.DataFrame:
+        return self.db.query_catalog_samsung("FJM", geraet="IG", ig_typ=ig_typ)
+
+    def zubehoer(self, query: str = "") -> pd.DataFrame:
+        df = self.db.query_catalog_zubehoer(query)
+        terms = query.lower().split()
+        if terms and len(df) > 1:
+            # gleiches Ranking wie der Trigramm-Index, nur über die Treffer
+            df = df.iloc[rank_rows(df['Suchtext'].tolist(), range(len(df)), terms)]
+        return df
+
+
+# ==========================================
+# IMPORT
+# ==========================================
+def samsung_catalog_rows(df: pd.DataFrame) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Samsung-Katalog → (Tabellenzeilen inkl. abgeleitetem System und AG/IG,
+    (ig_typ, id)-Paare für katalog_samsung_typ)
+    """
+    df = df.reset_index(drop=True)
+    n = len(df)
+    text = df[_SAMSUNG_COLUMNS[:3]].fillna("").astype(str)
+    suchtext = text.agg(FIELD_SEP.join, axis=1).str.lower()
+    gruppe = text['Artikelgruppe'].str.lower()
+
+    system = np.full(n, "", dtype=object)
+    for name, key in reversed(list(SYSTEM_GROUPS.items())):
+        system[gruppe.str.contains(key.lower(), regex=False).to_numpy()] = name
+
+    # AG/IG + Typen exakt wie die FJM-Partitionen der In-Memory-Variante
+    geraet = np.full(n, None, dtype=object)
+    fjm = build_fjm_partitions(df, np.flatnonzero(system == "FJM"))
+    geraet[fjm['ag']] = "AG"
+    geraet[fjm['ig']] = "IG"
+    ig_typen = [(label, int(row) + 1) for label, rows in fjm['types'].items() for row in rows]
+
+    preis = pd.to_numeric(df['Listenpreis'], errors='coerce').to_numpy()
+    rows = [(i + 1, nr, bez, grp, None if p != p else float(p), sys_, ger, st_)
+            for i, (nr, bez, grp, p, sys_, ger, st_) in enumerate(zip(
+                text['Artikelnummer'], text['Bezeichnung'], text['Artikelgruppe'], preis,
+                system, geraet, suchtext))]
+    return rows, ig_typen
+
+
+def zubehoer_catalog_rows(df: pd.DataFrame) -> List[tuple]:
+    preis = pd.to_numeric(df['Preis'], errors='coerce').fillna(0.0).to_numpy()
+    return [(i + 1, str(art), str(bez), float(p), str(st_))
+            for i, (art, bez, p, st_) in enumerate(zip(df['Artikel'], df['Beschreibung'],
+                                                       preis, df['Suchtext']))]
+
+
+def import_catalog(db: CoolMatchDatabase, kind: str, path: str) -> bool:
+    """
+    Importiert die Datei in die Katalog-Tabelle, wenn ihr Hash (oder CATALOG_SCHEMA_VERSION)
+    neu ist → True bei Import. Der Hash-Vergleich braucht weder Excel noch Snapshot.
+    """
+    sha256 = file_sha256(path)
+    current = db.get_catalog_import(kind)
+    if current and (current['sha256'], current['schema_version']) == (sha256, CATALOG_SCHEMA_VERSION):
+        return False
+    df, _ = load_catalog(path, kind)
+    if df is None:
+        return False
+    if kind == 'samsung':
+        rows, ig_typen = samsung_catalog_rows(df)
+    else:
+        rows, ig_typen = zubehoer_catalog_rows(df), None
+    return db.replace_catalog(kind, rows, sha256, os.path.basename(path), ig_typen,
+                              CATALOG_SCHEMA_VERSION)
+
+
+def open_db_catalog(db: CoolMatchDatabase, files: Dict) -> DbCatalog:
+    """Gefundene Katalogdateien (find_catalog_files) bei Bedarf importieren → DbCatalog"""
+    for kind in ('samsung', 'zubehoer'):
+        if files.get(kind):
+            try:
+                import_catalog(db, kind, files[kind])
+            except Exception as e:
+                # alter Stand in der DB bleibt nutzbar
+                print(f"⚠️ Katalog-Import '{kind}' fehlgeschlagen: {e}")
+    return DbCatalog(db)
+
+
+def build_memory_indexes(df_samsung: Optional[pd.DataFrame], df_zubehoer: Optional[pd.DataFrame],
+                         zubehoer_index: bool = True) -> Dict:
+    """Such-Indizes und FJM-Partitionen für MemoryCatalog"""
+    indexes = {'samsung': None, 'zubehoer': None, 'fjm': None}
+    if df_samsung is not None:
+        indexes['samsung'] = CatalogSearchIndex.from_frame(
+            df_samsung, _SAMSUNG_COLUMNS[:3], group_column='Artikelgruppe'
+        )
+        indexes['fjm'] = build_fjm_partitions(df_samsung, indexes['samsung'].group_rows(SYSTEM_GROUPS['FJM']))
+    if df_zubehoer is not None and zubehoer_index:
+        indexes['zubehoer'] = CatalogSearchIndex(df_zubehoer['Suchtext'].tolist())
+    return indexes
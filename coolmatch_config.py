@@ -51,6 +51,9 @@ DEFAULT_MWST = 20.0
 DEFAULT_VALIDITY_DAYS = 7
 DEFAULT_RABATT = 30.0
 
+# Offene Angebote → werden bei neuer Preisliste neu bewertet (coolmatch_repricing)
+OPEN_QUOTE_STATUSES = ["Erstellt", "Gesendet"]
+
 # --- PARTNER DATEN ---
 DEFAULT_PARTNER = {
     "firma": "°coolsulting",
@@ -67,6 +70,31 @@ DEFAULT_PARTNER = {
 SAMSUNG_FILE_KEYWORDS = ["S_Klima", "Samsung"]
 ZUBEHOER_FILE_KEYWORDS = ["ubeh", "zubeh"]
 
+# Kompilierte Katalog-Snapshots (Feather) - werden bei geänderter Excel-Datei neu erzeugt
+import tempfile
+CATALOG_CACHE_DIR = os.path.join(tempfile.gettempdir(), "coolmatch_data", "catalog")
+
+# PDF-Schriften: TT Commons eingebettet (Subset, echte Umlaute).
+# Fehlt eine Datei oder PDF_EMBED_FONTS = False → Helvetica mit Umschrift (ae, oe, ...)
+PDF_EMBED_FONTS = True
+PDF_FONT_FAMILY = "TTCommons"
+PDF_FONT_FILES = {
+    "": "TT Commons Regular.otf",
+    "B": "TT Commons DemiBold.otf",
+    "I": "TT Commons Light.otf",
+}
+
+# PDF-Cache (inhaltsadressiert, älteste Dateien werden über der Größengrenze gelöscht)
+PDF_CACHE_DIR = os.path.join(tempfile.gettempdir(), "coolmatch_data", "pdf")
+PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Trigramm-Index mit Ranking für die Zubehör-Suche (False → einfache Suchtext-Spalte)
+ZUBEHOER_SEARCH_INDEX = True
+
+# Katalog-Abfragen: "memory" = DataFrame + Such-Index pro Prozess,
+# "database" = indizierte Tabellen katalog_samsung/katalog_zubehoer (ein Katalog für alle Worker)
+CATALOG_BACKEND = "memory"
+
 # --- SAMSUNG KATEGORIEN ---
 SYSTEM_TYPES = {
     'RAC': 'Single Split (RAC)',
@@ -74,6 +102,23 @@ SYSTEM_TYPES = {
     'BAC': 'Gewerbe (BAC)'
 }
 
+# --- FJM INNENGERÄTE ---
+# Typ-Filter pro Raum → Suchbegriff in der Bezeichnung (erster Eintrag = Default)
+FJM_IG_TYPES = {
+    "Wandgerät Standard": "Standard",
+    "Wandgerät Exklusiv": "Exkl",
+    "Wandgerät Premium": "Prem",
+    "Wandgerät Elite": "Elite",
+    "Kanal": "Kanal",
+    "1-Way Kassette": "1-Way",
+    "4-Way Kassette": "4-Way",
+    "360° Kassette": "360",
+    "Mini-Kassette": "Mini",
+    "Truhengerät": "Truhe",
+    "Konsolengerät": "Konsole"
+}
+FJM_MAX_ROOMS = 5
+
 # --- F-GASE TEXT ---
 FGASE_WARNING = """Gemäß der F-Gase-Verordnung dürfen Arbeiten an Kälte-, Klima- und Wärmepumpenanlagen nur von zertifizierten Kältetechnikern durchgeführt werden. Auftraggeber haften für Verstöße mit Strafen bis zu 50.000 €."""
 
@@ -1,20 +1,53 @@
 # ==========================================
 # DATEI: coolmatch_database.py
-# VERSION: 7.2 - FIXED UNIQUE CONSTRAINT + LAUFENDE NUMMER
+# VERSION: 7.3 - VERBINDUNGS-POOL
 # AUTOR: Michael Schäpers, coolsulting
 # FIXES:
 #   - get_next_angebots_nr(): Laufende Nummer aus DB (verhindert Duplikate)
 #   - save_quote(): INSERT OR UPDATE (verhindert UNIQUE constraint Fehler)
+# 7.3:
+#   - _ConnectionPool: langlebige Verbindungen statt Connect/Close pro Methode
+#   - SQLite im WAL-Modus, Health-Check + Acquire/Wait-Zähler (get_pool_stats)
+#   - save_quote(): UPSERT + mehrzeilige INSERTs in einer Transaktion
+#   - get_statistics(): liest per Trigger gepflegte Kennzahlen-Tabellen (agg_*)
+#   - search_quotes(): FTS5-Volltextsuche (bm25, paginiert), Fallback LIKE
+#   - get_quotes_page(): Keyset-Pagination für die Historie
+#   - monday_outbox: dauerhafte Warteschlange für den Monday-Sync (coolmatch_sync)
+#   - Positionssummen über coolmatch_money (ganze Cent)
+#   - get_open_positions(): Positionen offener Angebote für die Neubewertung
+#   - katalog_versionen/katalog_artikel: jede importierte Preisliste als Version
+#   - katalog_samsung/katalog_zubehoer: indizierter Katalog (CATALOG_BACKEND = "database")
 # ==========================================
 
+import os
+import json
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import streamlit as st
 
+from coolmatch_config import OPEN_QUOTE_STATUSES
+from coolmatch_money import price_positions
 
-def _get_connection():
-    """Turso wenn Secrets vorhanden, sonst lokale SQLite"""
+
+# SQLite-Tuning für die langlebigen Verbindungen
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+]
+
+
+def _resolve_target():
+    """Turso wenn Secrets vorhanden, sonst lokale SQLite → (mode, connect-Parameter)"""
     try:
         turso_url = st.secrets.get("TURSO_URL", "")
         turso_token = st.secrets.get("TURSO_TOKEN", "")
@@ -23,15 +56,22 @@ def _get_connection():
         turso_token = ""
 
     if turso_url and turso_token:
+        return "turso", {"database": turso_url, "auth_token": turso_token}
+    data_dir = os.path.join(tempfile.gettempdir(), "coolmatch_data")
+    os.makedirs(data_dir, exist_ok=True)
+    return "sqlite", {"database": os.path.join(data_dir, "coolmatch_database.db")}
+
+
+def _open_connection(mode: str, target: Dict):
+    if mode == "turso":
         import libsql_experimental as libsql
-        conn = libsql.connect(database=turso_url, auth_token=turso_token)
-        return conn, "turso"
-    else:
-        import sqlite3, os, tempfile
-        data_dir = os.path.join(tempfile.gettempdir(), "coolmatch_data")
-        os.makedirs(data_dir, exist_ok=True)
-        conn = sqlite3.connect(os.path.join(data_dir, "coolmatch_database.db"))
-        return conn, "sqlite"
+        return libsql.connect(**target)
+    # check_same_thread=False: Der Pool gibt jede Verbindung exklusiv aus,
+    # Streamlit startet aber pro Rerun einen neuen Script-Thread
+    conn = sqlite3.connect(target["database"], timeout=30, check_same_thread=False)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
 
 
 def _fetchall(conn, sql, params=()):
@@ -46,14 +86,463 @@ def _execute(conn, sql, params=()):
     return cur
 
 
+def _insert_many(conn, table: str, columns: List[str], rows: List[tuple], max_params: int = 900):
+    """
+    Mehrzeiliges INSERT (VALUES (...), (...), ...) in Blöcken.
+    Ein Statement pro Block statt pro Zeile → konstante Round-Trips auch auf Turso.
+    """
+    if not rows:
+        return
+    chunk = max(1, max_params // len(columns))
+    row_sql = "(" + ", ".join("?" * len(columns)) + ")"
+    for i in range(0, len(rows), chunk):
+        block = rows[i:i + chunk]
+        params = [v for row in block for v in row]
+        _execute(conn, f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                       + ", ".join([row_sql] * len(block)), params)
+
+
+# Spalten von `angebote` für save_quote: (Name, Default; None = Pflichtfeld)
+_QUOTE_COLUMNS = [
+    ('angebots_nr', None), ('kunde_name', None), ('kunde_projekt', ''), ('kunde_nr', ''),
+    ('gueltig_bis', ''), ('bearbeiter', ''), ('firma', ''),
+    ('summe_netto', None), ('summe_brutto', None), ('mwst_satz', None),
+    ('rabatt_prozent', 0), ('rabatt_absolut', 0), ('manual_preis', 0), ('preise_verborgen', 0),
+    ('status', 'Erstellt'), ('monday_item_id', ''), ('closing_text', ''), ('notizen', ''),
+]
+
+
+# ============================================================
+# Materialisierte Kennzahlen für get_statistics()
+# Werden per Trigger inkrementell gepflegt (save_quote, update_status,
+# delete_quote) → Dashboard liest nur noch kleine Summen-Tabellen.
+# ============================================================
+def _agg_add(prefix: str, sign: str) -> str:
+    """SQL-Schritte um ein Angebot (NEW/OLD) zu Monat + Status zu addieren/abzuziehen"""
+    if sign == "+":
+        return f"""
+            INSERT INTO agg_monat (monat, anzahl, summe)
+            VALUES (strftime('%Y-%m', {prefix}.erstellt_am), 1, IFNULL({prefix}.summe_brutto, 0))
+            ON CONFLICT(monat) DO UPDATE SET anzahl = anzahl + 1, summe = summe + excluded.summe;
+            INSERT INTO agg_status (status, anzahl, summe)
+            VALUES ({prefix}.status, 1, IFNULL({prefix}.summe_brutto, 0))
+            ON CONFLICT(status) DO UPDATE SET anzahl = anzahl + 1, summe = summe + excluded.summe;"""
+    return f"""
+            UPDATE agg_monat SET anzahl = anzahl - 1, summe = summe - IFNULL({prefix}.summe_brutto, 0)
+            WHERE monat = strftime('%Y-%m', {prefix}.erstellt_am);
+            DELETE FROM agg_monat WHERE monat = strftime('%Y-%m', {prefix}.erstellt_am) AND anzahl <= 0;
+            UPDATE agg_status SET anzahl = anzahl - 1, summe = summe - IFNULL({prefix}.summe_brutto, 0)
+            WHERE status = {prefix}.status;
+            DELETE FROM agg_status WHERE status = {prefix}.status AND anzahl <= 0;"""
+
+
+_AGGREGATE_SQLS = [
+    """CREATE TABLE IF NOT EXISTS agg_monat (
+        monat TEXT PRIMARY KEY, anzahl INTEGER NOT NULL DEFAULT 0, summe REAL NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS agg_status (
+        status TEXT PRIMARY KEY, anzahl INTEGER NOT NULL DEFAULT 0, summe REAL NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS agg_produkt (
+        artikel_nr TEXT PRIMARY KEY, beschreibung TEXT, kategorie TEXT,
+        anzahl INTEGER NOT NULL DEFAULT 0, gesamt_menge REAL NOT NULL DEFAULT 0,
+        summe_preis REAL NOT NULL DEFAULT 0, summe_rabatt REAL NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS agg_kategorie (
+        kategorie TEXT PRIMARY KEY, anzahl INTEGER NOT NULL DEFAULT 0, umsatz REAL NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_agg_produkt_anzahl ON agg_produkt(anzahl)",
+    # MIN/MAX(summe_brutto) über Index statt Full Scan
+    "CREATE INDEX IF NOT EXISTS idx_summe ON angebote(summe_brutto)",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_agg_angebote_ins AFTER INSERT ON angebote BEGIN
+        {_agg_add("NEW", "+")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_agg_angebote_del AFTER DELETE ON angebote BEGIN
+        {_agg_add("OLD", "-")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_agg_angebote_upd
+        AFTER UPDATE OF erstellt_am, summe_brutto, status ON angebote BEGIN
+        {_agg_add("OLD", "-")}
+        {_agg_add("NEW", "+")}
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_agg_produkt_ins AFTER INSERT ON produkt_stats BEGIN
+        INSERT INTO agg_produkt (artikel_nr, beschreibung, kategorie, anzahl,
+                                 gesamt_menge, summe_preis, summe_rabatt)
+        VALUES (NEW.artikel_nr, NEW.beschreibung, NEW.kategorie, 1,
+                IFNULL(NEW.menge, 0), IFNULL(NEW.preis, 0), IFNULL(NEW.rabatt, 0))
+        ON CONFLICT(artikel_nr) DO UPDATE SET
+            beschreibung = excluded.beschreibung, kategorie = excluded.kategorie,
+            anzahl = anzahl + 1, gesamt_menge = gesamt_menge + excluded.gesamt_menge,
+            summe_preis = summe_preis + excluded.summe_preis,
+            summe_rabatt = summe_rabatt + excluded.summe_rabatt;
+        INSERT INTO agg_kategorie (kategorie, anzahl, umsatz)
+        SELECT NEW.kategorie, 1, IFNULL(NEW.menge * NEW.preis * (1 - NEW.rabatt / 100), 0)
+        WHERE NEW.kategorie != ''
+        ON CONFLICT(kategorie) DO UPDATE SET
+            anzahl = anzahl + 1, umsatz = umsatz + excluded.umsatz;
+    END""",
+]
+
+# Vollständiger Neuaufbau (einmalig bei Einführung der Trigger, oder zur Reparatur)
+_AGGREGATE_REBUILD_SQLS = [
+    "DELETE FROM agg_monat",
+    """INSERT INTO agg_monat (monat, anzahl, summe)
+       SELECT strftime('%Y-%m', erstellt_am), COUNT(*), IFNULL(SUM(summe_brutto), 0)
+       FROM angebote GROUP BY 1""",
+    "DELETE FROM agg_status",
+    """INSERT INTO agg_status (status, anzahl, summe)
+       SELECT status, COUNT(*), IFNULL(SUM(summe_brutto), 0) FROM angebote GROUP BY status""",
+    "DELETE FROM agg_produkt",
+    """INSERT INTO agg_produkt (artikel_nr, beschreibung, kategorie, anzahl,
+                               gesamt_menge, summe_preis, summe_rabatt)
+       SELECT artikel_nr, beschreibung, kategorie, COUNT(*),
+              IFNULL(SUM(menge), 0), IFNULL(SUM(preis), 0), IFNULL(SUM(rabatt), 0)
+       FROM produkt_stats GROUP BY artikel_nr""",
+    "DELETE FROM agg_kategorie",
+    """INSERT INTO agg_kategorie (kategorie, anzahl, umsatz)
+       SELECT kategorie, COUNT(*), IFNULL(SUM(menge * preis * (1 - rabatt / 100)), 0)
+       FROM produkt_stats WHERE kategorie != '' GROUP BY kategorie""",
+]
+
+
+# ============================================================
+# Volltextsuche (FTS5) über Angebote + Positionsbeschreibungen
+# External-Content-Tabellen, per Trigger synchron gehalten
+# ============================================================
+# Spalten der Historien-Tabelle (ohne closing_text & Co.)
+QUOTE_LIST_COLUMNS = ["id", "angebots_nr", "kunde_name", "kunde_projekt", "erstellt_am",
+                      "summe_brutto", "status", "bearbeiter"]
+
+_FTS_QUOTE_COLS = ["angebots_nr", "kunde_name", "kunde_projekt", "kunde_nr"]
+_FTS_POS_COLS = ["artikel_nr", "beschreibung"]
+
+
+def _fts_sync_triggers(fts: str, table: str, cols: List[str]) -> List[str]:
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"NEW.{c}" for c in cols)
+    old_vals = ", ".join(f"OLD.{c}" for c in cols)
+    insert_new = f"INSERT INTO {fts} (rowid, {col_list}) VALUES (NEW.id, {new_vals});"
+    delete_old = f"INSERT INTO {fts} ({fts}, rowid, {col_list}) VALUES ('delete', OLD.id, {old_vals});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_ins AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_del AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_upd AFTER UPDATE OF {col_list} ON {table} BEGIN "
+        f"{delete_old} {insert_new} END",
+    ]
+
+
+_FTS_SQLS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS angebote_fts USING fts5(
+        {", ".join(_FTS_QUOTE_COLS)}, content='angebote', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS positionen_fts USING fts5(
+        {", ".join(_FTS_POS_COLS)}, content='positionen', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    *_fts_sync_triggers("angebote_fts", "angebote", _FTS_QUOTE_COLS),
+    *_fts_sync_triggers("positionen_fts", "positionen", _FTS_POS_COLS),
+]
+
+
+def _fts_match_expression(search_term: str) -> str:
+    """Jeder Begriff als Präfix-Phrase, UND-verknüpft: 'muster an-2026' → "muster"* "an-2026"*"""
+    terms = search_term.split()
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+# ============================================================
+# Outbox für den Monday.com-Sync
+# Ein Eintrag pro Upload-Auftrag; der MondaySyncWorker (coolmatch_sync)
+# holt fällige Aufträge ab, item_id wird als Checkpoint gespeichert.
+# ============================================================
+_OUTBOX_SQLS = [
+    """CREATE TABLE IF NOT EXISTS monday_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        angebots_nr TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        pdf BLOB,
+        filename TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        locked_until REAL NOT NULL DEFAULT 0,
+        item_id TEXT,
+        pdf_hash TEXT,
+        last_error TEXT,
+        erstellt_am DATETIME DEFAULT CURRENT_TIMESTAMP,
+        erledigt_am DATETIME
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_outbox_due ON monday_outbox(status, next_attempt_at)",
+    "CREATE INDEX IF NOT EXISTS idx_outbox_nr ON monday_outbox(angebots_nr)",
+]
+
+# ============================================================
+# Katalog-Versionen
+# Jede importierte Preisliste (eindeutig über SHA-256 je Katalog) mit allen
+# Artikeln; Diff-Zähler zur Vorversion werden beim Import mitgespeichert.
+# ============================================================
+_CATALOG_VERSION_SQLS = [
+    """CREATE TABLE IF NOT EXISTS katalog_versionen (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        katalog TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        quelle TEXT,
+        artikel INTEGER NOT NULL DEFAULT 0,
+        neu INTEGER NOT NULL DEFAULT 0,
+        entfernt INTEGER NOT NULL DEFAULT 0,
+        geaendert INTEGER NOT NULL DEFAULT 0,
+        importiert_am DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (katalog, sha256)
+    )""",
+    """CREATE TABLE IF NOT EXISTS katalog_artikel (
+        version_id INTEGER NOT NULL,
+        artikelnummer TEXT NOT NULL,
+        bezeichnung TEXT,
+        artikelgruppe TEXT,
+        preis REAL,
+        PRIMARY KEY (version_id, artikelnummer),
+        FOREIGN KEY (version_id) REFERENCES katalog_versionen(id) ON DELETE CASCADE
+    )""",
+]
+
+# ============================================================
+# Katalog-Tabellen (CATALOG_BACKEND = "database")
+# Aktueller Katalog für alle Worker; Import nur bei neuem Datei-Hash (katalog_import).
+# system/geraet werden beim Import abgeleitet (RAC/BAC/FJM, AG/IG), die FJM-Typen
+# stehen in katalog_samsung_typ (ein Innengerät kann zu mehreren Typen passen)
+# ============================================================
+_CATALOG_TABLE_SQLS = [
+    """CREATE TABLE IF NOT EXISTS katalog_samsung (
+        id INTEGER PRIMARY KEY,
+        artikelnummer TEXT, bezeichnung TEXT, artikelgruppe TEXT, listenpreis REAL,
+        system TEXT, geraet TEXT, suchtext TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_ks_artikelnummer ON katalog_samsung(artikelnummer)",
+    "CREATE INDEX IF NOT EXISTS idx_ks_artikelgruppe ON katalog_samsung(artikelgruppe)",
+    "CREATE INDEX IF NOT EXISTS idx_ks_geraet ON katalog_samsung(system, geraet)",
+    """CREATE TABLE IF NOT EXISTS katalog_samsung_typ (
+        ig_typ TEXT NOT NULL,
+        artikel_id INTEGER NOT NULL,
+        PRIMARY KEY (ig_typ, artikel_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS katalog_zubehoer (
+        id INTEGER PRIMARY KEY,
+        artikel TEXT, beschreibung TEXT, preis REAL, suchtext TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_kz_artikel ON katalog_zubehoer(artikel)",
+    """CREATE TABLE IF NOT EXISTS katalog_import (
+        katalog TEXT PRIMARY KEY,
+        sha256 TEXT NOT NULL,
+        quelle TEXT,
+        zeilen INTEGER,
+        schema_version INTEGER DEFAULT 0,
+        importiert_am DATETIME DEFAULT CURRENT_TIMESTAMP
+    )""",
+]
+
+_CATALOG_TABLES = {
+    'samsung': ("katalog_samsung", ["id", "artikelnummer", "bezeichnung", "artikelgruppe",
+                                    "listenpreis", "system", "geraet", "suchtext"]),
+    'zubehoer': ("katalog_zubehoer", ["id", "artikel", "beschreibung", "preis", "suchtext"]),
+}
+
+
+def _like_term(term: str) -> str:
+    """Suchbegriff → LIKE-Muster (%, _ und \\ maskiert, ESCAPE '\\')"""
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+CATALOG_VERSION_COLUMNS = ["id", "katalog", "sha256", "quelle", "artikel", "neu",
+                           "entfernt", "geaendert", "importiert_am"]
+
+OUTBOX_JOB_COLUMNS = ["id", "angebots_nr", "payload", "pdf", "filename", "attempts", "item_id"]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+class _ConnectionPool:
+    """
+    Pool langlebiger Verbindungen (LIFO, max. `size` gleichzeitig):
+      - SQLite: WAL + Pragmas, im Normalbetrieb bleibt genau eine Verbindung offen
+      - Turso:  kleiner wiederverwendbarer Pool statt Connect pro Query
+    Verschachtelte Zugriffe im selben Thread nutzen dieselbe Verbindung.
+    Verbindungen, die länger als `health_check_after` Sekunden ungenutzt waren,
+    werden vor der Ausgabe mit SELECT 1 geprüft und bei Bedarf neu geöffnet.
+    """
+
+    def __init__(self, mode: str, target: Dict, size: int = 4,
+                 acquire_timeout: float = 30.0, health_check_after: float = 30.0):
+        self.mode = mode
+        self.target = target
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_after = health_check_after
+
+        self._local = threading.local()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._all = []
+        self._stats = {
+            'acquires': 0, 'opened': 0, 'reconnects': 0, 'health_checks': 0,
+            'wait_total_ms': 0.0, 'wait_max_ms': 0.0,
+            'acquire_total_ms': 0.0, 'acquire_max_ms': 0.0,
+        }
+
+    # ------------------------------------------
+    def _open(self):
+        conn = _open_connection(self.mode, self.target)
+        with self._lock:
+            self._all.append(conn)
+            self._stats['opened'] += 1
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _ensure_healthy(self, conn, last_used: float):
+        if time.monotonic() - last_used < self.health_check_after:
+            return conn
+        with self._lock:
+            self._stats['health_checks'] += 1
+        try:
+            _fetchall(conn, "SELECT 1")
+            return conn
+        except Exception:
+            self._discard(conn)
+            with self._lock:
+                self._stats['reconnects'] += 1
+            return self._open()
+
+    def _checkout(self) -> float:
+        """Holt eine Verbindung für den aktuellen Thread, gibt die Wartezeit zurück"""
+        local = self._local
+        t0 = time.perf_counter()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("Keine freie Datenbank-Verbindung (Pool erschöpft)")
+        waited = time.perf_counter() - t0
+        try:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                local.conn = self._open()
+            else:
+                local.conn = self._ensure_healthy(conn, last_used)
+        except BaseException:
+            # Öffnen/Reconnect fehlgeschlagen → Slot zurückgeben, sonst ist er verloren
+            self._slots.release()
+            raise
+        return waited
+
+    def _checkin(self, failed: bool):
+        local = self._local
+        conn = local.conn
+        if failed:
+            try:
+                conn.rollback()
+            except Exception:
+                # Verbindung unbrauchbar → verwerfen
+                self._discard(conn)
+                local.conn = None
+                self._slots.release()
+                return
+        elif getattr(conn, 'in_transaction', False):
+            # Nie eine offene Transaktion (Write-Lock) in den Pool zurückgeben
+            conn.rollback()
+        self._idle.put((conn, time.monotonic()))
+        local.conn = None
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        if depth:
+            # Verschachtelt im selben Thread → gleiche Verbindung
+            local.depth = depth + 1
+            try:
+                yield local.conn
+            finally:
+                local.depth -= 1
+            return
+
+        t0 = time.perf_counter()
+        waited = self._checkout()
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            st_ = self._stats
+            st_['acquires'] += 1
+            st_['wait_total_ms'] += waited * 1000
+            st_['wait_max_ms'] = max(st_['wait_max_ms'], waited * 1000)
+            st_['acquire_total_ms'] += elapsed * 1000
+            st_['acquire_max_ms'] = max(st_['acquire_max_ms'], elapsed * 1000)
+
+        local.depth = 1
+        failed = False
+        try:
+            yield local.conn
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            local.depth = 0
+            self._checkin(failed)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            out = dict(self._stats)
+            out['open_connections'] = len(self._all)
+        out['mode'] = self.mode
+        out['avg_acquire_ms'] = out['acquire_total_ms'] / out['acquires'] if out['acquires'] else 0.0
+        out['avg_wait_ms'] = out['wait_total_ms'] / out['acquires'] if out['acquires'] else 0.0
+        return out
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
 class CoolMatchDatabase:
     """Verwaltet alle Angebots-Daten in SQLite / Turso"""
 
+    # Ein Pool pro Ziel-Datenbank und Prozess, geteilt von allen Sessions
+    _pools: Dict[tuple, _ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, db_path: str = None):
+        mode, target = _resolve_target()
+        key = (mode, tuple(sorted(target.items())))
+        with CoolMatchDatabase._pools_lock:
+            if key not in CoolMatchDatabase._pools:
+                CoolMatchDatabase._pools[key] = _ConnectionPool(mode, target, size=8 if mode == "sqlite" else 4)
+            self._pool = CoolMatchDatabase._pools[key]
+        self.mode = mode
+        self.fts_available = False
         self.init_database()
 
+    def _connection(self):
+        """Verbindung aus dem Pool (Context-Manager, Rollback bei Fehler)"""
+        return self._pool.connection()
+
+    def get_pool_stats(self) -> Dict:
+        """Zähler des Verbindungs-Pools (Acquires, Wartezeiten, Reconnects)"""
+        return self._pool.stats()
+
     def init_database(self):
-        conn, mode = _get_connection()
         sqls = [
             """CREATE TABLE IF NOT EXISTS angebote (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -95,20 +584,63 @@ class CoolMatchDatabase:
             "CREATE INDEX IF NOT EXISTS idx_kunde ON angebote(kunde_name)",
             "CREATE INDEX IF NOT EXISTS idx_datum ON angebote(erstellt_am)",
             "CREATE INDEX IF NOT EXISTS idx_status ON angebote(status)",
+            "CREATE INDEX IF NOT EXISTS idx_pos_angebot ON positionen(angebots_id)",
             "CREATE INDEX IF NOT EXISTS idx_artikel ON produkt_stats(artikel_nr)",
         ]
-        for sql in sqls:
-            try:
+        with self._connection() as conn:
+            for sql in sqls:
+                try:
+                    _execute(conn, sql)
+                except Exception:
+                    pass
+
+            for sql in _OUTBOX_SQLS + _CATALOG_VERSION_SQLS + _CATALOG_TABLE_SQLS:
                 _execute(conn, sql)
+            try:
+                # Katalog-Import aus 7.3-Vorversion: Schema 0 → beim nächsten Start neu importieren
+                _execute(conn, "ALTER TABLE katalog_import ADD COLUMN schema_version INTEGER DEFAULT 0")
+            except Exception:
+                pass
+            try:
+                # Outbox aus 7.3-Vorversion: Spalte nachrüsten
+                _execute(conn, "ALTER TABLE monday_outbox ADD COLUMN pdf_hash TEXT")
             except Exception:
                 pass
-        conn.commit()
-        conn.close()
+
+            # Kennzahlen-Tabellen: beim ersten Anlegen der Trigger einmal befüllen
+            rows, _ = _fetchall(conn,
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_agg_angebote_ins'")
+            for sql in _AGGREGATE_SQLS:
+                _execute(conn, sql)
+            if not rows:
+                for sql in _AGGREGATE_REBUILD_SQLS:
+                    _execute(conn, sql)
+
+            # Volltextsuche (nur wenn SQLite/Turso mit FTS5 gebaut ist)
+            rows, _ = _fetchall(conn,
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'angebote_fts'")
+            try:
+                for sql in _FTS_SQLS:
+                    _execute(conn, sql)
+                if not rows:
+                    _execute(conn, "INSERT INTO angebote_fts (angebote_fts) VALUES ('rebuild')")
+                    _execute(conn, "INSERT INTO positionen_fts (positionen_fts) VALUES ('rebuild')")
+                self.fts_available = True
+            except Exception as e:
+                print(f"⚠️ FTS5 nicht verfügbar, Suche über LIKE: {e}")
+                self.fts_available = False
+            conn.commit()
+
+    def rebuild_aggregates(self):
+        """Berechnet alle Kennzahlen-Tabellen neu aus angebote/produkt_stats"""
+        with self._connection() as conn:
+            for sql in _AGGREGATE_REBUILD_SQLS:
+                _execute(conn, sql)
+            conn.commit()
 
     def _query_to_df(self, sql, params=()):
-        conn, mode = _get_connection()
-        rows, desc = _fetchall(conn, sql, params)
-        conn.close()
+        with self._connection() as conn:
+            rows, desc = _fetchall(conn, sql, params)
         if desc:
             return pd.DataFrame(rows, columns=[d[0] for d in desc])
         return pd.DataFrame()
@@ -126,8 +658,7 @@ class CoolMatchDatabase:
         keine Duplikate, auch bei mehreren Tabs/Sessions.
         """
         year = datetime.now().strftime("%Y")
-        conn, mode = _get_connection()
-        try:
+        with self._connection() as conn:
             rows, _ = _fetchall(
                 conn,
                 "SELECT angebots_nr FROM angebote WHERE angebots_nr LIKE ? ORDER BY angebots_nr DESC LIMIT 1",
@@ -143,224 +674,588 @@ class CoolMatchDatabase:
             else:
                 next_seq = 1
             return f"AN-{year}-{next_seq:04d}"
-        finally:
-            conn.close()
 
     # ============================================================
-    # FIX: save_quote mit INSERT OR UPDATE (kein Duplikat-Fehler)
+    # save_quote: UPSERT + gebündelte Positionen in einer Transaktion
+    # Konstante Anzahl Round-Trips, unabhängig von der Positionsanzahl
     # ============================================================
     def save_quote(self, quote_header: Dict, positions: List[Dict]) -> int:
         """
-        Speichert Angebot. Bei bereits vorhandener angebots_nr → UPDATE statt INSERT.
+        Speichert Angebot. Bei bereits vorhandener angebots_nr → UPDATE statt INSERT
+        (INSERT ... ON CONFLICT(angebots_nr) DO UPDATE).
         Verhindert: SQLite error: UNIQUE constraint failed: angebote.angebots_nr
         """
-        conn, mode = _get_connection()
-        try:
-            # Prüfen ob Angebotsnummer schon existiert
-            existing_rows, _ = _fetchall(
-                conn,
-                "SELECT id FROM angebote WHERE angebots_nr = ?",
-                (quote_header['angebots_nr'],)
-            )
+        header_values = tuple(
+            quote_header.get(col, default) if default is not None else quote_header[col]
+            for col, default in _QUOTE_COLUMNS
+        )
+        update_set = ", ".join(f"{col}=excluded.{col}" for col, _ in _QUOTE_COLUMNS[1:]
+                               if col != 'monday_item_id')
+        # Leere monday_item_id überschreibt nie eine bereits bekannte: entweder aus
+        # dem bestehenden Angebot oder aus einem schon erledigten Outbox-Auftrag
+        placeholders = ", ".join(
+            "COALESCE(NULLIF(?, ''), (SELECT item_id FROM monday_outbox WHERE angebots_nr = ?"
+            " AND item_id IS NOT NULL ORDER BY id DESC LIMIT 1), '')"
+            if col == 'monday_item_id' else "?"
+            for col, _ in _QUOTE_COLUMNS
+        )
+        params = []
+        for (col, _), value in zip(_QUOTE_COLUMNS, header_values):
+            params.append(value)
+            if col == 'monday_item_id':
+                params.append(quote_header['angebots_nr'])
 
-            if existing_rows:
-                # ── UPDATE vorhandenen Datensatz ──
-                angebots_id = existing_rows[0][0]
-                _execute(conn, """
-                    UPDATE angebote SET
-                        kunde_name=?, kunde_projekt=?, kunde_nr=?, gueltig_bis=?,
-                        bearbeiter=?, firma=?, summe_netto=?, summe_brutto=?,
-                        mwst_satz=?, rabatt_prozent=?, rabatt_absolut=?,
-                        manual_preis=?, preise_verborgen=?, status=?,
-                        monday_item_id=?, closing_text=?, notizen=?
-                    WHERE id=?
-                """, (
-                    quote_header['kunde_name'],
-                    quote_header.get('kunde_projekt', ''),
-                    quote_header.get('kunde_nr', ''),
-                    quote_header.get('gueltig_bis', ''),
-                    quote_header.get('bearbeiter', ''),
-                    quote_header.get('firma', ''),
-                    quote_header['summe_netto'],
-                    quote_header['summe_brutto'],
-                    quote_header['mwst_satz'],
-                    quote_header.get('rabatt_prozent', 0),
-                    quote_header.get('rabatt_absolut', 0),
-                    quote_header.get('manual_preis', 0),
-                    quote_header.get('preise_verborgen', 0),
-                    quote_header.get('status', 'Erstellt'),
-                    quote_header.get('monday_item_id', ''),
-                    quote_header.get('closing_text', ''),
-                    quote_header.get('notizen', ''),
-                    angebots_id
-                ))
-                # Alte Positionen löschen (werden unten neu geschrieben)
-                _execute(conn, "DELETE FROM positionen WHERE angebots_id = ?", (angebots_id,))
+        with self._connection() as conn:
+            _execute(conn, f"""
+                INSERT INTO angebote ({", ".join(col for col, _ in _QUOTE_COLUMNS)})
+                VALUES ({placeholders})
+                ON CONFLICT(angebots_nr) DO UPDATE SET {update_set},
+                    monday_item_id = COALESCE(NULLIF(excluded.monday_item_id, ''), angebote.monday_item_id)
+            """, params)
+            rows, _ = _fetchall(conn, "SELECT id FROM angebote WHERE angebots_nr = ?",
+                                (quote_header['angebots_nr'],))
+            angebots_id = rows[0][0]
 
-            else:
-                # ── INSERT neuer Datensatz ──
-                _execute(conn, """
-                    INSERT INTO angebote
-                    (angebots_nr, kunde_name, kunde_projekt, kunde_nr, gueltig_bis,
-                     bearbeiter, firma, summe_netto, summe_brutto, mwst_satz,
-                     rabatt_prozent, rabatt_absolut, manual_preis, preise_verborgen,
-                     status, monday_item_id, closing_text, notizen)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    quote_header['angebots_nr'],
-                    quote_header['kunde_name'],
-                    quote_header.get('kunde_projekt', ''),
-                    quote_header.get('kunde_nr', ''),
-                    quote_header.get('gueltig_bis', ''),
-                    quote_header.get('bearbeiter', ''),
-                    quote_header.get('firma', ''),
-                    quote_header['summe_netto'],
-                    quote_header['summe_brutto'],
-                    quote_header['mwst_satz'],
-                    quote_header.get('rabatt_prozent', 0),
-                    quote_header.get('rabatt_absolut', 0),
-                    quote_header.get('manual_preis', 0),
-                    quote_header.get('preise_verborgen', 0),
-                    quote_header.get('status', 'Erstellt'),
-                    quote_header.get('monday_item_id', ''),
-                    quote_header.get('closing_text', ''),
-                    quote_header.get('notizen', '')
-                ))
-                rows2, _ = _fetchall(conn, "SELECT last_insert_rowid()")
-                angebots_id = rows2[0][0]
-
-            # Positionen einfügen
-            for pos in positions:
-                _execute(conn, """
-                    INSERT INTO positionen
-                    (angebots_id, position_nr, typ, artikel_nr, beschreibung,
-                     menge, einzelpreis, rabatt, gesamt, notiz)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    angebots_id,
-                    pos.get('Pos', 0),
-                    pos.get('Typ', ''),
-                    pos.get('Artikel', ''),
-                    pos.get('Beschreibung', ''),
-                    pos.get('Menge', 0),
-                    pos.get('Einzelpreis', 0),
-                    pos.get('Rabatt', 0),
-                    pos.get('Menge', 0) * pos.get('Einzelpreis', 0) * (1 - pos.get('Rabatt', 0) / 100),
-                    pos.get('Notiz', '')
-                ))
-                _execute(conn, """
-                    INSERT INTO produkt_stats
-                    (artikel_nr, beschreibung, kategorie, preis, rabatt, menge)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    pos.get('Artikel', ''),
-                    pos.get('Beschreibung', ''),
-                    pos.get('Typ', ''),
-                    pos.get('Einzelpreis', 0),
-                    pos.get('Rabatt', 0),
-                    pos.get('Menge', 0)
-                ))
+            # Alte Positionen löschen (bei neuem Angebot no-op)
+            _execute(conn, "DELETE FROM positionen WHERE angebots_id = ?", (angebots_id,))
+
+            # Warenkorb-Records bringen die Engine-Summe (Gesamt) mit → übernehmen;
+            # nur Positionen ohne Gesamt (andere Aufrufer) in einem Durchlauf rechnen
+            gesamt_werte = [pos.get('Gesamt') for pos in positions]
+            missing = [i for i, total in enumerate(gesamt_werte) if total is None]
+            if missing:
+                for i, cents in zip(missing, price_positions([positions[i] for i in missing]).tolist()):
+                    gesamt_werte[i] = cents / 100
+            _insert_many(conn, "positionen",
+                         ["angebots_id", "position_nr", "typ", "artikel_nr", "beschreibung",
+                          "menge", "einzelpreis", "rabatt", "gesamt", "notiz"],
+                         [(
+                             angebots_id,
+                             pos.get('Pos', 0),
+                             pos.get('Typ', ''),
+                             pos.get('Artikel', ''),
+                             pos.get('Beschreibung', ''),
+                             pos.get('Menge', 0),
+                             pos.get('Einzelpreis', 0),
+                             pos.get('Rabatt', 0),
+                             gesamt,
+                             pos.get('Notiz', '')
+                         ) for pos, gesamt in zip(positions, gesamt_werte)])
+            _insert_many(conn, "produkt_stats",
+                         ["artikel_nr", "beschreibung", "kategorie", "preis", "rabatt", "menge"],
+                         [(
+                             pos.get('Artikel', ''),
+                             pos.get('Beschreibung', ''),
+                             pos.get('Typ', ''),
+                             pos.get('Einzelpreis', 0),
+                             pos.get('Rabatt', 0),
+                             pos.get('Menge', 0)
+                         ) for pos in positions])
 
             conn.commit()
             return angebots_id
 
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
-
     def get_all_quotes(self, limit: int = None) -> pd.DataFrame:
         sql = "SELECT * FROM angebote ORDER BY erstellt_am DESC"
         if limit:
             sql += f" LIMIT {limit}"
         return self._query_to_df(sql)
 
+    def get_quotes_page(self, cursor: Optional[tuple] = None,
+                        limit: int = 50) -> Tuple[pd.DataFrame, Optional[tuple]]:
+        """
+        Keyset-Pagination der Angebote (neueste zuerst, sortiert nach erstellt_am, id).
+        `cursor` = (erstellt_am, id) der letzten Zeile der Vorseite, None = erste Seite.
+        Rückgabe: (DataFrame mit QUOTE_LIST_COLUMNS, Cursor der nächsten Seite oder None).
+        Nutzt idx_datum (SQLite hängt die rowid = id an) → konstante Kosten pro Seite.
+        """
+        cols = ", ".join(QUOTE_LIST_COLUMNS)
+        if cursor is None:
+            df = self._query_to_df(f"""
+                SELECT {cols} FROM angebote
+                ORDER BY erstellt_am DESC, id DESC LIMIT ?
+            """, (limit + 1,))
+        else:
+            erstellt_am, last_id = cursor
+            df = self._query_to_df(f"""
+                SELECT {cols} FROM angebote
+                WHERE erstellt_am <= ? AND (erstellt_am < ? OR id < ?)
+                ORDER BY erstellt_am DESC, id DESC LIMIT ?
+            """, (erstellt_am, erstellt_am, last_id, limit + 1))
+
+        if len(df) <= limit:
+            return df, None
+        df = df.iloc[:limit]
+        last = df.iloc[-1]
+        return df, (last['erstellt_am'], int(last['id']))
+
+    def get_quote_count(self) -> int:
+        """Anzahl Angebote aus den Kennzahlen-Tabellen (kein COUNT(*)-Scan)"""
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, "SELECT SUM(anzahl) FROM agg_status")
+        return int(rows[0][0] or 0)
+
     def get_quote_by_nr(self, angebots_nr: str) -> Optional[Dict]:
-        conn, mode = _get_connection()
-        rows, _ = _fetchall(conn, "SELECT * FROM angebote WHERE angebots_nr = ?", (angebots_nr,))
-        if not rows:
-            conn.close()
-            return None
-        header = rows[0]
-        pos_rows, _ = _fetchall(conn,
-            "SELECT * FROM positionen WHERE angebots_id = ? ORDER BY position_nr", (header[0],))
-        conn.close()
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, "SELECT * FROM angebote WHERE angebots_nr = ?", (angebots_nr,))
+            if not rows:
+                return None
+            header = rows[0]
+            pos_rows, _ = _fetchall(conn,
+                "SELECT * FROM positionen WHERE angebots_id = ? ORDER BY position_nr", (header[0],))
         return {'header': header, 'positions': pos_rows}
 
+    def get_quotes_bulk(self, angebots_nrs: List[str], chunk_size: int = 500) -> Dict[str, Dict]:
+        """
+        Kopf + Positionen vieler Angebote mit je einer IN-Abfrage pro Block
+        → {angebots_nr: {'header': dict, 'positions': [dict, ...]}}
+        """
+        result: Dict[str, Dict] = {}
+        with self._connection() as conn:
+            for i in range(0, len(angebots_nrs), chunk_size):
+                block = angebots_nrs[i:i + chunk_size]
+                marks = ", ".join("?" * len(block))
+                rows, desc = _fetchall(conn, f"SELECT * FROM angebote WHERE angebots_nr IN ({marks})",
+                                       tuple(block))
+                if not rows:
+                    continue
+                cols = [d[0] for d in desc]
+                by_id = {}
+                for row in rows:
+                    header = dict(zip(cols, row))
+                    result[header['angebots_nr']] = by_id[header['id']] = {'header': header, 'positions': []}
+
+                ids = list(by_id)
+                pos_rows, pos_desc = _fetchall(conn, f"""
+                    SELECT * FROM positionen WHERE angebots_id IN ({", ".join("?" * len(ids))})
+                    ORDER BY angebots_id, position_nr
+                """, tuple(ids))
+                pos_cols = [d[0] for d in pos_desc] if pos_desc else []
+                for row in pos_rows:
+                    pos = dict(zip(pos_cols, row))
+                    by_id[pos['angebots_id']]['positions'].append(pos)
+        return result
+
+    def get_quote_numbers(self, status: str = None) -> List[str]:
+        """Alle Angebotsnummern (optional nur mit Status), neueste zuerst"""
+        sql = "SELECT angebots_nr FROM angebote"
+        params = ()
+        if status:
+            sql += " WHERE status = ?"
+            params = (status,)
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, sql + " ORDER BY erstellt_am DESC, id DESC", params)
+        return [r[0] for r in rows]
+
+    def get_open_positions(self, statuses: List[str] = None,
+                           artikel_nrs: List[str] = None) -> pd.DataFrame:
+        """
+        Alle Positionen offener Angebote mit den Kopf-Feldern für die Neubewertung
+        (ein JOIN statt Angebot für Angebot). Mit artikel_nrs: nur Angebote, die
+        mindestens einen dieser Artikel enthalten (alle ihre Positionen).
+        """
+        statuses = list(statuses or OPEN_QUOTE_STATUSES)
+        sql = f"""
+            SELECT a.angebots_nr, a.status, a.kunde_name, a.firma, a.mwst_satz,
+                   a.rabatt_prozent, a.rabatt_absolut, a.manual_preis,
+                   a.summe_netto, a.summe_brutto,
+                   p.position_nr, p.typ, p.artikel_nr, p.menge, p.einzelpreis, p.rabatt
+            FROM angebote a JOIN positionen p ON p.angebots_id = a.id
+            WHERE a.status IN ({", ".join("?" * len(statuses))})
+        """
+        if artikel_nrs is None:
+            return self._query_to_df(sql + " ORDER BY a.id, p.position_nr", tuple(statuses))
+
+        # Betroffene Angebote blockweise über die Artikelnummern bestimmen
+        ids = set()
+        artikel_nrs = list(artikel_nrs)
+        with self._connection() as conn:
+            for i in range(0, len(artikel_nrs), 500):
+                block = artikel_nrs[i:i + 500]
+                rows, _ = _fetchall(conn, f"""
+                    SELECT DISTINCT angebots_id FROM positionen
+                    WHERE artikel_nr IN ({", ".join("?" * len(block))})
+                """, tuple(block))
+                ids.update(r[0] for r in rows)
+        frames = []
+        ids = sorted(ids)
+        for i in range(0, len(ids), 500):
+            block = ids[i:i + 500]
+            frames.append(self._query_to_df(
+                sql + f" AND a.id IN ({', '.join('?' * len(block))}) ORDER BY a.id, p.position_nr",
+                tuple(statuses) + tuple(block)))
+        if not frames:
+            return self._query_to_df(sql + " AND 0", tuple(statuses))
+        return pd.concat(frames, ignore_index=True)
+
     def get_statistics(self) -> Dict:
-        conn, mode = _get_connection()
-        rows, _ = _fetchall(conn, """
-            SELECT COUNT(*), SUM(summe_brutto), AVG(summe_brutto),
-                   MIN(summe_brutto), MAX(summe_brutto) FROM angebote
-        """)
-        row = rows[0]
-        conn.close()
+        # Eine Verbindung für alle Abfragen (verschachtelte _query_to_df nutzen sie mit)
+        with self._connection() as conn:
+            return self._get_statistics(conn)
+
+    def _get_statistics(self, conn) -> Dict:
+        # Gesamt aus agg_status (wenige Zeilen). MIN und MAX als getrennte Abfragen:
+        # einzeln je ein Index-Lookup (SEARCH idx_summe), zusammen ein Scan über den Index
+        rows, _ = _fetchall(conn, "SELECT SUM(anzahl), SUM(summe) FROM agg_status")
+        anzahl, summe = rows[0]
+        rows, _ = _fetchall(conn, "SELECT MIN(summe_brutto) FROM angebote")
+        min_val = rows[0][0]
+        rows, _ = _fetchall(conn, "SELECT MAX(summe_brutto) FROM angebote")
+        max_val = rows[0][0]
         stats = {'gesamt': {
-            'anzahl': row[0] or 0, 'summe': row[1] or 0,
-            'durchschnitt': row[2] or 0, 'min': row[3] or 0, 'max': row[4] or 0
+            'anzahl': anzahl or 0, 'summe': summe or 0,
+            'durchschnitt': (summe / anzahl) if anzahl else 0,
+            'min': min_val or 0, 'max': max_val or 0
         }}
         stats['monthly'] = self._query_to_df("""
-            SELECT strftime('%Y-%m', erstellt_am) as monat,
-                   COUNT(*) as anzahl, SUM(summe_brutto) as summe
-            FROM angebote GROUP BY monat ORDER BY monat DESC LIMIT 12
+            SELECT monat, anzahl, summe FROM agg_monat ORDER BY monat DESC LIMIT 12
         """)
         stats['top_products'] = self._query_to_df("""
-            SELECT artikel_nr, beschreibung, kategorie, COUNT(*) as anzahl,
-                   SUM(menge) as gesamt_menge, AVG(preis) as durchschnittspreis,
-                   AVG(rabatt) as durchschnittsrabatt
-            FROM produkt_stats GROUP BY artikel_nr ORDER BY anzahl DESC LIMIT 15
+            SELECT artikel_nr, beschreibung, kategorie, anzahl,
+                   gesamt_menge, summe_preis / anzahl as durchschnittspreis,
+                   summe_rabatt / anzahl as durchschnittsrabatt
+            FROM agg_produkt ORDER BY anzahl DESC LIMIT 15
         """)
         stats['categories'] = self._query_to_df("""
-            SELECT kategorie, COUNT(*) as anzahl,
-                   SUM(menge * preis * (1 - rabatt/100)) as umsatz
-            FROM produkt_stats WHERE kategorie != ''
-            GROUP BY kategorie ORDER BY umsatz DESC
+            SELECT kategorie, anzahl, umsatz FROM agg_kategorie ORDER BY umsatz DESC
         """)
         stats['status'] = self._query_to_df("""
-            SELECT status, COUNT(*) as anzahl, SUM(summe_brutto) as summe
-            FROM angebote GROUP BY status
+            SELECT status, anzahl, summe FROM agg_status
         """)
         return stats
 
-    def search_quotes(self, search_term: str) -> pd.DataFrame:
+    def search_quotes(self, search_term: str, limit: int = 50, offset: int = 0) -> pd.DataFrame:
+        """
+        Volltextsuche über Angebots-Nr, Kunde, Projekt, Kunden-Nr und Positionen.
+        Ergebnis nach Relevanz (bm25) sortiert und paginiert (limit/offset).
+        Fallback auf LIKE, wenn FTS5 fehlt oder der Suchausdruck ungültig ist.
+        """
+        if self.fts_available and search_term.strip():
+            match = _fts_match_expression(search_term)
+            try:
+                # Treffer in Positionen zählen halb so viel wie Treffer im Kopf
+                return self._query_to_df(f"""
+                    SELECT {", ".join("a." + c for c in QUOTE_LIST_COLUMNS)}, h.score FROM (
+                        SELECT aid, MIN(score) AS score FROM (
+                            SELECT rowid AS aid, bm25(angebote_fts) AS score
+                            FROM angebote_fts WHERE angebote_fts MATCH ?
+                            UNION ALL
+                            SELECT p.angebots_id AS aid, bm25(positionen_fts) * 0.5 AS score
+                            FROM positionen_fts JOIN positionen p ON p.id = positionen_fts.rowid
+                            WHERE positionen_fts MATCH ?
+                        ) GROUP BY aid
+                    ) h JOIN angebote a ON a.id = h.aid
+                    ORDER BY h.score, a.erstellt_am DESC
+                    LIMIT ? OFFSET ?
+                """, (match, match, limit, offset))
+            except Exception as e:
+                print(f"⚠️ FTS-Suche fehlgeschlagen, Fallback LIKE: {e}")
+
         p = f"%{search_term}%"
-        return self._query_to_df("""
-            SELECT * FROM angebote
+        return self._query_to_df(f"""
+            SELECT {", ".join(QUOTE_LIST_COLUMNS)} FROM angebote
             WHERE kunde_name LIKE ? OR angebots_nr LIKE ?
             OR kunde_projekt LIKE ? OR kunde_nr LIKE ?
+            OR id IN (SELECT angebots_id FROM positionen WHERE beschreibung LIKE ?)
             ORDER BY erstellt_am DESC
-        """, (p, p, p, p))
+            LIMIT ? OFFSET ?
+        """, (p, p, p, p, p, limit, offset))
 
     def update_monday_id(self, angebots_nr: str, monday_item_id: str):
-        conn, mode = _get_connection()
-        _execute(conn, "UPDATE angebote SET monday_item_id = ? WHERE angebots_nr = ?",
-                 (monday_item_id, angebots_nr))
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            _execute(conn, "UPDATE angebote SET monday_item_id = ? WHERE angebots_nr = ?",
+                     (monday_item_id, angebots_nr))
+            conn.commit()
+
+    # ============================================================
+    # Monday-Outbox (Aufträge für den MondaySyncWorker)
+    # ============================================================
+    def enqueue_monday_sync(self, angebots_nr: str, quote_data: Dict,
+                            pdf_bytes: bytes = None, filename: str = None,
+                            pdf_hash: str = None) -> int:
+        """
+        Legt einen Upload-Auftrag an und kehrt sofort zurück → Job-ID.
+        Gibt es für das Angebot schon ein Monday-Item, wird nur die Datei hochgeladen.
+        """
+        payload = json.dumps(quote_data, default=_json_default)
+        with self._connection() as conn:
+            cur = _execute(conn, """
+                INSERT INTO monday_outbox (angebots_nr, payload, pdf, filename, pdf_hash,
+                                           next_attempt_at, item_id)
+                VALUES (?, ?, ?, ?, ?, ?, COALESCE(
+                    (SELECT item_id FROM monday_outbox WHERE angebots_nr = ? AND item_id IS NOT NULL
+                     ORDER BY id DESC LIMIT 1),
+                    (SELECT NULLIF(monday_item_id, '') FROM angebote WHERE angebots_nr = ?)))
+            """, (angebots_nr, payload, pdf_bytes, filename, pdf_hash, time.time(),
+                  angebots_nr, angebots_nr))
+            job_id = cur.lastrowid
+            conn.commit()
+            return job_id
+
+    def find_monday_job(self, angebots_nr: str, pdf_hash: str) -> Optional[Dict]:
+        """Offener oder erledigter Auftrag mit identischem PDF → Duplikat nicht erneut senden"""
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, """
+                SELECT id, status, item_id FROM monday_outbox
+                WHERE angebots_nr = ? AND pdf_hash = ? AND status IN ('pending', 'done')
+                ORDER BY id DESC LIMIT 1
+            """, (angebots_nr, pdf_hash))
+        return dict(zip(["id", "status", "item_id"], rows[0])) if rows else None
+
+    def claim_monday_jobs(self, limit: int = 5, lease_seconds: float = 120) -> List[Dict]:
+        """
+        Reserviert fällige Aufträge für `lease_seconds` (locked_until).
+        Stirbt der Worker, werden sie nach Ablauf der Frist erneut vergeben.
+        """
+        now = time.time()
+        claimed = []
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, f"""
+                SELECT {", ".join(OUTBOX_JOB_COLUMNS)} FROM monday_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ? AND locked_until <= ?
+                ORDER BY next_attempt_at LIMIT ?
+            """, (now, now, limit))
+            for row in rows:
+                cur = _execute(conn, """
+                    UPDATE monday_outbox SET locked_until = ?
+                    WHERE id = ? AND status = 'pending' AND locked_until <= ?
+                """, (now + lease_seconds, row[0], now))
+                if cur.rowcount == 1:
+                    job = dict(zip(OUTBOX_JOB_COLUMNS, row))
+                    job['payload'] = json.loads(job['payload'])
+                    claimed.append(job)
+            conn.commit()
+        return claimed
+
+    def checkpoint_monday_job(self, job_id: int, item_id: str):
+        """Item ist angelegt → bei Retry nur noch PDF-Upload, kein Duplikat"""
+        with self._connection() as conn:
+            _execute(conn, "UPDATE monday_outbox SET item_id = ? WHERE id = ?", (item_id, job_id))
+            conn.commit()
+
+    def complete_monday_job(self, job_id: int):
+        with self._connection() as conn:
+            _execute(conn, """
+                UPDATE monday_outbox
+                SET status = 'done', pdf = NULL, last_error = NULL, locked_until = 0,
+                    erledigt_am = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (job_id,))
+            conn.commit()
+
+    def fail_monday_job(self, job_id: int, error: str, next_attempt_at: Optional[float]):
+        """Fehlversuch zählen; next_attempt_at=None → endgültig 'failed'"""
+        with self._connection() as conn:
+            _execute(conn, """
+                UPDATE monday_outbox
+                SET attempts = attempts + 1, last_error = ?, locked_until = 0,
+                    status = CASE WHEN ? IS NULL THEN 'failed' ELSE 'pending' END,
+                    next_attempt_at = IFNULL(?, next_attempt_at)
+                WHERE id = ?
+            """, (str(error)[:500], next_attempt_at, next_attempt_at, job_id))
+            conn.commit()
+
+    def retry_failed_monday_jobs(self) -> int:
+        """Setzt endgültig fehlgeschlagene Aufträge wieder auf 'pending'"""
+        with self._connection() as conn:
+            cur = _execute(conn, """
+                UPDATE monday_outbox SET status = 'pending', attempts = 0, next_attempt_at = ?
+                WHERE status = 'failed'
+            """, (time.time(),))
+            conn.commit()
+            return cur.rowcount
+
+    def get_monday_outbox_stats(self) -> Dict:
+        """Anzahl Aufträge je Status, z.B. {'pending': 2, 'done': 40, 'failed': 1}"""
+        rows = self._query_to_df("SELECT status, COUNT(*) AS n FROM monday_outbox GROUP BY status")
+        return dict(zip(rows['status'], rows['n'].astype(int))) if not rows.empty else {}
+
+    def iter_quotes_for_sync(self, batch_size: int = 500):
+        """Alle Angebote (Kopfdaten für Monday) seitenweise nach id → dicts"""
+        cols = ["id", "angebots_nr", "erstellt_am", "summe_brutto", "firma", "monday_item_id"]
+        last_id = 0
+        while True:
+            with self._connection() as conn:
+                rows, _ = _fetchall(conn, f"""
+                    SELECT {", ".join(cols)} FROM angebote WHERE id > ? ORDER BY id LIMIT ?
+                """, (last_id, batch_size))
+            for row in rows:
+                yield dict(zip(cols, row))
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def set_monday_ids(self, item_ids: Dict[str, str]) -> int:
+        """Mehrere monday_item_id (angebots_nr → item_id) in einer Transaktion setzen"""
+        if not item_ids:
+            return 0
+        with self._connection() as conn:
+            cur = conn.cursor()
+            cur.executemany("UPDATE angebote SET monday_item_id = ? WHERE angebots_nr = ?",
+                            [(item_id, nr) for nr, item_id in item_ids.items()])
+            conn.commit()
+        return len(item_ids)
+
+    def get_pending_monday_numbers(self) -> set:
+        """Angebotsnummern mit offenem Outbox-Auftrag (werden vom Worker erledigt)"""
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn,
+                "SELECT DISTINCT angebots_nr FROM monday_outbox WHERE status = 'pending'")
+        return {r[0] for r in rows}
+
+    # ============================================================
+    # Katalog-Versionen
+    # ============================================================
+    def get_catalog_version(self, katalog: str, sha256: str = None) -> Optional[Dict]:
+        """Version mit diesem Hash, ohne Hash die zuletzt importierte"""
+        sql = f"SELECT {', '.join(CATALOG_VERSION_COLUMNS)} FROM katalog_versionen WHERE katalog = ?"
+        params = (katalog,)
+        if sha256:
+            sql += " AND sha256 = ?"
+            params += (sha256,)
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, sql + " ORDER BY id DESC LIMIT 1", params)
+        return dict(zip(CATALOG_VERSION_COLUMNS, rows[0])) if rows else None
+
+    def get_previous_catalog_version(self, version_id: int) -> Optional[Dict]:
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, f"""
+                SELECT {', '.join(CATALOG_VERSION_COLUMNS)} FROM katalog_versionen
+                WHERE katalog = (SELECT katalog FROM katalog_versionen WHERE id = ?) AND id < ?
+                ORDER BY id DESC LIMIT 1
+            """, (version_id, version_id))
+        return dict(zip(CATALOG_VERSION_COLUMNS, rows[0])) if rows else None
+
+    def get_catalog_versions(self, katalog: str, limit: int = 20) -> pd.DataFrame:
+        return self._query_to_df(f"""
+            SELECT {', '.join(CATALOG_VERSION_COLUMNS)} FROM katalog_versionen
+            WHERE katalog = ? ORDER BY id DESC LIMIT ?
+        """, (katalog, limit))
+
+    def get_catalog_articles(self, version_id: int) -> pd.DataFrame:
+        return self._query_to_df(
+            "SELECT artikelnummer, bezeichnung, artikelgruppe, preis FROM katalog_artikel "
+            "WHERE version_id = ?", (version_id,))
+
+    def add_catalog_version(self, katalog: str, sha256: str, quelle: str,
+                            articles: pd.DataFrame, counts: Dict = None) -> int:
+        """
+        Speichert eine Preisliste als neue Version (Artikel gebündelt) → Version-ID.
+        Schon vorhandener Hash → bestehende ID, nichts wird doppelt gespeichert.
+        """
+        counts = counts or {}
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, "SELECT id FROM katalog_versionen WHERE katalog = ? AND sha256 = ?",
+                                (katalog, sha256))
+            if rows:
+                return rows[0][0]
+            cur = _execute(conn, """
+                INSERT INTO katalog_versionen (katalog, sha256, quelle, artikel, neu, entfernt, geaendert)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (katalog, sha256, quelle, len(articles), counts.get('neu', 0),
+                  counts.get('entfernt', 0), counts.get('geaendert', 0)))
+            version_id = cur.lastrowid
+            _insert_many(conn, "katalog_artikel",
+                         ["version_id", "artikelnummer", "bezeichnung", "artikelgruppe", "preis"],
+                         [(version_id, nr, bez, gruppe, None if preis != preis else float(preis))
+                          for nr, bez, gruppe, preis in articles[
+                              ['artikelnummer', 'bezeichnung', 'artikelgruppe', 'preis']
+                          ].itertuples(index=False, name=None)])
+            conn.commit()
+            return version_id
+
+    # ============================================================
+    # Katalog-Tabellen (CATALOG_BACKEND = "database")
+    # ============================================================
+    def get_catalog_import(self, katalog: str) -> Optional[Dict]:
+        """Stand des importierten Katalogs (sha256, quelle, zeilen, schema_version) oder None"""
+        cols = ["katalog", "sha256", "quelle", "zeilen", "schema_version", "importiert_am"]
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, f"SELECT {', '.join(cols)} FROM katalog_import WHERE katalog = ?",
+                                (katalog,))
+        return dict(zip(cols, rows[0])) if rows else None
+
+    def replace_catalog(self, katalog: str, rows: List[tuple], sha256: str, quelle: str = "",
+                        ig_typen: List[tuple] = None, schema_version: int = 0) -> bool:
+        """
+        Ersetzt den Katalog in einer Transaktion (Zeilen in Spaltenreihenfolge von
+        _CATALOG_TABLES, beim Samsung-Katalog + (ig_typ, artikel_id)-Paare).
+        Hat ein anderer Worker denselben Stand (Hash + Schema) schon importiert → False.
+        """
+        table, columns = _CATALOG_TABLES[katalog]
+        with self._connection() as conn:
+            current, _ = _fetchall(conn, "SELECT sha256, schema_version FROM katalog_import WHERE katalog = ?",
+                                   (katalog,))
+            if current and tuple(current[0]) == (sha256, schema_version):
+                return False
+            _execute(conn, f"DELETE FROM {table}")
+            _insert_many(conn, table, columns, rows)
+            if katalog == 'samsung':
+                _execute(conn, "DELETE FROM katalog_samsung_typ")
+                _insert_many(conn, "katalog_samsung_typ", ["ig_typ", "artikel_id"], ig_typen or [])
+            _execute(conn, """
+                INSERT INTO katalog_import (katalog, sha256, quelle, zeilen, schema_version, importiert_am)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(katalog) DO UPDATE SET sha256 = excluded.sha256, quelle = excluded.quelle,
+                    zeilen = excluded.zeilen, schema_version = excluded.schema_version,
+                    importiert_am = excluded.importiert_am
+            """, (katalog, sha256, quelle, len(rows), schema_version))
+            conn.commit()
+            return True
+
+    def query_catalog_samsung(self, system: str, geraet: str = None, ig_typ: str = None,
+                              query: str = "", limit: int = None) -> pd.DataFrame:
+        """
+        Samsung-Geräte eines Systems (RAC/BAC/FJM) über den Index, optional AG/IG + Typ.
+        Jeder Suchbegriff muss im Suchtext vorkommen (wie CatalogSearchIndex).
+        """
+        sql = ("SELECT id, artikelnummer AS Artikelnummer, bezeichnung AS Bezeichnung, "
+               "artikelgruppe AS Artikelgruppe, listenpreis AS Listenpreis "
+               "FROM katalog_samsung WHERE system = ?")
+        params = [system]
+        if geraet:
+            sql += " AND geraet = ?"
+            params.append(geraet)
+        if ig_typ:
+            sql += " AND id IN (SELECT artikel_id FROM katalog_samsung_typ WHERE ig_typ = ?)"
+            params.append(ig_typ)
+        for term in str(query).lower().split():
+            sql += " AND suchtext LIKE ? ESCAPE '\\'"
+            params.append(_like_term(term))
+        sql += " ORDER BY id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._query_to_df(sql, tuple(params)).set_index('id')
+
+    def query_catalog_zubehoer(self, query: str = "") -> pd.DataFrame:
+        """Zubehör mit allen Suchbegriffen im Suchtext (Reihenfolge wie in der Datei)"""
+        sql = ("SELECT id, artikel AS Artikel, beschreibung AS Beschreibung, preis AS Preis, "
+               "suchtext AS Suchtext FROM katalog_zubehoer WHERE 1 = 1")
+        params = []
+        for term in str(query).lower().split():
+            sql += " AND suchtext LIKE ? ESCAPE '\\'"
+            params.append(_like_term(term))
+        return self._query_to_df(sql + " ORDER BY id", tuple(params)).set_index('id')
 
     def update_status(self, angebots_nr: str, status: str):
-        conn, mode = _get_connection()
-        _execute(conn, "UPDATE angebote SET status = ? WHERE angebots_nr = ?",
-                 (status, angebots_nr))
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            _execute(conn, "UPDATE angebote SET status = ? WHERE angebots_nr = ?",
+                     (status, angebots_nr))
+            conn.commit()
 
     def delete_quote(self, angebots_nr: str):
-        conn, mode = _get_connection()
-        rows, _ = _fetchall(conn, "SELECT id FROM angebote WHERE angebots_nr = ?", (angebots_nr,))
-        if rows:
-            aid = rows[0][0]
-            _execute(conn, "DELETE FROM positionen WHERE angebots_id = ?", (aid,))
-            _execute(conn, "DELETE FROM angebote WHERE id = ?", (aid,))
-            conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            rows, _ = _fetchall(conn, "SELECT id FROM angebote WHERE angebots_nr = ?", (angebots_nr,))
+            if rows:
+                aid = rows[0][0]
+                _execute(conn, "DELETE FROM positionen WHERE angebots_id = ?", (aid,))
+                _execute(conn, "DELETE FROM angebote WHERE id = ?", (aid,))
+                conn.commit()
 
     def export_to_excel(self, filepath: str):
-        conn, mode = _get_connection()
-        rows_a, desc_a = _fetchall(conn, "SELECT * FROM angebote")
-        rows_p, desc_p = _fetchall(conn, "SELECT * FROM positionen")
-        conn.close()
+        with self._connection() as conn:
+            rows_a, desc_a = _fetchall(conn, "SELECT * FROM angebote")
+            rows_p, desc_p = _fetchall(conn, "SELECT * FROM positionen")
         df_a = pd.DataFrame(rows_a, columns=[d[0] for d in desc_a]) if desc_a else pd.DataFrame()
         df_p = pd.DataFrame(rows_p, columns=[d[0] for d in desc_p]) if desc_p else pd.DataFrame()
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
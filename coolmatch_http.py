@@ -0,0 +1,185 @@
+# ==========================================
+# DATEI: coolmatch_http.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Gemeinsame HTTP-Session für externe APIs (Monday.com)
+#   - requests.Session mit Keep-Alive und Connection-Pool pro Prozess
+#   - Latenz-Messung pro Request: DNS+TCP, TLS, Server-Zeit, Gesamt
+#   - Kennzahlen über get_http_metrics() abrufbar
+# ==========================================
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Pool-Größen: wenige Hosts (api.monday.com), aber parallele Sessions + Sync-Worker
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 8
+HTTP_METRICS_KEEP = 200
+
+# Verbindungsaufbau des aktuellen Requests (pro Thread)
+_local = threading.local()
+
+
+def _phase(name: str, seconds: float):
+    phases = getattr(_local, "phases", None)
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+# ==========================================
+# VERBINDUNGEN MIT ZEITMESSUNG
+# ==========================================
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        sock = super()._new_conn()
+        _phase("dns_tcp", time.perf_counter() - t0)
+        return sock
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        sock = super()._new_conn()
+        _phase("dns_tcp", time.perf_counter() - t0)
+        return sock
+
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        # connect() = Socket (bereits in _new_conn gemessen) + TLS-Handshake
+        phases = getattr(_local, "phases", None) or {}
+        _phase("tls", max(0.0, time.perf_counter() - t0 - phases.get("dns_tcp", 0.0)))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, dessen Verbindungen Aufbau-Zeiten protokollieren"""
+
+    def __init__(self, metrics: "HttpMetrics", **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _local.phases = {}
+        t0 = time.perf_counter()
+        response = None
+        try:
+            response = super().send(request, **kwargs)
+            return response
+        finally:
+            total = time.perf_counter() - t0
+            phases = _local.phases
+            _local.phases = None
+            self.metrics.record(request, response, total, phases)
+
+
+# ==========================================
+# KENNZAHLEN
+# ==========================================
+class HttpMetrics:
+    """Ringpuffer der letzten Requests + Zähler (thread-safe)"""
+
+    def __init__(self, keep: int = HTTP_METRICS_KEEP):
+        self._records = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.errors = 0
+
+    def record(self, request, response, total: float, phases: Dict):
+        reused = response is not None and "dns_tcp" not in phases
+        connect = phases.get("dns_tcp", 0.0) + phases.get("tls", 0.0)
+        # total = bis Antwort-Header (Body liest requests erst danach)
+        # → Server-Zeit ≈ total minus Verbindungsaufbau
+        entry = {
+            "method": request.method,
+            "url": request.url.split("?")[0],
+            "status": response.status_code if response is not None else None,
+            "reused": reused,
+            "dns_tcp_ms": phases.get("dns_tcp", 0.0) * 1000,
+            "tls_ms": phases.get("tls", 0.0) * 1000,
+            "server_ms": max(0.0, total - connect) * 1000,
+            "total_ms": total * 1000,
+            "ts": time.time(),
+        }
+        with self._lock:
+            self._records.append(entry)
+            self.requests += 1
+            self.new_connections += 0 if reused else 1
+            if response is None or response.status_code >= 400:
+                self.errors += 1
+
+    def recent(self, n: int = 20) -> List[Dict]:
+        with self._lock:
+            return list(self._records)[-n:]
+
+    def summary(self) -> Dict:
+        with self._lock:
+            records = list(self._records)
+            out = {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reuse_rate": 1 - self.new_connections / self.requests if self.requests else 0.0,
+                "errors": self.errors,
+            }
+        if records:
+            for key in ("dns_tcp_ms", "tls_ms", "server_ms", "total_ms"):
+                values = sorted(r[key] for r in records)
+                out[f"avg_{key}"] = sum(values) / len(values)
+                out[f"p95_{key}"] = values[min(len(values) - 1, int(len(values) * 0.95))]
+        return out
+
+
+# ==========================================
+# SESSION PRO PROZESS
+# ==========================================
+HTTP_METRICS = HttpMetrics()
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session(metrics: HttpMetrics = None) -> requests.Session:
+    """Neue Session mit Keep-Alive-Pool; Retries macht der Aufrufer selbst"""
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(metrics or HTTP_METRICS,
+                               pool_connections=HTTP_POOL_CONNECTIONS,
+                               pool_maxsize=HTTP_POOL_MAXSIZE,
+                               max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Gemeinsame Session aller Sessions/Threads im Prozess (Verbindungen bleiben offen)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get_http_metrics() -> Dict:
+    return HTTP_METRICS.summary()
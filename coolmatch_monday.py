@@ -6,15 +6,31 @@
 #   - 'status' → korrekte Column-ID 'color_mkncgyk5'
 #   - Dropdown-Format: {"labels": ["Wert"]} statt plain String
 #   - Status-Column-Format: {"label": "Angebot"} statt plain String
+# 7.3:
+#   - Alle Requests über gemeinsame Keep-Alive-Session (coolmatch_http)
+#     → Item + Datei-Upload nutzen dieselbe Verbindung
+#   - MondayHealth: gecachter Verbindungsstatus (TTL, Hintergrund-Check)
+#     + Circuit Breaker nach wiederholten Fehlern
+#   - Board-Spalten (gültige Dropdown-/Status-Labels) gecacht → unbekannte
+#     Labels werden vor dem Request entfernt, kein Retry-Round-Trip mehr
+#   - create_item() mit GraphQL-Variablen, create_items_batch() für Bulk-Sync
+#   - iter_board_items(): alle Board-Items seitenweise per Cursor (BoardItem),
+#     beachtet Complexity-Budget, 429/Retry-After
 # ==========================================
 
 import requests
 import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 import streamlit as st
 import io
 
+from coolmatch_http import get_http_session, get_http_metrics
+
 
 def get_monday_secrets():
     """
@@ -35,12 +51,64 @@ def get_monday_secrets():
         return "", ""
 
 
+MONDAY_API_URL = "https://api.monday.com/v2"
+
+# Board-Schema-Cache pro Prozess: (token, board_id) → (Zeitpunkt, Spalten)
+BOARD_SCHEMA_TTL = 3600
+_board_schemas: Dict[tuple, tuple] = {}
+
+
+def _parse_labels(settings_str: str) -> Optional[set]:
+    """Gültige Labels aus settings_str (Dropdown: labels=[{id,name}], Status: labels={idx: name})"""
+    try:
+        settings = json.loads(settings_str or "{}")
+    except ValueError:
+        return None
+    labels = settings.get('labels')
+    if isinstance(labels, dict):
+        return {str(v) for v in labels.values() if v}
+    if isinstance(labels, list):
+        return {str(l['name']) if isinstance(l, dict) else str(l) for l in labels}
+    return None
+
+
+class MondayAPIError(Exception):
+    """Monday.com-Abfrage endgültig fehlgeschlagen (kein stilles Abschneiden von Daten)"""
+
+
+@dataclass
+class BoardItem:
+    """Ein Item des Boards: Spalten als Text (column_id → text) und Rohwert (JSON-String)"""
+    id: str
+    name: str
+    group: str = ""
+    updated_at: str = ""
+    columns: Dict[str, str] = field(default_factory=dict)
+    values: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_api(cls, item: Dict) -> "BoardItem":
+        cols = item.get('column_values') or []
+        return cls(
+            id=str(item['id']),
+            name=item.get('name') or "",
+            group=(item.get('group') or {}).get('title', ""),
+            updated_at=item.get('updated_at') or "",
+            columns={c['id']: c.get('text') or "" for c in cols},
+            values={c['id']: c.get('value') for c in cols},
+        )
+
+
 class MondayIntegration:
     """Verwaltet die Kommunikation mit Monday.com"""
 
-    def __init__(self, api_token: str = None, board_id: str = None):
-        self.api_url = "https://api.monday.com/v2"
-        self.file_api_url = "https://api.monday.com/v2/file"
+    def __init__(self, api_token: str = None, board_id: str = None,
+                 session: requests.Session = None, api_url: str = None):
+        # api_url umstellbar (z.B. lokaler GraphQL-Stub für Tests/Reconcile)
+        self.api_url = (api_url or MONDAY_API_URL).rstrip("/")
+        self.file_api_url = f"{self.api_url}/file"
+        # Gepoolte Keep-Alive-Session, im Prozess geteilt
+        self.session = session or get_http_session()
 
         if api_token is None or board_id is None:
             default_token, default_board = get_monday_secrets()
@@ -54,74 +122,183 @@ class MondayIntegration:
             "Authorization": self.api_token,
             "Content-Type": "application/json"
         }
+        self.board_name: Optional[str] = None    # aus der ersten Seite von iter_board_items
 
     def is_configured(self) -> bool:
         return bool(self.api_token and self.board_id)
 
+    @staticmethod
+    def get_http_metrics() -> Dict:
+        """Latenz-Kennzahlen der HTTP-Session (DNS+TCP, TLS, Server, Reuse-Quote)"""
+        return get_http_metrics()
+
+    # ── Board-Schema (gültige Spalten + Labels) ──
+
+    def _graphql(self, query: str, variables: Dict = None, timeout: int = 10) -> Optional[Dict]:
+        """POST an die GraphQL-API → JSON-Antwort (inkl. 'errors') oder None bei HTTP-Fehler"""
+        payload = {"query": query}
+        if variables is not None:
+            payload["variables"] = variables
+        response = self.session.post(self.api_url, headers=self.headers, json=payload, timeout=timeout)
+        if response.status_code != 200:
+            print(f"Monday.com HTTP Error: {response.status_code}")
+            return None
+        return response.json()
+
+    def get_board_columns(self, force: bool = False) -> Optional[Dict[str, Dict]]:
+        """
+        Spalten des Boards → {column_id: {'type': ..., 'labels': set|None}}.
+        Prozessweit gecacht (BOARD_SCHEMA_TTL); None wenn nicht abrufbar.
+        """
+        key = (self.api_token, str(self.board_id))
+        cached = _board_schemas.get(key)
+        if cached and not force and time.time() - cached[0] < BOARD_SCHEMA_TTL:
+            return cached[1]
+
+        query = """
+        query ($boardId: [ID!]) {
+            boards (ids: $boardId) {
+                columns { id type settings_str }
+            }
+        }
+        """
+        try:
+            data = self._graphql(query, {"boardId": [str(self.board_id)]})
+            boards = (data or {}).get('data', {}).get('boards') or []
+            if not boards:
+                return cached[1] if cached else None
+        except Exception as e:
+            print(f"Monday.com Schema Error: {e}")
+            return cached[1] if cached else None
+
+        columns = {}
+        for col in boards[0].get('columns', []):
+            columns[col['id']] = {'type': col.get('type'),
+                                  'labels': _parse_labels(col.get('settings_str'))}
+        _board_schemas[key] = (time.time(), columns)
+        return columns
+
+    def sanitize_column_values(self, column_values: Dict) -> Dict:
+        """
+        Entfernt Spalten, die es auf dem Board nicht gibt, und Dropdown-/Status-Labels,
+        die nicht existieren (sonst ColumnValueException). Ohne Schema → unverändert.
+        """
+        columns = self.get_board_columns()
+        if not columns:
+            return column_values
+
+        clean = {}
+        for col_id, value in column_values.items():
+            col = columns.get(col_id)
+            if col is None:
+                print(f"⚠️ Monday-Spalte '{col_id}' existiert nicht - ausgelassen")
+                continue
+            labels = col['labels']
+            if labels is not None and isinstance(value, dict):
+                if 'labels' in value:
+                    known = [l for l in value['labels'] if l in labels]
+                    if not known:
+                        print(f"⚠️ Unbekanntes Dropdown-Label {value['labels']} - ausgelassen")
+                        continue
+                    value = {**value, 'labels': known}
+                elif 'label' in value and value['label'] not in labels:
+                    print(f"⚠️ Unbekanntes Status-Label '{value['label']}' - ausgelassen")
+                    continue
+            clean[col_id] = value
+        return clean
+
+    # ── Items anlegen ──
+
     def create_item(self, item_name: str, column_values: Dict) -> Optional[str]:
         """
-        Erstellt ein neues Item in Monday.com.
-        Bei ColumnValueException (z.B. unbekannter Dropdown-Wert) →
-        automatischer Retry ohne die problematische Spalte.
+        Erstellt ein neues Item in Monday.com (ein Request).
+        Column-Values werden vorab gegen das gecachte Board-Schema geprüft.
+        Nur falls das Schema veraltet ist und doch eine ColumnValueException kommt →
+        Schema neu laden und einmal ohne Dropdown-/Status-Spalten wiederholen.
         """
         if not self.is_configured():
             return None
 
+        query = """
+        mutation ($boardId: ID!, $itemName: String!, $columnValues: JSON) {
+            create_item (board_id: $boardId, item_name: $itemName, column_values: $columnValues) {
+                id
+            }
+        }
+        """
+
         def _try_create(cv: Dict) -> Optional[str]:
-            cv_json = json.dumps(cv)
-            cv_escaped = cv_json.replace("\\", "\\\\").replace('"', '\\"')
-            item_name_escaped = item_name.replace("\\", "\\\\").replace('"', '\\"')
-            query = f'''
-            mutation {{
-                create_item (
-                    board_id: {self.board_id},
-                    item_name: "{item_name_escaped}",
-                    column_values: "{cv_escaped}"
-                ) {{
-                    id
-                }}
-            }}
-            '''
             try:
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"query": query},
-                    timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    # Prüfe auf ColumnValueException
-                    if 'errors' in data:
-                        for err in data['errors']:
-                            code = err.get('extensions', {}).get('code', '')
-                            if code == 'ColumnValueException':
-                                return 'COLUMN_ERROR'
-                        print(f"Monday.com GraphQL Error: {data['errors']}")
-                        return None
-                    if 'data' in data and data['data'] and 'create_item' in data['data']:
-                        item = data['data']['create_item']
-                        if item:
-                            return item['id']
-                else:
-                    print(f"Monday.com HTTP Error: {response.status_code}")
-                return None
+                data = self._graphql(query, {"boardId": str(self.board_id), "itemName": item_name,
+                                             "columnValues": json.dumps(cv)})
+                if data is None:
+                    return None
+                # Prüfe auf ColumnValueException
+                if 'errors' in data:
+                    for err in data['errors']:
+                        code = err.get('extensions', {}).get('code', '')
+                        if code == 'ColumnValueException':
+                            return 'COLUMN_ERROR'
+                    print(f"Monday.com GraphQL Error: {data['errors']}")
+                    return None
+                item = (data.get('data') or {}).get('create_item')
+                return item['id'] if item else None
             except Exception as e:
                 print(f"Monday.com API Error: {e}")
                 return None
 
-        # Versuch 1: Mit allen Feldern
-        result = _try_create(column_values)
+        result = _try_create(self.sanitize_column_values(column_values))
 
-        # Versuch 2: Bei Dropdown-Fehler → ohne Dropdown-Spalten wiederholen
         if result == 'COLUMN_ERROR':
-            print("⚠️ ColumnValueException → Retry ohne Dropdown-Spalten")
+            print("⚠️ ColumnValueException → Schema neu laden, Retry ohne Dropdown-Spalten")
+            self.get_board_columns(force=True)
             cv_fallback = {k: v for k, v in column_values.items()
                           if not k.startswith('dropdown_') and not k.startswith('color_')}
             result = _try_create(cv_fallback)
 
         return result if result and result != 'COLUMN_ERROR' else None
 
+    def create_items_batch(self, items: List[Tuple[str, Dict]],
+                           chunk_size: int = 20) -> List[Optional[str]]:
+        """
+        Legt mehrere Items an: pro Block ein GraphQL-Dokument mit Alias-Mutations
+        (i0: create_item(...), i1: create_item(...), ...).
+        → Liste der Item-IDs in Eingabereihenfolge (None = fehlgeschlagen).
+        Datei-Uploads brauchen weiterhin je einen Request an /v2/file.
+        """
+        results: List[Optional[str]] = [None] * len(items)
+        if not self.is_configured() or not items:
+            return results
+
+        for start in range(0, len(items), chunk_size):
+            block = items[start:start + chunk_size]
+            params = ["$boardId: ID!"]
+            fields = []
+            variables = {"boardId": str(self.board_id)}
+            for i, (name, cv) in enumerate(block):
+                params += [f"$n{i}: String!", f"$c{i}: JSON"]
+                fields.append(f"i{i}: create_item (board_id: $boardId, item_name: $n{i}, "
+                              f"column_values: $c{i}) {{ id }}")
+                variables[f"n{i}"] = name
+                variables[f"c{i}"] = json.dumps(self.sanitize_column_values(cv))
+            query = f"mutation ({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+
+            try:
+                data = self._graphql(query, variables, timeout=30)
+            except Exception as e:
+                print(f"Monday.com Batch Error: {e}")
+                continue
+            if data is None:
+                continue
+            if 'errors' in data:
+                print(f"Monday.com Batch GraphQL Error: {data['errors']}")
+            created = data.get('data') or {}
+            for i in range(len(block)):
+                item = created.get(f"i{i}")
+                if item:
+                    results[start + i] = item['id']
+        return results
+
     def upload_file_to_item(self, item_id: str, file_bytes: bytes, filename: str,
                             column_id: str = "file_mkngj4yq") -> bool:
         """
@@ -160,7 +337,7 @@ class MondayIntegration:
 
             upload_headers = {"Authorization": self.api_token}
 
-            response = requests.post(
+            response = self.session.post(
                 self.file_api_url,
                 headers=upload_headers,
                 files=files,
@@ -182,10 +359,9 @@ class MondayIntegration:
             print(f"Monday.com File Upload Exception: {e}")
             return False
 
-    def save_quote_to_monday(self, quote_data: Dict, pdf_bytes: bytes = None,
-                             filename: str = None) -> tuple:
+    def build_column_values(self, quote_data: Dict) -> Dict:
         """
-        Speichert ein Angebot in Monday.com mit PDF.
+        Baut die Column-Values für ein Angebot.
 
         FIX: Korrekte Column-Formate für alle Spaltentypen:
           - date   → {"date": "YYYY-MM-DD"}
@@ -194,9 +370,6 @@ class MondayIntegration:
           - status → {"label": "Wert"}         (⚠ war bisher 'status' als Column-ID)
           - text   → plain String
         """
-        if not self.is_configured():
-            return False, ""
-
         column_values = {}
 
         # ── Datum (date) ──
@@ -231,11 +404,23 @@ class MondayIntegration:
         # FIX: früher stand hier 'status' als Column-ID → existiert nicht → Fehler
         column_values['color_mkncgyk5'] = {"label": "Angebot"}
 
-        # Item-Name
-        item_name = quote_data.get('angebots_nr', quote_data.get('kunde', 'Neues Angebot'))
+        return column_values
+
+    @staticmethod
+    def item_name_for(quote_data: Dict) -> str:
+        return quote_data.get('angebots_nr', quote_data.get('kunde', 'Neues Angebot'))
+
+    def save_quote_to_monday(self, quote_data: Dict, pdf_bytes: bytes = None,
+                             filename: str = None) -> tuple:
+        """
+        Speichert ein Angebot in Monday.com mit PDF (synchron).
+        Für die App → Outbox + MondaySyncWorker (coolmatch_sync), blockiert nicht.
+        """
+        if not self.is_configured():
+            return False, ""
 
         # Item erstellen
-        item_id = self.create_item(item_name, column_values)
+        item_id = self.create_item(self.item_name_for(quote_data), self.build_column_values(quote_data))
 
         if not item_id:
             return False, ""
@@ -248,41 +433,150 @@ class MondayIntegration:
 
         return True, item_id
 
-    def get_board_data(self) -> Optional[Dict]:
+    # ── Board lesen (Cursor-Pagination) ──
+
+    _ITEM_FIELDS = """
+        cursor
+        items {
+            id name updated_at
+            group { title }
+            column_values%s { id text value }
+        }
+    """
+    _COMPLEXITY = "complexity { before after reset_in_x_seconds }"
+
+    def _graphql_with_limits(self, query: str, variables: Dict, max_retries: int = 5) -> Dict:
+        """
+        GraphQL-Request mit Rate-Limit-Handling:
+          - HTTP 429 → Retry-After abwarten
+          - Complexity-Budget erschöpft → retry_in_seconds / reset-Zeit abwarten
+        Wirft MondayAPIError, wenn es nach max_retries nicht klappt.
+        """
+        last_error = ""
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.session.post(self.api_url, headers=self.headers,
+                                             json={"query": query, "variables": variables}, timeout=30)
+            except requests.RequestException as e:
+                last_error = str(e)
+                self._sleep(min(60, 2 ** attempt))
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                last_error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+                self._sleep(float(retry_after) if retry_after and retry_after.isdigit()
+                            else min(60, 2 ** attempt))
+                continue
+            if response.status_code != 200:
+                raise MondayAPIError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+            try:
+                data = response.json()
+            except ValueError:
+                # z.B. HTML-Seite eines Proxys mit Status 200
+                raise MondayAPIError(f"Keine JSON-Antwort: {response.text[:200]}")
+            errors = data.get('errors') or []
+            if not errors:
+                return data
+            wait = self._complexity_wait(errors)
+            if wait is None:
+                raise MondayAPIError(f"GraphQL Error: {errors}")
+            last_error = str(errors)
+            self._sleep(wait)
+
+        raise MondayAPIError(f"Abbruch nach {max_retries} Wiederholungen: {last_error}")
+
+    @staticmethod
+    def _complexity_wait(errors: List[Dict]) -> Optional[float]:
+        """Wartezeit in Sekunden bei Complexity-/Rate-Limit-Fehlern, sonst None"""
+        for err in errors:
+            ext = err.get('extensions') or {}
+            code = str(ext.get('code', ''))
+            message = str(err.get('message', ''))
+            if 'complexity' not in (code + message).lower() and 'rate' not in (code + message).lower():
+                continue
+            if ext.get('retry_in_seconds') is not None:
+                return float(ext['retry_in_seconds'])
+            match = re.search(r"(\d+)\s*seconds", message)
+            return float(match.group(1)) if match else 10.0
+        return None
+
+    @staticmethod
+    def _sleep(seconds: float):
+        time.sleep(seconds)
+
+    def iter_board_items(self, page_size: int = 100, column_ids: List[str] = None,
+                         min_budget: int = 100_000):
+        """
+        Generator über alle Items des Boards (items_page → next_items_page per Cursor).
+        Es liegt immer nur eine Seite im Speicher. column_ids schränkt die Spalten ein.
+        Reicht das Complexity-Budget nicht mehr (< min_budget), wird bis zum Reset gewartet.
+        """
         if not self.is_configured():
-            return None
+            return
 
-        query = f"""
-        query {{
-            boards (ids: {self.board_id}) {{
-                name
-                items_page {{
-                    items {{
-                        name
-                        column_values {{
-                            id
-                            text
-                            value
-                        }}
-                    }}
-                }}
-            }}
+        cols_arg = "(ids: $columnIds)" if column_ids else ""
+        cols_param = ", $columnIds: [String!]" if column_ids else ""
+        item_fields = self._ITEM_FIELDS % cols_arg
+
+        first = f"""
+        query ($boardId: [ID!], $limit: Int!{cols_param}) {{
+            {self._COMPLEXITY}
+            boards (ids: $boardId) {{ name items_page (limit: $limit) {{ {item_fields} }} }}
+        }}
+        """
+        follow = f"""
+        query ($cursor: String!, $limit: Int!{cols_param}) {{
+            {self._COMPLEXITY}
+            next_items_page (cursor: $cursor, limit: $limit) {{ {item_fields} }}
         }}
         """
 
-        try:
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json={"query": query},
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
+        variables = {"boardId": [str(self.board_id)], "limit": page_size}
+        if column_ids:
+            variables["columnIds"] = list(column_ids)
+        data = self._graphql_with_limits(first, variables)['data']
+        boards = data.get('boards') or []
+        if not boards:
+            raise MondayAPIError(f"Board {self.board_id} nicht gefunden")
+        self.board_name = boards[0].get('name')
+        page = boards[0]['items_page']
+
+        while True:
+            for item in page.get('items') or []:
+                yield BoardItem.from_api(item)
+
+            cursor = page.get('cursor')
+            if not cursor:
+                return
+
+            complexity = data.get('complexity') or {}
+            if complexity.get('after') is not None and complexity['after'] < min_budget:
+                self._sleep(float(complexity.get('reset_in_x_seconds') or 10))
+
+            variables = {"cursor": cursor, "limit": page_size}
+            if column_ids:
+                variables["columnIds"] = list(column_ids)
+            data = self._graphql_with_limits(follow, variables)['data']
+            page = data['next_items_page']
+
+    def get_board_data(self) -> Optional[Dict]:
+        """
+        Alle Items des Boards (alle Seiten) im bisherigen Antwortformat.
+        Für große Boards iter_board_items() verwenden.
+        """
+        if not self.is_configured():
             return None
-        except Exception as e:
+        try:
+            items = [{'id': item.id, 'name': item.name,
+                      'column_values': [{'id': cid, 'text': text, 'value': item.values.get(cid)}
+                                        for cid, text in item.columns.items()]}
+                     for item in self.iter_board_items()]
+        except (MondayAPIError, ValueError, requests.RequestException) as e:
             print(f"Monday.com API Error: {e}")
             return None
+        return {'data': {'boards': [{'name': self.board_name, 'items_page': {'items': items}}]}}
 
     def test_connection(self) -> tuple:
         if not self.is_configured():
@@ -298,7 +592,7 @@ class MondayIntegration:
         """
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 headers=self.headers,
                 json={"query": query},
@@ -319,6 +613,114 @@ class MondayIntegration:
             return False, f"Exception: {str(e)}"
 
 
+# ── Verbindungsstatus (gecacht) + Circuit Breaker ──
+
+class MondayHealth:
+    """
+    Gecachter Verbindungsstatus für Monday.com.
+      - snapshot() blockiert nie; ist der Status älter als `ttl`, wird im
+        Hintergrund ein einzelner test_connection() gestartet
+      - nach `failure_threshold` Fehlern in Folge ist der Breaker offen:
+        keine Requests für `cooldown` Sekunden, danach ein Probe-Versuch
+      - record_success()/record_failure() füttern den Breaker auch aus dem Sync-Worker
+    """
+
+    def __init__(self, monday: "MondayIntegration", ttl: float = 120.0,
+                 failure_threshold: int = 3, cooldown: float = 300.0):
+        self.monday = monday
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._idle = threading.Event()      # gesetzt, solange kein Check läuft
+        self._idle.set()
+        self.connected: Optional[bool] = None
+        self.message = "Prüfe Verbindung..."
+        self.checked_at = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+
+    def is_open(self) -> bool:
+        return time.time() < self.open_until
+
+    def allow_request(self) -> bool:
+        """False solange der Breaker offen ist"""
+        return not self.is_open()
+
+    def record_success(self, message: str = None):
+        with self._lock:
+            self.connected = True
+            self.failures = 0
+            self.open_until = 0.0
+            self.checked_at = time.time()
+            if message:
+                self.message = message
+
+    def record_failure(self, message: str):
+        with self._lock:
+            self.connected = False
+            self.failures += 1
+            self.message = message
+            self.checked_at = time.time()
+            if self.failures >= self.failure_threshold:
+                self.open_until = self.checked_at + self.cooldown
+
+    def _check(self):
+        try:
+            connected, message = self.monday.test_connection()
+            if connected:
+                self.record_success(message)
+            else:
+                self.record_failure(message)
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._idle.set()
+
+    def refresh(self, force: bool = False):
+        """Startet einen Check im Hintergrund (höchstens einer gleichzeitig)"""
+        with self._lock:
+            if self._refreshing:
+                return
+            if not force and (time.time() - self.checked_at < self.ttl or self.is_open()):
+                return
+            self._refreshing = True
+            self._idle.clear()
+        threading.Thread(target=self._check, name="coolmatch-monday-health", daemon=True).start()
+
+    def wait(self, timeout: float) -> bool:
+        """Wartet auf das Ende eines laufenden Checks → False bei Timeout"""
+        return self._idle.wait(timeout)
+
+    def snapshot(self) -> Dict:
+        """Aktueller Status ohne Netzwerkzugriff; stößt bei Bedarf einen Refresh an"""
+        self.refresh()
+        with self._lock:
+            return {
+                'connected': self.connected,
+                'message': self.message,
+                'checked_at': self.checked_at,
+                'failures': self.failures,
+                'breaker_open': time.time() < self.open_until,
+                'retry_in': max(0.0, self.open_until - time.time()),
+                'refreshing': self._refreshing,
+            }
+
+
+_health: Dict[tuple, MondayHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_monday_health(monday: "MondayIntegration") -> MondayHealth:
+    """Ein Status-Objekt pro Board/Token und Prozess, geteilt von allen Sessions"""
+    key = (monday.api_token, str(monday.board_id))
+    with _health_lock:
+        if key not in _health:
+            _health[key] = MondayHealth(monday)
+        return _health[key]
+
+
 # ── Streamlit Helper ──
 
 def init_monday_integration() -> MondayIntegration:
@@ -352,11 +754,30 @@ def render_monday_status():
     st.markdown("### 🔗 Monday.com Status")
 
     if monday.is_configured():
-        connected, message = monday.test_connection()
-        if connected:
+        health = get_monday_health(monday).snapshot()
+        connected, message = health['connected'], health['message']
+        if connected is None:
+            st.info(f"⏳ {message}")
+        elif connected:
             st.success(f"✅ {message}")
+            metrics = monday.get_http_metrics()
+            if metrics.get('requests'):
+                st.caption(
+                    f"📶 {metrics['requests']} Requests · Reuse {metrics['reuse_rate']:.0%} · "
+                    f"Ø {metrics['avg_total_ms']:.0f} ms (Server {metrics['avg_server_ms']:.0f} ms, "
+                    f"TLS {metrics['avg_tls_ms']:.0f} ms)"
+                )
         else:
             st.error(f"❌ {message}")
+            if health['breaker_open']:
+                st.caption(f"⏸️ {health['failures']} Fehler in Folge - "
+                           f"nächster Versuch in {health['retry_in']:.0f} s")
+            if st.button("🔄 Erneut prüfen", key="monday_health_refresh"):
+                # Status oben ist schon gezeichnet → Check abwarten, dann neu rendern
+                monitor = get_monday_health(monday)
+                monitor.refresh(force=True)
+                monitor.wait(timeout=10)
+                st.rerun()
             with st.expander("🔧 Troubleshooting"):
                 st.code(f"""
 Token: {'✔' if monday.api_token else '✗'}
@@ -0,0 +1,159 @@
+# ==========================================
+# DATEI: coolmatch_money.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Preisberechnung in ganzen Cent (NumPy)
+#   - Preise in Cent, Mengen in Tausendstel, Rabatte in Basispunkten (int64)
+#   - Positionssummen vektorisiert in einem Durchlauf, kaufmännisch gerundet
+#   - Zwischensumme → Rabatt → Netto → MwSt → Brutto (auch Pauschalpreis),
+#     einzeln (quote_totals) oder für viele Angebote (quote_totals_array)
+#   - gemeinsame Rechnung für Warenkorb, PDF und Datenbank
+# ==========================================
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+CENT = 100          # 1 € = 100 Cent
+MILLI = 1000        # Menge in Tausendstel (0.5 m → 500)
+BP = 10000          # 100 % = 10000 Basispunkte
+
+# Grenze für int64: Cent × Menge × Basispunkte muss unter 2^63 bleiben
+_INT64_SAFE = np.iinfo(np.int64).max // BP
+
+Numbers = Union[float, Iterable[float], np.ndarray]
+
+
+# ==========================================
+# UMRECHNUNG
+# ==========================================
+def _to_units(values: Numbers, scale: int) -> np.ndarray:
+    """Float → ganze Einheiten, kaufmännisch gerundet (0.5 weg von 0)"""
+    x = np.asarray(values, dtype=float) * scale
+    x = np.nan_to_num(x, nan=0.0, posinf=0.0, neginf=0.0)
+    # erst auf 6 Stellen runden: 1.005 * 100 = 100.4999… → 100.5 → 101
+    x = np.round(x, 6)
+    return (np.sign(x) * np.floor(np.abs(x) + 0.5)).astype(np.int64)
+
+
+def to_cents(values: Numbers) -> np.ndarray:
+    return _to_units(values, CENT)
+
+
+def to_milli(values: Numbers) -> np.ndarray:
+    return _to_units(values, MILLI)
+
+
+def to_bp(values: Numbers) -> np.ndarray:
+    """Prozent → Basispunkte (30 % → 3000)"""
+    return _to_units(values, CENT)
+
+
+def to_euro(cents) -> Union[float, np.ndarray]:
+    if np.ndim(cents):
+        return np.asarray(cents) / CENT
+    return int(cents) / CENT
+
+
+def _div_round(num: np.ndarray, den: int) -> np.ndarray:
+    """Ganzzahlige Division, kaufmännisch gerundet (auch für negative Werte)"""
+    q = (np.abs(num) + den // 2) // den
+    return np.where(num < 0, -q, q)
+
+
+# ==========================================
+# POSITIONEN
+# ==========================================
+def line_totals(menge: Numbers, einzelpreis: Numbers, rabatt: Numbers) -> np.ndarray:
+    """Positionssummen in Cent: Menge × Einzelpreis × (1 - Rabatt), einmal gerundet"""
+    milli = to_milli(menge)
+    cents = to_cents(einzelpreis)
+    keep_bp = BP - to_bp(rabatt)
+    if len(cents) and int(np.abs(cents).max()) * int(np.abs(milli).max()) > _INT64_SAFE:
+        # sehr große Werte → Python-Ganzzahlen statt Überlauf
+        milli, cents, keep_bp = (a.astype(object) for a in (milli, cents, keep_bp))
+    num = cents * milli * keep_bp
+    return _div_round(num, MILLI * BP).astype(np.int64)
+
+
+def line_total(menge: float, einzelpreis: float, rabatt: float) -> int:
+    """Eine Positionssumme in Cent (gleiche Rundung wie line_totals)"""
+    return int(line_totals([menge], [einzelpreis], [rabatt])[0])
+
+
+def percent_of(cents: int, prozent: float) -> int:
+    """Prozentanteil eines Cent-Betrags, gerundet"""
+    return int(_div_round(np.int64(cents) * to_bp([prozent])[0], BP))
+
+
+# ==========================================
+# ANGEBOTSSUMMEN
+# ==========================================
+@dataclass(frozen=True)
+class QuoteTotals:
+    """Angebotssummen in Cent + die Sätze, aus denen sie berechnet wurden"""
+    zwischensumme: int
+    rabatt_betrag: int          # aus rabatt_proz
+    rabatt_abs: int
+    netto: int
+    ust: int
+    brutto: int
+    rabatt_proz: float = 0.0
+    mwst: float = 0.0
+    manual: bool = False
+
+    def euro(self, name: str) -> float:
+        return getattr(self, name) / CENT
+
+    def financial_data(self) -> Dict:
+        """Summen in € für generate_pdf / save_quote"""
+        return {
+            'zwischensumme': self.euro('zwischensumme'),
+            'rabatt_proz': self.rabatt_proz,
+            'rabatt_betrag': self.euro('rabatt_betrag'),
+            'rabatt_abs': self.euro('rabatt_abs'),
+            'netto': self.euro('netto'),
+            'ust': self.euro('ust'),
+            'brutto': self.euro('brutto'),
+            'mwst': self.mwst,
+        }
+
+
+def quote_totals_array(zwischensumme_cents: np.ndarray, mwst: Numbers, rabatt_proz: Numbers = 0.0,
+                       rabatt_abs: Numbers = 0.0) -> Dict[str, np.ndarray]:
+    """Summen vieler Angebote auf einmal (ohne Pauschalpreis) → Arrays in Cent"""
+    zwischensumme = np.asarray(zwischensumme_cents, dtype=np.int64)
+    n = len(zwischensumme)
+    rabatt_betrag = _div_round(zwischensumme * to_bp(np.broadcast_to(rabatt_proz, n)), BP)
+    rabatt_abs_c = to_cents(np.broadcast_to(rabatt_abs, n))
+    netto = zwischensumme - rabatt_betrag - rabatt_abs_c
+    ust = _div_round(netto * to_bp(np.broadcast_to(mwst, n)), BP)
+    return {'zwischensumme': zwischensumme, 'rabatt_betrag': rabatt_betrag,
+            'rabatt_abs': rabatt_abs_c, 'netto': netto, 'ust': ust, 'brutto': netto + ust}
+
+
+def quote_totals(zwischensumme_cents: int, mwst: float, rabatt_proz: float = 0.0,
+                 rabatt_abs: float = 0.0, manual_brutto: Optional[float] = None) -> QuoteTotals:
+    """
+    Summen aus der Zwischensumme (Cent).
+    Normal:    Netto = Zwischensumme - Rabatt % - Rabatt €, MwSt auf Netto
+    Pauschal:  Brutto vorgegeben, Netto = Brutto / (1 + MwSt), MwSt = Differenz
+    """
+    if manual_brutto is not None:
+        brutto = int(to_cents([manual_brutto])[0])
+        netto = int(_div_round(np.int64(brutto) * BP, BP + int(to_bp([mwst])[0])))
+        return QuoteTotals(int(zwischensumme_cents), 0, 0, netto, brutto - netto, brutto,
+                           0.0, float(mwst), True)
+
+    t = {k: int(v[0]) for k, v in quote_totals_array([zwischensumme_cents], [mwst],
+                                                        [rabatt_proz], [rabatt_abs]).items()}
+    return QuoteTotals(t['zwischensumme'], t['rabatt_betrag'], t['rabatt_abs'], t['netto'],
+                       t['ust'], t['brutto'], float(rabatt_proz), float(mwst), False)
+
+
+def price_positions(positions: List[Dict]) -> np.ndarray:
+    """Positionen (Dicts mit Menge/Einzelpreis/Rabatt) → Positionssummen in Cent"""
+    return line_totals([p.get('Menge', 0) or 0 for p in positions],
+                       [p.get('Einzelpreis', 0) or 0 for p in positions],
+                       [p.get('Rabatt', 0) or 0 for p in positions])
@@ -1,7 +1,14 @@
 from fpdf import FPDF
+from fpdf.image_datastructures import ImageCache
+from fpdf.image_parsing import preload_image
+from functools import lru_cache
 import os
 from coolmatch_config import *
 
+HEADER_TITLE = "Budget Angebot"
+HEADER_SUBTITLE = "Klimatisierung & Wärmepumpen"
+FOOTER_AGB = "Es gelten unsere AGB (Hier klicken)"
+
 def safe_text(text):
     if not isinstance(text, str): 
         text = str(text)
@@ -24,107 +31,238 @@ def safe_text(text):
         text = text.replace(k, v)
     return text.encode('latin-1', 'replace').decode('latin-1')
 
+@lru_cache(maxsize=None)
+def _logo_template():
+    """Logo einmal pro Prozess dekodieren (PNG → PDF-Bilddaten); None wenn Datei fehlt"""
+    if not os.path.exists(LOGO_WHITE_OUTLINE):
+        return None
+    cache = ImageCache()
+    preload_image(cache, LOGO_WHITE_OUTLINE)
+    return cache.images[LOGO_WHITE_OUTLINE], dict(cache.icc_profiles)
+
+@lru_cache(maxsize=None)
+def _font_files():
+    """Schriftdateien einmal pro Prozess prüfen → {stil: pfad} oder None (Fallback Helvetica)"""
+    if not PDF_EMBED_FONTS:
+        return None
+    files = {style: os.path.abspath(path) for style, path in PDF_FONT_FILES.items()}
+    if not all(os.path.exists(path) for path in files.values()):
+        return None
+    try:
+        probe = FPDF()
+        for style, path in files.items():
+            probe.add_font(PDF_FONT_FAMILY, style, path)
+    except Exception as e:
+        print(f"⚠️ PDF-Schriften nicht ladbar, verwende Helvetica: {e}")
+        return None
+    return files
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return [os.path.basename(path), st.st_size, st.st_mtime_ns]
+    except OSError:
+        return None
+
+@lru_cache(maxsize=None)
+def render_fingerprint():
+    """Rendering-Eingaben außerhalb der Angebotsdaten (Schriftmodus, Schrift-/Logodateien)
+    für den PDF-Cache-Schlüssel; gleiche Lebensdauer wie Logo- und Schrift-Cache"""
+    fonts = _font_files()
+    return {
+        'fonts': {style: _file_stamp(path) for style, path in sorted(fonts.items())} if fonts else None,
+        'logo': _file_stamp(LOGO_WHITE_OUTLINE) if _logo_template() else None,
+    }
+
+def warm_pdf_cache():
+    """Prozessweite Caches vorab füllen (z.B. in Worker-Prozessen)"""
+    _logo_template()
+    _font_files()
+    render_fingerprint()
+
 class AngebotsPDF(FPDF):
     def __init__(self, partner_data, customer_data):
         super().__init__()
         self.partner = partner_data
         self.customer = customer_data
+        # Eingebettete Unicode-Schrift (Subset) oder Helvetica + Umschrift
+        fonts = _font_files()
+        if fonts:
+            for style, path in fonts.items():
+                self.add_font(PDF_FONT_FAMILY, style, path)
+            self.family = PDF_FONT_FAMILY
+            self.txt = str
+        else:
+            self.family = 'Helvetica'
+            self.txt = safe_text
+        self.footer_text = self.txt(f"{partner_data['firma']} | {partner_data['strasse']}, {partner_data['ort']} | {partner_data['email']} | {partner_data['tel']}")
+        # Vorab dekodiertes Logo in den Bild-Cache dieses Dokuments legen
+        logo = _logo_template()
+        self.has_logo = logo is not None
+        if logo:
+            info, icc_profiles = logo
+            self.image_cache.images[LOGO_WHITE_OUTLINE] = info.__class__(info, usages=0)
+            self.image_cache.icc_profiles.update(icc_profiles)
 
     def header(self):
         self.set_fill_color(*COLOR_BLUE)
         self.rect(0, 0, 210, 40, 'F')
-        if os.path.exists(LOGO_WHITE_OUTLINE):
+        if self.has_logo:
             self.image(LOGO_WHITE_OUTLINE, x=10, y=10, w=50)
         self.set_xy(130, 12)
-        self.set_font('Helvetica', 'B', 18)
+        self.set_font(self.family, 'B', 18)
         self.set_text_color(*COLOR_WHITE)
-        self.cell(70, 10, "Budget Angebot", 0, 0, 'R')
+        self.cell(70, 10, self.txt(HEADER_TITLE), 0, 0, 'R')
         self.set_xy(130, 22)
-        self.set_font('Helvetica', '', 10)
-        self.cell(70, 5, "Klimatisierung & Waermepumpen", 0, 0, 'R')
+        self.set_font(self.family, '', 10)
+        self.cell(70, 5, self.txt(HEADER_SUBTITLE), 0, 0, 'R')
         self.ln(30)
 
     def footer(self):
         self.set_y(-25)
-        self.set_font('Helvetica', '', 8)
+        self.set_font(self.family, '', 8)
         self.set_text_color(*COLOR_DARK_GRAY_RGB)
         self.set_draw_color(180, 180, 180)
         self.set_line_width(0.2)
         self.line(10, self.get_y(), 200, self.get_y())
-        footer_text = f"{self.partner['firma']} | {self.partner['strasse']}, {self.partner['ort']} | {self.partner['email']} | {self.partner['tel']}"
-        self.cell(0, 5, safe_text(footer_text), 0, 1, 'C')
+        self.cell(0, 5, self.footer_text, 0, 1, 'C')
         self.set_text_color(*COLOR_BLUE)
-        self.set_font('Helvetica', 'U', 8)
-        self.cell(0, 5, "Es gelten unsere AGB (Hier klicken)", 0, 0, 'C', link=self.partner['agb'])
+        self.set_font(self.family, 'U', 8)
+        self.cell(0, 5, FOOTER_AGB, 0, 0, 'C', link=self.partner['agb'])
+
+# --- POSITIONSTABELLE ---
+TABLE_COLS = [  # (Titel, Breite, Ausrichtung)
+    ("Pos", 10, 'C'), ("Art", 25, 'L'), ("Beschreibung", 75, 'L'), ("Mge", 10, 'C'),
+    ("Listenpr.", 25, 'R'), ("Rab.", 15, 'C'), ("Gesamt", 30, 'R'),
+]
+TABLE_DESC_COL = 2
+TABLE_LINE_H = 6
+TABLE_HEADER_H = 8
+TABLE_MAX_Y = 265  # darunter beginnt der Footer
+
+_word_widths = {}
+
+def _text_width(pdf, text):
+    """Textbreite mit Cache pro Schrift (Familie, Stil, Größe)"""
+    key = (pdf.font_family, pdf.font_style, pdf.font_size_pt, text)
+    width = _word_widths.get(key)
+    if width is None:
+        width = pdf.get_string_width(text)
+        if len(_word_widths) < 50000:
+            _word_widths[key] = width
+    return width
+
+def wrap_text(pdf, text, width):
+    """Zeilenumbruch wie multi_cell: an Leerzeichen, überlange Wörter zeichenweise"""
+    space = _text_width(pdf, " ")
+    lines = []
+    for paragraph in text.split("\n"):
+        line, line_w = "", 0.0
+        for word in paragraph.split(" "):
+            w = _text_width(pdf, word)
+            if line and line_w + space + w <= width:
+                line, line_w = f"{line} {word}", line_w + space + w
+                continue
+            if line:
+                lines.append(line)
+            while w > width and len(word) > 1:
+                cut = len(word) - 1
+                while cut > 1 and _text_width(pdf, word[:cut]) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                w = _text_width(pdf, word)
+            line, line_w = word, w
+        lines.append(line)
+    return lines
+
+def layout_table(pdf, calc_df, hide_prices):
+    """
+    Layout-Durchlauf vor dem Zeichnen: Zelltexte spaltenweise formatieren,
+    Beschreibung umbrechen, Zeilenhöhe berechnen → [(zellen, zeilen, höhe)]
+    """
+    df = calc_df.sort_values(by="Pos")
+    pdf.set_font(pdf.family, "", 8)
+    t_pos = df['Pos'].astype(int).astype(str)
+    t_art = df['Artikel'].astype(str).str[:15].map(pdf.txt)
+    t_txt = df['Beschreibung'].astype(str).map(pdf.txt)
+    t_mge = df['Menge'].map("{:.0f}".format)
+    if hide_prices:
+        t_prc = t_rab = t_ges = ["-"] * len(df)
+    else:
+        t_prc = df['Einzelpreis'].map("{:,.2f}".format)
+        t_rab = df['Rabatt'].map("{:.0f}%".format)
+        t_ges = df['Gesamt'].map("{:,.2f}".format)
+
+    desc_w = TABLE_COLS[TABLE_DESC_COL][1] - 2 * pdf.c_margin
+    rows = []
+    for cells in zip(t_pos, t_art, t_txt, t_mge, t_prc, t_rab, t_ges):
+        lines = wrap_text(pdf, cells[TABLE_DESC_COL], desc_w)
+        rows.append((cells, lines, len(lines) * TABLE_LINE_H))
+    return rows
+
+def _draw_table_header(pdf):
+    pdf.set_line_width(0.1)
+    pdf.set_draw_color(*COLOR_BLUE)
+    pdf.set_fill_color(*COLOR_BLUE)
+    pdf.set_text_color(*COLOR_WHITE)
+    pdf.set_font(pdf.family, "", 8)
+    for i, (title, w, align) in enumerate(TABLE_COLS):
+        pdf.cell(w, TABLE_HEADER_H, title, 1, 1 if i == len(TABLE_COLS) - 1 else 0, align, True)
+
+def _draw_table_row(pdf, cells, lines, h_row):
+    x, y = pdf.get_x(), pdf.get_y()
+    for i, (text, (_, w, align)) in enumerate(zip(cells, TABLE_COLS)):
+        if i == TABLE_DESC_COL:
+            pdf.rect(x, y, w, h_row)
+            for n, line in enumerate(lines):
+                pdf.set_xy(x, y + n * TABLE_LINE_H)
+                pdf.cell(w, TABLE_LINE_H, line, 0, 0, 'L')
+            pdf.set_xy(x + w, y)
+        else:
+            pdf.cell(w, h_row, text, 1, 0, align)
+        x += w
+    pdf.set_xy(pdf.l_margin, y + h_row)
 
 def generate_pdf(calc_df, partner_data, customer_data, financial_data, options, closing_text):
     pdf = AngebotsPDF(partner_data, customer_data)
     pdf.add_page()
     pdf.set_text_color(*COLOR_DARK_GRAY_RGB)
-    pdf.set_font("Helvetica", "I", 8)
-    pdf.cell(0, 5, safe_text(f"{partner_data['firma']} - {partner_data['strasse']} - {partner_data['ort']}"), ln=True)
+    pdf.set_font(pdf.family, "I", 8)
+    pdf.cell(0, 5, pdf.txt(f"{partner_data['firma']} - {partner_data['strasse']} - {partner_data['ort']}"), ln=True)
     pdf.ln(5)
-    pdf.set_font("Helvetica", "B", 11)
-    pdf.cell(0, 5, safe_text(customer_data['name']), ln=True)
-    pdf.set_font("Helvetica", "", 11)
-    pdf.cell(0, 5, "Oesterreich", ln=True)
+    pdf.set_font(pdf.family, "B", 11)
+    pdf.cell(0, 5, pdf.txt(customer_data['name']), ln=True)
+    pdf.set_font(pdf.family, "", 11)
+    pdf.cell(0, 5, pdf.txt("Österreich"), ln=True)
     pdf.set_xy(130, 50)
-    pdf.set_font("Helvetica", "", 10)
+    pdf.set_font(pdf.family, "", 10)
     pdf.cell(30, 6, "Datum:", 0)
     pdf.cell(40, 6, customer_data['datum'], 0, 1, 'R')
     pdf.set_x(130)
-    pdf.cell(30, 6, "Gueltig bis:", 0)
+    pdf.cell(30, 6, pdf.txt("Gültig bis:"), 0)
     pdf.cell(40, 6, customer_data['gueltig_bis'], 0, 1, 'R')
     pdf.set_x(130)
     pdf.cell(30, 6, "Bearbeiter:", 0)
-    pdf.cell(40, 6, safe_text(customer_data['bearbeiter']), 0, 1, 'R')
+    pdf.cell(40, 6, pdf.txt(customer_data['bearbeiter']), 0, 1, 'R')
     pdf.set_x(130)
     pdf.cell(30, 6, "Angebots-Nr:", 0)
-    pdf.cell(40, 6, safe_text(customer_data.get('nr', '')), 0, 1, 'R')
+    pdf.cell(40, 6, pdf.txt(customer_data.get('nr', '')), 0, 1, 'R')
     pdf.ln(20)
-    pdf.set_font("Helvetica", "B", 12)
-    pdf.cell(0, 10, safe_text(f"Angebot: {customer_data['projekt']}"), ln=True)
-    pdf.set_line_width(0.1)
-    pdf.set_draw_color(*COLOR_BLUE)
-    pdf.set_fill_color(*COLOR_BLUE)
-    pdf.set_text_color(*COLOR_WHITE)
-    pdf.set_font("Helvetica", "", 8)
-    w_p, w_a, w_t, w_m, w_pr, w_r, w_g = 10, 25, 75, 10, 25, 15, 30
-    pdf.cell(w_p, 8, "Pos", 1, 0, 'C', True)
-    pdf.cell(w_a, 8, "Art", 1, 0, 'L', True)
-    pdf.cell(w_t, 8, "Beschreibung", 1, 0, 'L', True)
-    pdf.cell(w_m, 8, "Mge", 1, 0, 'C', True)
-    pdf.cell(w_pr, 8, "Listenpr.", 1, 0, 'R', True)
-    pdf.cell(w_r, 8, "Rab.", 1, 0, 'C', True)
-    pdf.cell(w_g, 8, "Gesamt", 1, 1, 'R', True)
+    pdf.set_font(pdf.family, "B", 12)
+    pdf.cell(0, 10, pdf.txt(f"Angebot: {customer_data['projekt']}"), ln=True)
+    rows = layout_table(pdf, calc_df, options['hide_prices'])
+    _draw_table_header(pdf)
     pdf.set_text_color(*COLOR_DARK_GRAY_RGB)
-    pdf.set_font("Helvetica", "", 8)
-    for _, row in calc_df.sort_values(by="Pos").iterrows():
-        t_pos = str(int(row['Pos']))
-        t_art = safe_text(str(row['Artikel'])[:15])
-        t_txt = safe_text(str(row['Beschreibung']))
-        t_mge = f"{row['Menge']:.0f}"
-        if options['hide_prices']:
-            t_prc, t_rab, t_ges = "-", "-", "-"
-        else:
-            t_prc = f"{row['Einzelpreis']:,.2f}"
-            t_rab = f"{row['Rabatt']:.0f}%"
-            t_ges = f"{row['Gesamt']:,.2f}"
-        x_s, y_s = pdf.get_x(), pdf.get_y()
-        pdf.set_xy(x_s + w_p + w_a, y_s)
-        pdf.multi_cell(w_t, 6, t_txt, 1, 'L')
-        y_e = pdf.get_y()
-        h_row = y_e - y_s
-        pdf.set_xy(x_s, y_s)
-        pdf.cell(w_p, h_row, t_pos, 1, 0, 'C')
-        pdf.cell(w_a, h_row, t_art, 1, 0, 'L')
-        pdf.set_xy(x_s + w_p + w_a + w_t, y_s)
-        pdf.cell(w_m, h_row, t_mge, 1, 0, 'C')
-        pdf.cell(w_pr, h_row, t_prc, 1, 0, 'R')
-        pdf.cell(w_r, h_row, t_rab, 1, 0, 'C')
-        pdf.cell(w_g, h_row, t_ges, 1, 1, 'R')
-        if pdf.get_y() > 250:
+    pdf.set_font(pdf.family, "", 8)
+    for cells, lines, h_row in rows:
+        # Seitenumbruch vor der Zeile, Tabellenkopf auf der neuen Seite wiederholen
+        if pdf.get_y() + h_row > TABLE_MAX_Y:
             pdf.add_page()
+            _draw_table_header(pdf)
+            pdf.set_text_color(*COLOR_DARK_GRAY_RGB)
+            pdf.set_font(pdf.family, "", 8)
+        _draw_table_row(pdf, cells, lines, h_row)
     pdf.set_draw_color(0, 0, 0)
     pdf.ln(5)
     x_val = 130
@@ -133,7 +271,9 @@ def generate_pdf(calc_df, partner_data, customer_data, financial_data, options,
         pdf.cell(30, 5, "Zwischensumme:", 0)
         pdf.cell(40, 5, f"{financial_data['zwischensumme']:,.2f} EUR", 0, 1, 'R')
         if financial_data['rabatt_proz'] > 0:
-            rabatt_proz_wert = financial_data['zwischensumme'] * (financial_data['rabatt_proz'] / 100)
+            # Betrag/Satz aus QuoteTotals (coolmatch_money); ältere Aufrufer ohne → ableiten
+            rabatt_proz_wert = financial_data.get('rabatt_betrag',
+                financial_data['zwischensumme'] * (financial_data['rabatt_proz'] / 100))
             pdf.set_x(x_val)
             pdf.cell(30, 5, f"Rabatt ({financial_data['rabatt_proz']}%):", 0)
             pdf.cell(40, 5, f"- {rabatt_proz_wert:,.2f} EUR", 0, 1, 'R')
@@ -145,22 +285,24 @@ def generate_pdf(calc_df, partner_data, customer_data, financial_data, options,
     pdf.line(x_val, pdf.get_y()+1, 200, pdf.get_y()+1)
     pdf.ln(2)
     pdf.set_x(x_val)
-    pdf.set_font("Helvetica", "B", 10)
+    pdf.set_font(pdf.family, "B", 10)
     pdf.cell(30, 6, "Netto:", 0)
     pdf.cell(40, 6, f"{financial_data['netto']:,.2f} EUR", 0, 1, 'R')
     pdf.set_x(x_val)
-    pdf.set_font("Helvetica", "", 10)
-    mwst_satz = (financial_data['ust'] / financial_data['netto'] * 100) if financial_data['netto'] > 0 else 0
-    pdf.cell(30, 6, f"MwSt {mwst_satz:.0f}%:", 0)
+    pdf.set_font(pdf.family, "", 10)
+    mwst_satz = financial_data.get('mwst')
+    if mwst_satz is None:
+        mwst_satz = round(financial_data['ust'] / financial_data['netto'] * 100, 1) if financial_data['netto'] > 0 else 0
+    pdf.cell(30, 6, f"MwSt {mwst_satz:g}%:", 0)
     pdf.cell(40, 6, f"{financial_data['ust']:,.2f} EUR", 0, 1, 'R')
     pdf.set_x(x_val)
-    pdf.set_font("Helvetica", "B", 12)
+    pdf.set_font(pdf.family, "B", 12)
     label_total = "Pauschalpreis (brutto):" if options['manual_active'] else "Gesamtbetrag:"
     pdf.cell(30, 10, label_total, 0)
     pdf.cell(40, 10, f"{financial_data['brutto']:,.2f} EUR", 0, 1, 'R')
     pdf.ln(10)
-    pdf.set_font("Helvetica", "", 9)
+    pdf.set_font(pdf.family, "", 9)
     if pdf.get_y() > 240:
         pdf.add_page()
-    pdf.multi_cell(0, 5, safe_text(closing_text))
+    pdf.multi_cell(0, 5, pdf.txt(closing_text))
     return bytes(pdf.output())
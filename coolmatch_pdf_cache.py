@@ -0,0 +1,118 @@
+# ==========================================
+# DATEI: coolmatch_pdf_cache.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Inhaltsadressierter PDF-Cache auf Platte
+#   - Schlüssel: SHA-256 über alle Eingaben von generate_pdf + Schriftmodus,
+#     Schrift- und Logodateien (Größe/mtime)
+#   - gleicher Warenkorb + gleiche Daten → PDF ohne neues Rendern
+#   - LRU über mtime, Größengrenze PDF_CACHE_MAX_BYTES
+# ==========================================
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from coolmatch_config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+from coolmatch_pdf import generate_pdf, render_fingerprint
+
+# Bei Layout-Änderungen im Code erhöhen → alte Cache-Einträge werden nicht mehr getroffen
+# (Schriften und Logo stecken über render_fingerprint schon im Schlüssel)
+PDF_CACHE_VERSION = 2
+
+_evict_lock = threading.Lock()
+
+
+def pdf_cache_key(calc_df: pd.DataFrame, partner_data: Dict, customer_data: Dict,
+                  financial_data: Dict, options: Dict, closing_text: str) -> str:
+    """Stabiler Hash: kanonisches JSON (sortierte Schlüssel, Positionen nach Pos)
+    inkl. Schrift-/Logo-Stand → neue Schriften oder neues Logo treffen keine alten PDFs"""
+    records = calc_df.sort_values(by="Pos").to_dict('records') if len(calc_df) else []
+    payload = {
+        'v': PDF_CACHE_VERSION,
+        'render': render_fingerprint(),
+        'rows': records,
+        'partner': partner_data,
+        'customer': customer_data,
+        'financial': financial_data,
+        'options': options,
+        'closing': closing_text,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str,
+                           ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+
+def get_cached_pdf(key: str) -> Optional[bytes]:
+    path = _cache_path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # zuletzt benutzt → LRU
+        return data
+    except OSError:
+        return None
+
+
+def put_cached_pdf(key: str, pdf_bytes: bytes, max_bytes: int = PDF_CACHE_MAX_BYTES):
+    path = _cache_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # Cache ist optional - PDF wurde trotzdem erzeugt
+        print(f"⚠️ PDF-Cache nicht geschrieben: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    evict_pdf_cache(max_bytes)
+
+
+def evict_pdf_cache(max_bytes: int = PDF_CACHE_MAX_BYTES) -> int:
+    """Löscht die am längsten unbenutzten PDFs, bis der Cache unter max_bytes liegt"""
+    with _evict_lock:
+        try:
+            entries = []
+            with os.scandir(PDF_CACHE_DIR) as it:
+                for entry in it:
+                    if entry.name.endswith(".pdf"):
+                        st_ = entry.stat()
+                        entries.append((st_.st_mtime, st_.st_size, entry.path))
+        except OSError:
+            return 0
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def generate_pdf_cached(calc_df: pd.DataFrame, partner_data: Dict, customer_data: Dict,
+                        financial_data: Dict, options: Dict, closing_text: str) -> Tuple[bytes, str, bool]:
+    """generate_pdf mit Cache → (pdf_bytes, hash, aus_cache)"""
+    key = pdf_cache_key(calc_df, partner_data, customer_data, financial_data, options, closing_text)
+    cached = get_cached_pdf(key)
+    if cached is not None:
+        return cached, key, True
+    pdf_bytes = generate_pdf(calc_df, partner_data, customer_data, financial_data, options, closing_text)
+    put_cached_pdf(key, pdf_bytes)
+    return pdf_bytes, key, False
@@ -0,0 +1,164 @@
+# ==========================================
+# DATEI: coolmatch_reconcile.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Abgleich Datenbank ↔ Monday.com-Board
+#   - Schlüssel: angebots_nr = Item-Name
+#   - Board wird seitenweise gestreamt (iter_board_items)
+#   - fehlende Items gebündelt anlegen (begrenzt parallel),
+#     monday_item_id in der DB nachtragen
+#   - CLI: python coolmatch_reconcile.py [--dry-run] [--api-url URL]
+# ==========================================
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from coolmatch_database import CoolMatchDatabase
+from coolmatch_monday import MondayIntegration
+
+
+@dataclass
+class ReconcileReport:
+    """Ergebnis eines Abgleichs"""
+    db_quotes: int = 0
+    board_items: int = 0
+    in_sync: int = 0
+    backfilled: Dict[str, str] = field(default_factory=dict)     # angebots_nr → item_id
+    created: Dict[str, str] = field(default_factory=dict)        # angebots_nr → item_id
+    missing: List[str] = field(default_factory=list)             # fehlt auf dem Board
+    create_failed: List[str] = field(default_factory=list)
+    pending: List[str] = field(default_factory=list)             # Outbox-Auftrag offen
+    board_only: List[str] = field(default_factory=list)          # Item ohne Angebot in der DB
+    duplicates: Dict[str, List[str]] = field(default_factory=dict)
+    seconds: float = 0.0
+    dry_run: bool = False
+
+    def summary(self) -> str:
+        mode = " (Dry-Run)" if self.dry_run else ""
+        return "\n".join([
+            f"Abgleich{mode}: {self.db_quotes} Angebote ↔ {self.board_items} Board-Items "
+            f"in {self.seconds:.1f}s",
+            f"  ✅ synchron:            {self.in_sync}",
+            f"  🔗 ID nachgetragen:     {len(self.backfilled)}",
+            f"  ➕ fehlend auf Board:    {len(self.missing)}",
+            f"  🆕 angelegt:            {len(self.created)}",
+            f"  ❌ Anlegen fehlgeschl.: {len(self.create_failed)}",
+            f"  📤 Outbox offen:        {len(self.pending)}",
+            f"  ❓ nur auf Board:        {len(self.board_only)}",
+            f"  ⚠️ doppelte Items:      {len(self.duplicates)}",
+        ])
+
+
+def _quote_to_monday(quote: Dict) -> Dict:
+    """DB-Kopfdaten → quote_data für build_column_values (PLZ ist in der DB nicht gespeichert)"""
+    data = {'angebots_nr': quote['angebots_nr'],
+            'angebotswert': quote['summe_brutto'] or 0,
+            'partner': quote['firma'] or ''}
+    if quote['erstellt_am']:
+        data['datum'] = str(quote['erstellt_am'])[:10]
+    return data
+
+
+def reconcile(db: CoolMatchDatabase, monday: MondayIntegration, dry_run: bool = False,
+              concurrency: int = 3, batch_size: int = 20, page_size: int = 200) -> ReconcileReport:
+    """
+    Gleicht DB und Board ab:
+      - Item vorhanden, DB-ID fehlt/abweichend → monday_item_id nachtragen
+      - Item fehlt → gebündelt anlegen (ohne PDF) und ID speichern
+      - Angebote mit offenem Outbox-Auftrag überlässt es dem Sync-Worker
+    """
+    t0 = time.perf_counter()
+    report = ReconcileReport(dry_run=dry_run)
+
+    # Board streamen: nur Name + ID werden behalten
+    board: Dict[str, str] = {}
+    for item in monday.iter_board_items(page_size=page_size, column_ids=["date_mknqdvj8"]):
+        report.board_items += 1
+        if item.name in board:
+            report.duplicates.setdefault(item.name, [board[item.name]]).append(item.id)
+            continue
+        board[item.name] = item.id
+
+    pending = db.get_pending_monday_numbers()
+    to_create: List[Dict] = []
+    seen = set()
+    for quote in db.iter_quotes_for_sync():
+        report.db_quotes += 1
+        nr = quote['angebots_nr']
+        seen.add(nr)
+        item_id = board.get(nr)
+        if item_id:
+            if (quote['monday_item_id'] or '') == item_id:
+                report.in_sync += 1
+            else:
+                report.backfilled[nr] = item_id
+        elif nr in pending:
+            report.pending.append(nr)
+        else:
+            report.missing.append(nr)
+            to_create.append(quote)
+
+    report.board_only = sorted(set(board) - seen)
+
+    if not dry_run:
+        db.set_monday_ids(report.backfilled)
+        if to_create:
+            created = _create_missing(monday, to_create, concurrency, batch_size)
+            for quote, item_id in zip(to_create, created):
+                if item_id:
+                    report.created[quote['angebots_nr']] = item_id
+                else:
+                    report.create_failed.append(quote['angebots_nr'])
+            db.set_monday_ids(report.created)
+
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def _create_missing(monday: MondayIntegration, quotes: List[Dict],
+                    concurrency: int, batch_size: int) -> List[Optional[str]]:
+    """Legt Items in Blöcken (Alias-Mutations) an, max. `concurrency` Requests gleichzeitig"""
+    items = [(q['angebots_nr'], monday.build_column_values(_quote_to_monday(q))) for q in quotes]
+    # Board-Schema einmal vorab laden statt parallel in jedem Block
+    monday.get_board_columns()
+    blocks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = pool.map(lambda block: monday.create_items_batch(block, chunk_size=batch_size), blocks)
+        return [item_id for block_result in results for item_id in block_result]
+
+
+# ==========================================
+# CLI
+# ==========================================
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Abgleich coolMATCH-Datenbank ↔ Monday.com-Board")
+    parser.add_argument("--dry-run", action="store_true", help="nur berichten, nichts ändern")
+    parser.add_argument("--api-url", help="GraphQL-Endpunkt (Default: api.monday.com/v2)")
+    parser.add_argument("--token", help="API-Token (Default: Secrets)")
+    parser.add_argument("--board", help="Board-ID (Default: Secrets)")
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--verbose", "-v", action="store_true", help="Angebotsnummern auflisten")
+    args = parser.parse_args(argv)
+
+    monday = MondayIntegration(args.token, args.board, api_url=args.api_url)
+    if not monday.is_configured():
+        print("❌ Monday.com nicht konfiguriert (--token/--board oder Secrets)")
+        return 2
+
+    report = reconcile(CoolMatchDatabase(), monday, dry_run=args.dry_run,
+                       concurrency=args.concurrency, batch_size=args.batch_size)
+    print(report.summary())
+    if args.verbose:
+        for label, values in (("nachgetragen", report.backfilled), ("fehlend", report.missing),
+                              ("fehlgeschlagen", report.create_failed), ("nur Board", report.board_only)):
+            if values:
+                print(f"{label}: {', '.join(values)}")
+    return 1 if report.create_failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
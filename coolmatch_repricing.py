@@ -0,0 +1,223 @@
+# ==========================================
+# DATEI: coolmatch_repricing.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Neubewertung offener Angebote gegen eine neue Samsung-Preisliste
+#   - alle Positionen offener Angebote (Erstellt/Gesendet) mit einer Abfrage
+#   - ein vektorisierter Merge gegen den Katalog über die Artikelnummer
+#   - alte/neue Netto- und Bruttosummen pro Angebot über coolmatch_money
+#   - Bericht als Excel (Angebote + geänderte Positionen) oder CSV
+#   - optional nur geänderte Artikel (Diff zur Vorversion, coolmatch_catalog_history)
+#   - CLI: python coolmatch_repricing.py [--samsung DATEI] [--changed-only] [--out bericht.xlsx]
+# ==========================================
+
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from coolmatch_catalog import (artikel_key, file_sha256, find_catalog_files, load_catalog,
+                              read_samsung_excel)
+from coolmatch_catalog_history import CatalogDiff, record_catalog_version
+from coolmatch_config import DEFAULT_MWST, OPEN_QUOTE_STATUSES
+from coolmatch_database import CoolMatchDatabase
+from coolmatch_money import line_totals, quote_totals_array, to_cents, to_euro
+
+REPORT_COLUMNS = ['angebots_nr', 'status', 'kunde_name', 'firma', 'positionen', 'geaendert',
+                  'ohne_katalog', 'pauschal', 'netto_alt', 'netto_neu', 'brutto_alt',
+                  'brutto_neu', 'differenz', 'differenz_proz']
+
+
+@dataclass
+class RepricingReport:
+    """Ergebnis einer Neubewertung"""
+    quotes: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=REPORT_COLUMNS))
+    positions: pd.DataFrame = field(default_factory=pd.DataFrame)    # nur geänderte Positionen
+    position_count: int = 0
+    matched: int = 0
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> pd.DataFrame:
+        return self.quotes[self.quotes['differenz'] != 0]
+
+    def summary(self) -> str:
+        changed = self.changed
+        return "\n".join([
+            f"Neubewertung: {len(self.quotes)} offene Angebote, {self.position_count} Positionen "
+            f"in {self.seconds:.2f}s",
+            f"  🔗 im Katalog gefunden:  {self.matched}",
+            f"  💶 Preis geändert:       {len(self.positions)} Positionen",
+            f"  📈 Angebote mit Änderung: {len(changed)} "
+            f"(Δ Brutto gesamt {changed['differenz'].sum():+,.2f} €)",
+            f"  🔒 Pauschalpreis:         {int(self.quotes['pauschal'].sum())}",
+        ])
+
+    def write(self, path: str):
+        """Excel (.xlsx: Angebote + Positionen) oder CSV (nur Angebote)"""
+        if path.lower().endswith(".csv"):
+            self.quotes.to_csv(path, index=False, sep=";", decimal=",", encoding="utf-8-sig")
+            return
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            self.quotes.to_excel(writer, sheet_name='Angebote', index=False)
+            self.positions.to_excel(writer, sheet_name='Positionen', index=False)
+
+
+def build_price_map(df_samsung: pd.DataFrame) -> pd.Series:
+    """Katalog → Listenpreis je Artikelnummer (erster Eintrag bei Duplikaten)"""
+    prices = pd.Series(pd.to_numeric(df_samsung['Listenpreis'], errors='coerce').to_numpy(),
+                       index=artikel_key(df_samsung['Artikelnummer']).to_numpy())
+    prices = prices[prices.notna() & (prices.index != "")]
+    return prices[~prices.index.duplicated()]
+
+
+def reprice_positions(positions: pd.DataFrame, price_map: pd.Series) -> pd.DataFrame:
+    """
+    Ergänzt Positionen um neuer_preis, cents_alt, cents_neu (ein Merge, ein Rechendurchlauf).
+    Artikel ohne Katalogeintrag behalten ihren Preis.
+    """
+    df = positions.copy()
+    df['artikel_key'] = artikel_key(df['artikel_nr'])
+    df = df.merge(price_map.rename('katalogpreis'), how='left',
+                  left_on='artikel_key', right_index=True, sort=False)
+    df['im_katalog'] = df['katalogpreis'].notna()
+    df['neuer_preis'] = df['katalogpreis'].where(df['im_katalog'], df['einzelpreis']).fillna(0.0)
+    df['cents_alt'] = line_totals(df['menge'].fillna(0), df['einzelpreis'].fillna(0), df['rabatt'].fillna(0))
+    df['cents_neu'] = line_totals(df['menge'].fillna(0), df['neuer_preis'], df['rabatt'].fillna(0))
+    df['geaendert'] = to_cents(df['neuer_preis']) != to_cents(df['einzelpreis'].fillna(0))
+    return df
+
+
+def reprice(db: CoolMatchDatabase, df_samsung: Optional[pd.DataFrame],
+            statuses: Optional[List[str]] = None, diff: Optional[CatalogDiff] = None) -> RepricingReport:
+    """
+    Bewertet alle offenen Angebote mit den Preisen aus df_samsung neu.
+    Mit `diff` nur Angebote mit geänderten Artikeln, nur deren Preise werden ersetzt
+    (übrige Positionen zählen dann als 'ohne_katalog').
+    """
+    t0 = time.perf_counter()
+    report = RepricingReport()
+    if diff is not None:
+        price_map = diff.price_map()
+        articles = diff.changed_articles
+        positions = (db.get_open_positions(statuses or OPEN_QUOTE_STATUSES, articles)
+                     if articles else pd.DataFrame())
+    else:
+        price_map = build_price_map(df_samsung)
+        positions = db.get_open_positions(statuses or OPEN_QUOTE_STATUSES)
+    if positions.empty:
+        report.seconds = time.perf_counter() - t0
+        return report
+
+    df = reprice_positions(positions, price_map)
+    report.position_count = len(df)
+    report.matched = int(df['im_katalog'].sum())
+
+    grouped = df.groupby('angebots_nr', sort=False)
+    quotes = grouped[['status', 'kunde_name', 'firma', 'mwst_satz', 'rabatt_prozent',
+                      'rabatt_absolut', 'manual_preis', 'summe_netto', 'summe_brutto']].first()
+    sums = grouped[['cents_alt', 'cents_neu']].sum()
+    counts = grouped.agg(positionen=('position_nr', 'size'), geaendert=('geaendert', 'sum'),
+                         im_katalog=('im_katalog', 'sum'))
+
+    mwst = quotes['mwst_satz'].fillna(DEFAULT_MWST).to_numpy()
+    rabatt_proz = quotes['rabatt_prozent'].fillna(0).to_numpy()
+    rabatt_abs = quotes['rabatt_absolut'].fillna(0).to_numpy()
+    alt = quote_totals_array(sums['cents_alt'].to_numpy(), mwst, rabatt_proz, rabatt_abs)
+    neu = quote_totals_array(sums['cents_neu'].to_numpy(), mwst, rabatt_proz, rabatt_abs)
+
+    # Pauschalpreis: vereinbarter Bruttobetrag bleibt, nur der Hinweis zählt
+    pauschal = quotes['manual_preis'].fillna(0).astype(bool).to_numpy()
+    stored_netto = to_cents(quotes['summe_netto'].fillna(0))
+    stored_brutto = to_cents(quotes['summe_brutto'].fillna(0))
+    netto_alt = np.where(pauschal, stored_netto, alt['netto'])
+    netto_neu = np.where(pauschal, stored_netto, neu['netto'])
+    brutto_alt = np.where(pauschal, stored_brutto, alt['brutto'])
+    brutto_neu = np.where(pauschal, stored_brutto, neu['brutto'])
+    diff = brutto_neu - brutto_alt
+
+    report.quotes = pd.DataFrame({
+        'angebots_nr': quotes.index,
+        'status': quotes['status'].to_numpy(),
+        'kunde_name': quotes['kunde_name'].to_numpy(),
+        'firma': quotes['firma'].to_numpy(),
+        'positionen': counts['positionen'].to_numpy(),
+        'geaendert': counts['geaendert'].to_numpy(),
+        'ohne_katalog': (counts['positionen'] - counts['im_katalog']).to_numpy(),
+        'pauschal': pauschal,
+        'netto_alt': to_euro(netto_alt),
+        'netto_neu': to_euro(netto_neu),
+        'brutto_alt': to_euro(brutto_alt),
+        'brutto_neu': to_euro(brutto_neu),
+        'differenz': to_euro(diff),
+        'differenz_proz': np.round(np.divide(diff * 100.0, brutto_alt, out=np.zeros(len(diff)),
+                                             where=brutto_alt != 0), 2),
+    }, columns=REPORT_COLUMNS)
+
+    changed = df[df['geaendert']]
+    report.positions = pd.DataFrame({
+        'angebots_nr': changed['angebots_nr'].to_numpy(),
+        'position_nr': changed['position_nr'].to_numpy(),
+        'artikel_nr': changed['artikel_nr'].to_numpy(),
+        'menge': changed['menge'].to_numpy(),
+        'preis_alt': changed['einzelpreis'].to_numpy(),
+        'preis_neu': changed['neuer_preis'].to_numpy(),
+        'rabatt': changed['rabatt'].to_numpy(),
+        'gesamt_alt': to_euro(changed['cents_alt'].to_numpy()),
+        'gesamt_neu': to_euro(changed['cents_neu'].to_numpy()),
+    })
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+# ==========================================
+# CLI
+# ==========================================
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Offene Angebote gegen neue Samsung-Preisliste bewerten")
+    parser.add_argument("--samsung", help="Preisliste (Default: S_Klima_Artikel_Import_*.xlsx im Verzeichnis)")
+    parser.add_argument("--status", action="append",
+                        help=f"Status (mehrfach möglich, Default: {', '.join(OPEN_QUOTE_STATUSES)})")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Preisliste als Version speichern, nur geänderte Artikel bewerten")
+    parser.add_argument("--out", default="neubewertung.xlsx", help="Bericht (.xlsx oder .csv)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="geänderte Angebote auflisten")
+    args = parser.parse_args(argv)
+
+    path = args.samsung or find_catalog_files()['samsung']
+    if not path:
+        print("❌ Keine Samsung-Preisliste gefunden (--samsung)")
+        return 2
+    if args.samsung:
+        # neue Liste direkt parsen → Snapshot der App bleibt unberührt
+        df_samsung = read_samsung_excel(path)
+    else:
+        df_samsung, _ = load_catalog(path, 'samsung')
+
+    db = CoolMatchDatabase()
+    diff = None
+    if args.changed_only:
+        _, diff = record_catalog_version(db, df_samsung, 'samsung', file_sha256(path),
+                                         os.path.basename(path))
+        if diff is None:
+            print("ℹ️ Erste gespeicherte Preisliste - keine Vorversion, alle Artikel werden bewertet")
+        else:
+            print(f"📋 Preisliste: {diff.summary()}")
+
+    report = reprice(db, df_samsung, args.status, diff)
+    report.write(args.out)
+    print(report.summary())
+    print(f"✅ Bericht: {args.out}")
+    if args.verbose:
+        for row in report.changed.itertuples():
+            print(f"{row.angebots_nr}: {row.brutto_alt:,.2f} → {row.brutto_neu:,.2f} € "
+                  f"({row.differenz:+,.2f} €, {row.geaendert} Pos.)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+# ==========================================
+# DATEI: coolmatch_search.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Invertierter N-Gramm-Index für die Katalogsuche
+#   - einmal beim Laden des Katalogs gebaut
+#   - Teilstring- und Präfix-Suche liefern Zeilenpositionen (iloc)
+#   - gemeinsam genutzt von RAC, BAC, FJM und Zubehör (mit Ranking)
+# ==========================================
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+_EMPTY = np.empty(0, dtype=np.int32)
+_TOKEN_SPLIT = re.compile(r"[^\w]+")
+
+# Trenner zwischen Feldern im Suchtext: Suchbegriffe enthalten nie Whitespace
+# (query.split()), ein Begriff trifft also nie über Feldgrenzen oder den Trenner selbst
+FIELD_SEP = "\n"
+
+
+def rank_rows(texts: Sequence[str], rows: Sequence[int], terms: List[str]) -> np.ndarray:
+    """Sortiert Treffer: Textanfang > Wortanfang > irgendwo; früher und kürzer zuerst"""
+    def score(row):
+        text = texts[row]
+        pos = [text.find(t) for t in terms]
+        starts = sum(1 for t, p in zip(terms, pos) if p == 0 or not text[p - 1].isalnum())
+        return (pos[0] != 0, -starts, sum(pos), len(text))
+
+    return np.asarray(sorted(list(rows), key=score), dtype=np.int32)
+
+
+class CatalogSearchIndex:
+    """N-Gramm-Index (1 bis 3 Zeichen) über die Suchtexte eines Katalogs"""
+
+    NGRAM = 3
+
+    def __init__(self, texts: Sequence[str], groups: Optional[Sequence[str]] = None):
+        self.texts: List[str] = [str(t).lower() for t in texts]
+        self.n_rows = len(self.texts)
+
+        grams: Dict[str, List[int]] = {}
+        tokens: Dict[str, List[int]] = {}
+        for row, text in enumerate(self.texts):
+            for gram in self._ngrams(text):
+                grams.setdefault(gram, []).append(row)
+            for token in set(_TOKEN_SPLIT.split(text)):
+                if token:
+                    tokens.setdefault(token, []).append(row)
+
+        self._postings = {g: np.asarray(r, dtype=np.int32) for g, r in grams.items()}
+        self._tokens = sorted(tokens)
+        self._token_rows = [np.asarray(tokens[t], dtype=np.int32) for t in self._tokens]
+
+        # Artikelgruppe → Zeilen (für RAC/BAC/FJM-Filter ohne str.contains)
+        self._groups: Dict[str, np.ndarray] = {}
+        if groups is not None:
+            by_group: Dict[str, List[int]] = {}
+            for row, g in enumerate(groups):
+                by_group.setdefault(str(g), []).append(row)
+            self._groups = {g: np.asarray(r, dtype=np.int32) for g, r in by_group.items()}
+        self._group_cache: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Sequence[str],
+                   group_column: str = None) -> "CatalogSearchIndex":
+        """Baut den Index über die angegebenen Spalten eines DataFrames"""
+        texts = df[list(columns)].fillna("").astype(str).agg(FIELD_SEP.join, axis=1)
+        groups = df[group_column].astype(str).tolist() if group_column else None
+        return cls(texts.tolist(), groups)
+
+    @classmethod
+    def _ngrams(cls, text: str) -> set:
+        """N-Gramme je Feld → kein Gramm enthält FIELD_SEP oder reicht über eine Feldgrenze"""
+        out = set()
+        for part in text.split(FIELD_SEP):
+            for n in range(1, cls.NGRAM + 1):
+                for i in range(len(part) - n + 1):
+                    out.add(part[i:i + n])
+        return out
+
+    # ------------------------------------------
+    # Abfragen
+    # ------------------------------------------
+    def _substring_rows(self, term: str) -> np.ndarray:
+        if len(term) <= self.NGRAM:
+            return self._postings.get(term, _EMPTY)
+
+        # Kleinste Posting-Liste zuerst schneiden, dann exakt nachprüfen
+        lists = []
+        for i in range(len(term) - self.NGRAM + 1):
+            rows = self._postings.get(term[i:i + self.NGRAM])
+            if rows is None:
+                return _EMPTY
+            lists.append(rows)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return _EMPTY
+        texts = self.texts
+        return np.asarray([r for r in candidates if term in texts[r]], dtype=np.int32)
+
+    def _prefix_rows(self, term: str) -> np.ndarray:
+        start = bisect_left(self._tokens, term)
+        hits = []
+        for i in range(start, len(self._tokens)):
+            if not self._tokens[i].startswith(term):
+                break
+            hits.append(self._token_rows[i])
+        if not hits:
+            return _EMPTY
+        return np.unique(np.concatenate(hits))
+
+    def search(self, query: str, within: np.ndarray = None, mode: str = "substring",
+               ranked: bool = False) -> np.ndarray:
+        """
+        Sucht alle Zeilen, die jeden Suchbegriff enthalten (UND-Verknüpfung).
+        mode="substring": Begriff irgendwo im Text, mode="prefix": Wortanfang.
+        ranked=True: beste Treffer zuerst, sonst sortierte Zeilenpositionen (für df.iloc).
+        """
+        terms = str(query).lower().split()
+        if not terms:
+            return within if within is not None else np.arange(self.n_rows, dtype=np.int32)
+
+        lookup = self._prefix_rows if mode == "prefix" else self._substring_rows
+        result = within
+        for term in sorted(terms, key=len, reverse=True):
+            rows = lookup(term)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+            if not len(result):
+                return _EMPTY
+        return self._rank(result, terms) if ranked else result
+
+    def _rank(self, rows: np.ndarray, terms: List[str]) -> np.ndarray:
+        return rank_rows(self.texts, rows.tolist(), terms)
+
+    def group_rows(self, key: str) -> np.ndarray:
+        """Zeilen aller Artikelgruppen, die `key` enthalten (Groß/Klein egal)"""
+        key_l = key.lower()
+        if key_l not in self._group_cache:
+            hits = [rows for g, rows in self._groups.items() if key_l in g.lower()]
+            self._group_cache[key_l] = np.sort(np.concatenate(hits)) if hits else _EMPTY
+        return self._group_cache[key_l]
@@ -0,0 +1,137 @@
+# ==========================================
+# DATEI: coolmatch_sync.py
+# VERSION: 7.3
+# AUTOR: Michael Schäpers, coolsulting
+# BESCHREIBUNG: Hintergrund-Sync Angebote → Monday.com
+#   - Aufträge liegen dauerhaft in der Outbox (monday_outbox)
+#   - ein Worker-Thread pro Prozess: Item anlegen, PDF hochladen,
+#     monday_item_id zurückschreiben
+#   - Retry mit exponentiellem Backoff + Jitter, Monday-Ausfälle
+#     blockieren die Angebotserstellung nicht
+# ==========================================
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from coolmatch_database import CoolMatchDatabase
+from coolmatch_monday import MondayIntegration, get_monday_health
+
+
+class MondaySyncWorker:
+    """Arbeitet die Monday-Outbox im Hintergrund ab"""
+
+    def __init__(self, db: CoolMatchDatabase, monday: MondayIntegration,
+                 poll_interval: float = 5.0, batch_size: int = 5, max_attempts: int = 8,
+                 base_delay: float = 10.0, max_delay: float = 1800.0):
+        self.db = db
+        self.monday = monday
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error = ""
+
+    # ------------------------------------------
+    # Lebenszyklus
+    # ------------------------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="coolmatch-monday-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """Neuer Auftrag → sofort abarbeiten statt auf das Poll-Intervall zu warten"""
+        self._wake.set()
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                # z.B. DB kurz nicht erreichbar → beim nächsten Durchlauf erneut
+                self.last_error = str(e)
+                processed = 0
+            if not processed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    # ------------------------------------------
+    # Abarbeitung
+    # ------------------------------------------
+    def run_once(self) -> int:
+        """Holt fällige Aufträge und verarbeitet sie → Anzahl verarbeiteter Aufträge"""
+        if not self.monday.is_configured():
+            return 0
+        # Monday gilt als down → Aufträge bleiben in der Outbox
+        health = get_monday_health(self.monday)
+        if not health.allow_request():
+            return 0
+        jobs = self.db.claim_monday_jobs(limit=self.batch_size)
+        for job in jobs:
+            try:
+                self._process(job)
+                self.db.complete_monday_job(job['id'])
+                health.record_success()
+            except Exception as e:
+                self.last_error = str(e)
+                health.record_failure(str(e))
+                self.db.fail_monday_job(job['id'], str(e), self._next_attempt(job['attempts'] + 1))
+        return len(jobs)
+
+    def _process(self, job: Dict):
+        quote_data = job['payload']
+        item_id = job['item_id']
+
+        if not item_id:
+            item_id = self.monday.create_item(self.monday.item_name_for(quote_data),
+                                              self.monday.build_column_values(quote_data))
+            if not item_id:
+                raise RuntimeError("Monday-Item konnte nicht erstellt werden")
+            # Checkpoint vor dem Upload → ein Retry legt kein zweites Item an
+            self.db.checkpoint_monday_job(job['id'], item_id)
+            self.db.update_monday_id(job['angebots_nr'], item_id)
+
+        if job['pdf'] and job['filename']:
+            if not self.monday.upload_file_to_item(item_id, bytes(job['pdf']), job['filename']):
+                raise RuntimeError(f"PDF-Upload zu Item {item_id} fehlgeschlagen")
+
+    def _next_attempt(self, attempts: int) -> Optional[float]:
+        """Zeitpunkt des nächsten Versuchs; None = aufgeben (Status 'failed')"""
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return time.time() + delay * random.uniform(0.8, 1.2)
+
+
+# ==========================================
+# EIN WORKER PRO PROZESS
+# ==========================================
+_worker: Optional[MondaySyncWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_sync_worker(db: CoolMatchDatabase, monday: MondayIntegration) -> MondaySyncWorker:
+    """Startet den Worker beim ersten Aufruf; alle Sessions teilen sich denselben"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = MondaySyncWorker(db, monday)
+        _worker.start()
+        return _worker